@@ -0,0 +1,67 @@
+from .query import columns
+
+TRIP_FIELDS = columns(
+    "id",
+    "title",
+    "destination",
+    "start_date",
+    "end_date",
+    "version",
+    "owner_id",
+    owner_username="owner__username",
+)
+PACKING_LIST_FIELDS = columns(
+    "id", "list_type", "user_id", "item_count", "packed_count", "version"
+)
+PACKING_ITEM_FIELDS = columns(
+    "id",
+    "item_name",
+    "item_quantity",
+    "is_packed",
+    "version",
+    packed_by_username="packed_by__username",
+)
+SHOPPING_LIST_FIELDS = columns(
+    "id", "trip_id", "item_count", "purchased_count", "version"
+)
+SHOPPING_ITEM_FIELDS = columns(
+    "id",
+    "item_name",
+    "item_quantity",
+    "is_purchased",
+    "version",
+    purchased_by_username="purchased_by__username",
+)
+NOTE_FIELDS = columns(
+    "id",
+    "trip_id",
+    "title",
+    "note_type",
+    "excerpt",
+    "updated_at",
+    author_username="user__username",
+)
+NOTE_DETAIL_FIELDS = {
+    **NOTE_FIELDS,
+    **columns("content", "content_format", "content_html"),
+}
+NOTIFICATION_FIELDS = columns(
+    "id",
+    "notification_type",
+    "message",
+    "is_read",
+    "trip_id",
+    "created_at",
+    sender_username="sender__username",
+)
+INVITE_FIELDS = columns(
+    "id",
+    "trip_id",
+    "created_at",
+    "expires_at",
+    trip_title="trip__title",
+    invited_by_username="invited_by__username",
+)
+
+TRIP_INCLUDES = ("members", "invites", "shopping_list", "packing_lists")
+EMBEDDED_SHOPPING_LIST = ("id", "item_count", "purchased_count", "version")
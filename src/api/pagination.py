@@ -0,0 +1,54 @@
+import base64
+import binascii
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """pk the cursor points past, raises InvalidCursor for anything else"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+
+
+def get_limit(request):
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        return DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def paginate(request, queryset):
+    """One keyset page of a queryset, newest pk first
+
+    The cursor is opaque to clients, so the ordering can change later
+    without breaking them. Returns {"results": [...], "next": cursor}.
+    """
+    limit = get_limit(request)
+    cursor = request.GET.get("cursor")
+
+    queryset = queryset.order_by("-pk")
+    if cursor:
+        queryset = queryset.filter(pk__lt=decode_cursor(cursor))
+
+    # one extra row tells whether there is a next page without a count()
+    rows = list(queryset[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["id"] if isinstance(last, dict) else last.pk)
+
+    return {"results": rows, "next": next_cursor}
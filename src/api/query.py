@@ -0,0 +1,68 @@
+from django.db.models import F
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def columns(*names, **paths):
+    """Public field name -> ORM path, e.g. owner_username="owner__username" """
+    return {**{name: name for name in names}, **paths}
+
+
+def parse_list(request, param):
+    return [
+        part.strip() for part in request.GET.get(param, "").split(",") if part.strip()
+    ]
+
+
+def requested_fields(request, available):
+    """Names asked for in ?fields=, every available one when it's missing
+
+    id is always returned, the cursor and clients' caches depend on it.
+    """
+    names = parse_list(request, "fields")
+    if not names:
+        return list(available)
+
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise InvalidQuery(f'Unknown field "{unknown[0]}".')
+    return ["id", *dict.fromkeys(name for name in names if name != "id")]
+
+
+def requested_includes(request, available, default=()):
+    """Relations asked for in ?include=, validated against available"""
+    if "include" not in request.GET:
+        return set(default)
+
+    names = parse_list(request, "include")
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise InvalidQuery(f'Unknown include "{unknown[0]}".')
+    return set(names)
+
+
+def values_for(queryset, available, names=None):
+    """queryset.values() for the named columns, renaming ORM paths"""
+    names = list(available) if names is None else names
+    plain = [name for name in names if available[name] == name]
+    renamed = {name: F(available[name]) for name in names if available[name] != name}
+    return queryset.values(*plain, **renamed)
+
+
+def select_values(request, queryset, available):
+    """queryset.values() with only the requested columns"""
+    return values_for(queryset, available, requested_fields(request, available))
+
+
+def related_paths(paths):
+    """select_related() arguments needed to load the given only() paths"""
+    return {path.rsplit("__", 1)[0] for path in paths if "__" in path}
+
+
+def resolve(instance, path):
+    """Follows an ORM path like owner__username on a loaded instance"""
+    for attr in path.split("__"):
+        instance = getattr(instance, attr)
+    return instance
@@ -0,0 +1,224 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.exceptions import VersionConflict
+from core.importers import MAX_NAME_LENGTH, MAX_QUANTITY
+from packing_lists.events import publish_list_event as publish_packing_list_event
+from packing_lists.models import PackingItem
+from shopping_list.events import publish_list_event as publish_shopping_list_event
+from shopping_list.models import ShoppingItem
+from .fields import PACKING_ITEM_FIELDS, SHOPPING_ITEM_FIELDS
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+from .query import InvalidQuery, values_for
+
+MAX_CHANGES = 200
+# rows written by transactions that were still open when the last sync
+# read the table commit with an older updated_at - re-send a short window
+SYNC_OVERLAP = timedelta(seconds=5)
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_token(moment):
+    return encode_cursor((moment - EPOCH) // timedelta(microseconds=1))
+
+
+def decode_token(token):
+    if not isinstance(token, str):  # JSON bodies can carry any type
+        raise InvalidQuery("Invalid sync token.")
+    try:
+        return EPOCH + timedelta(microseconds=decode_cursor(token))
+    except (InvalidCursor, OverflowError):
+        raise InvalidQuery("Invalid sync token.")
+
+
+def clean_name(value):
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("item_name is required")
+    if len(value.strip()) > MAX_NAME_LENGTH:
+        raise ValueError(f"item_name is longer than {MAX_NAME_LENGTH} characters")
+    return value.strip()
+
+
+def clean_quantity(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("item_quantity must be a number")
+    if not 1 <= value <= MAX_QUANTITY:
+        raise ValueError(f"item_quantity is not between 1 and {MAX_QUANTITY}")
+    return value
+
+
+class ItemSync:
+    """Change feed and queued client mutations for the items of one list
+
+    Subclasses name the item model, its list foreign key and the
+    done flag (packed / purchased).
+    """
+
+    item_model = None
+    list_field = None
+    flag_field = None
+    fields = None
+
+    def __init__(self, item_list, user):
+        self.item_list = item_list
+        self.user = user
+
+    def flag_changes(self, value):
+        raise NotImplementedError
+
+    def publish(self, count):
+        """Tells live viewers of the list to reload"""
+        raise NotImplementedError
+
+    def items(self, manager):
+        return manager.filter(**{self.list_field: self.item_list})
+
+    def changes_since(self, since):
+        """Items changed after `since` and the ids deleted since then
+
+        Without a token, or one older than the tombstones we keep, the
+        client gets the whole live list and has to replace its copy.
+        """
+        oldest = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+        reset = since is None or since < oldest
+
+        if reset:
+            items = self.items(self.item_model.objects)
+        else:
+            items = self.items(self.item_model.all_objects).filter(
+                updated_at__gt=since - SYNC_OVERLAP
+            )
+
+        changed, deleted = [], []
+        for row in values_for(items, {**self.fields, "deleted_at": "deleted_at"}):
+            if row.pop("deleted_at"):
+                deleted.append(row["id"])
+            else:
+                changed.append(row)
+        return {"reset": reset, "changed": changed, "deleted": deleted}
+
+    def clean(self, change, creating=False):
+        """Model field values from one client change, ValueError if invalid"""
+        values = {}
+        if creating or "item_name" in change:
+            values["item_name"] = clean_name(change.get("item_name"))
+        if "item_quantity" in change:
+            values["item_quantity"] = clean_quantity(change["item_quantity"])
+        if self.flag_field in change:
+            values.update(self.flag_changes(bool(change[self.flag_field])))
+        return values
+
+    def apply_all(self, changes):
+        """Applies queued mutations in order, each one on its own
+
+        A conflict or invalid change doesn't undo the ones before it.
+        Returns one outcome per change.
+        """
+        ids = [change.get("id") for change in changes if isinstance(change, dict)]
+        items = self.items(self.item_model.objects).in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+
+        outcomes = [self.apply(change, items) for change in changes]
+        applied = sum(outcome["status"] == "ok" for outcome in outcomes)
+        if applied:
+            self.publish(applied)
+        return outcomes
+
+    def apply(self, change, items):
+        if not isinstance(change, dict):
+            return {"status": "invalid", "error": "change must be an object"}
+
+        op = change.get("op")
+        outcome = {"op": op}
+        if "client_id" in change:
+            outcome["client_id"] = change["client_id"]
+
+        if op == "create":
+            item = None
+        elif op in ("update", "delete"):
+            pk = change.get("id")
+            item = items.get(pk) if isinstance(pk, int) else None
+            if item is None:
+                return {**outcome, "id": change.get("id"), "status": "not_found"}
+            if "version" in change:  # version the client has seen
+                if not isinstance(change["version"], int):
+                    return {**outcome, "status": "invalid", "error": "bad version"}
+                item.version = change["version"]
+        else:
+            return {**outcome, "status": "invalid", "error": "unknown op"}
+
+        try:
+            values = {} if op == "delete" else self.clean(change, op == "create")
+            with transaction.atomic():
+                if op == "create":
+                    item = self.item_model.objects.create(
+                        **{self.list_field: self.item_list},
+                        added_by=self.user,
+                        **values,
+                    )
+                elif op == "delete":
+                    item.delete()
+                elif values:
+                    item.update_if_current(**values)
+        except ValueError as error:
+            return {**outcome, "status": "invalid", "error": str(error)}
+        except IntegrityError:
+            return {**outcome, "status": "duplicate"}
+        except VersionConflict:
+            return {**outcome, "id": item.pk, "status": "conflict"}
+
+        return {**outcome, "id": item.pk, "version": item.version, "status": "ok"}
+
+    def sync(self, token, changes):
+        """One round trip: push the client's queue, pull what changed since token"""
+        since = decode_token(token) if token else None
+        if not isinstance(changes, list):
+            raise InvalidQuery("changes must be a list.")
+        if len(changes) > MAX_CHANGES:
+            raise InvalidQuery(f"At most {MAX_CHANGES} changes per request.")
+
+        outcomes = self.apply_all(changes) if changes else []
+        # taken before reading, anything written after it is in the next sync
+        now = timezone.now()
+        payload = self.changes_since(since)
+        if outcomes:
+            self.item_list.refresh_from_db(fields=["version"])
+        return {
+            **payload,
+            "applied": outcomes,
+            "token": encode_token(now),
+            "version": self.item_list.version,
+        }
+
+
+class PackingItemSync(ItemSync):
+    item_model = PackingItem
+    list_field = "packing_list"
+    flag_field = "is_packed"
+    fields = PACKING_ITEM_FIELDS
+
+    def flag_changes(self, value):
+        changes = {"is_packed": value}
+        if self.item_list.list_type == "shared":
+            changes["packed_by"] = self.user if value else None
+        return changes
+
+    def publish(self, count):
+        publish_packing_list_event(self.item_list.pk, "items_synced", count=count)
+
+
+class ShoppingItemSync(ItemSync):
+    item_model = ShoppingItem
+    list_field = "shopping_list"
+    flag_field = "is_purchased"
+    fields = SHOPPING_ITEM_FIELDS
+
+    def flag_changes(self, value):
+        return {"is_purchased": value, "purchased_by": self.user if value else None}
+
+    def publish(self, count):
+        publish_shopping_list_event(self.item_list.pk, "items_synced", count=count)
@@ -0,0 +1,13 @@
+from celery import shared_task
+from django.conf import settings
+
+from core.sync import purge_tombstones
+from packing_lists.models import PackingItem
+from shopping_list.models import ShoppingItem
+
+
+@shared_task
+def prune_sync_tombstones():
+    """Beat job - drops list item tombstones no client can still need"""
+    days = settings.SYNC_TOMBSTONE_DAYS
+    return purge_tombstones(PackingItem, days) + purge_tombstones(ShoppingItem, days)
@@ -0,0 +1,89 @@
+import factory
+from datetime import date
+from django.contrib.auth import get_user_model
+from notes.models import Note
+from notifications.models import Notification
+from packing_lists.models import PackingItem, PackingList
+from shopping_list.models import ShoppingItem, ShoppingList
+from trips.models import Trip
+
+User = get_user_model()
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+
+    username = factory.Sequence(lambda n: f"user{n}")
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    password = factory.PostGenerationMethodCall("set_password", "testpass123")
+
+
+class TripFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Trip
+
+    title = "Test Trip"
+    destination = "Paris"
+    start_date = date(2026, 7, 1)
+    end_date = date(2026, 7, 14)
+    owner = factory.SubFactory(UserFactory)
+
+
+class PackingListFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = PackingList
+
+    trip = factory.SubFactory(TripFactory)
+    list_type = "private"
+    user = factory.SubFactory(UserFactory)
+
+
+class PackingItemFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = PackingItem
+
+    packing_list = factory.SubFactory(PackingListFactory)
+    item_name = factory.Sequence(lambda n: f"Item {n}")
+    item_quantity = 1
+    added_by = factory.SubFactory(UserFactory)
+
+
+class ShoppingListFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ShoppingList
+
+    trip = factory.SubFactory(TripFactory)
+
+
+class ShoppingItemFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ShoppingItem
+
+    shopping_list = factory.SubFactory(ShoppingListFactory)
+    item_name = factory.Sequence(lambda n: f"Item {n}")
+    item_quantity = 1
+    added_by = factory.SubFactory(UserFactory)
+
+
+class NoteFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Note
+
+    title = "Test Note"
+    content = "Some content"
+    note_type = "private"
+    user = factory.SubFactory(UserFactory)
+    trip = factory.SubFactory(TripFactory)
+
+
+class NotificationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Notification
+
+    recipient = factory.SubFactory(UserFactory)
+    sender = factory.SubFactory(UserFactory)
+    notification_type = "trip_invite"
+    trip = factory.SubFactory(TripFactory)
+    message = "You have been invited to a trip."
+    is_read = False
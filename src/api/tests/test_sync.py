@@ -0,0 +1,234 @@
+import json
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from packing_lists.models import PackingItem
+from shopping_list.models import ShoppingItem
+from api.sync import decode_token, encode_token
+from api.tasks import prune_sync_tombstones
+from .factories import (
+    UserFactory,
+    TripFactory,
+    PackingListFactory,
+    PackingItemFactory,
+    ShoppingListFactory,
+    ShoppingItemFactory,
+)
+
+
+class SyncTokenTest(TestCase):
+
+    def test_round_trips_to_the_microsecond(self):
+        moment = timezone.now()
+
+        self.assertEqual(decode_token(encode_token(moment)), moment)
+
+
+class PackingItemSyncTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.packing_list = PackingListFactory(
+            trip=self.trip, user=None, list_type="shared"
+        )
+        self.url = reverse(
+            "api-packing-items-sync", kwargs={"pk": self.packing_list.pk}
+        )
+        self.client.force_login(self.user)
+
+    def push(self, changes, token=None):
+        return self.client.post(
+            self.url,
+            data=json.dumps({"token": token, "changes": changes}),
+            content_type="application/json",
+        )
+
+    def test_first_sync_returns_the_whole_list(self):
+        item = PackingItemFactory(packing_list=self.packing_list)
+        PackingItemFactory(packing_list=self.packing_list).delete()
+
+        data = self.client.get(self.url).json()
+
+        self.assertTrue(data["reset"])
+        self.assertEqual([row["id"] for row in data["changed"]], [item.pk])
+        self.assertEqual(data["deleted"], [])
+        self.assertTrue(data["token"])
+
+    def test_resync_returns_only_changes_and_tombstones(self):
+        old = PackingItemFactory(packing_list=self.packing_list)
+        gone = PackingItemFactory(packing_list=self.packing_list)
+        edited = PackingItemFactory(packing_list=self.packing_list)
+        long_ago = timezone.now() - timedelta(hours=1)
+        PackingItem.objects.update(updated_at=long_ago)
+        token = encode_token(long_ago + timedelta(minutes=1))
+
+        gone.delete()
+        edited.marked_as_packed(self.user)
+
+        data = self.client.get(self.url, {"token": token}).json()
+
+        self.assertFalse(data["reset"])
+        self.assertEqual([row["id"] for row in data["changed"]], [edited.pk])
+        self.assertEqual(data["deleted"], [gone.pk])
+        self.assertNotIn(old.pk, [row["id"] for row in data["changed"]])
+
+    def test_token_older_than_tombstones_forces_full_resync(self):
+        PackingItemFactory(packing_list=self.packing_list)
+        token = encode_token(timezone.now() - timedelta(days=365))
+
+        data = self.client.get(self.url, {"token": token}).json()
+
+        self.assertTrue(data["reset"])
+        self.assertEqual(len(data["changed"]), 1)
+
+    def test_pushes_queued_mutations_in_order(self):
+        item = PackingItemFactory(packing_list=self.packing_list)
+        doomed = PackingItemFactory(packing_list=self.packing_list)
+
+        data = self.push(
+            [
+                {"op": "create", "client_id": "a1", "item_name": "Tent"},
+                {"op": "update", "id": item.pk, "version": 0, "is_packed": True},
+                {"op": "delete", "id": doomed.pk, "version": 0},
+            ]
+        ).json()
+
+        self.assertEqual(
+            [outcome["status"] for outcome in data["applied"]], ["ok", "ok", "ok"]
+        )
+        self.assertEqual(data["applied"][0]["client_id"], "a1")
+        item.refresh_from_db()
+        self.assertTrue(item.is_packed)
+        self.assertEqual(item.packed_by, self.user)
+        self.assertFalse(PackingItem.objects.filter(pk=doomed.pk).exists())
+        self.assertTrue(PackingItem.all_objects.filter(pk=doomed.pk).exists())
+        self.packing_list.refresh_from_db()
+        self.assertEqual(
+            (self.packing_list.item_count, self.packing_list.packed_count), (2, 1)
+        )
+        self.assertEqual(data["version"], self.packing_list.version)
+
+    def test_stale_and_invalid_changes_are_reported_not_applied(self):
+        item = PackingItemFactory(packing_list=self.packing_list, item_name="Hat")
+        item.marked_as_packed(self.user)
+
+        data = self.push(
+            [
+                {"op": "update", "id": item.pk, "version": 0, "item_name": "Cap"},
+                {"op": "create", "item_name": "Socks", "item_quantity": 0},
+                {"op": "delete", "id": 999},
+                {"op": "rename"},
+            ]
+        ).json()
+
+        self.assertEqual(
+            [outcome["status"] for outcome in data["applied"]],
+            ["conflict", "invalid", "not_found", "invalid"],
+        )
+        item.refresh_from_db()
+        self.assertEqual(item.item_name, "Hat")
+
+    def test_items_of_another_list_cannot_be_touched(self):
+        other = PackingItemFactory()
+
+        data = self.push([{"op": "delete", "id": other.pk}]).json()
+
+        self.assertEqual(data["applied"][0]["status"], "not_found")
+        self.assertTrue(PackingItem.objects.filter(pk=other.pk).exists())
+
+    def test_items_are_loaded_in_one_query(self):
+        items = [PackingItemFactory(packing_list=self.packing_list) for _ in range(5)]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.push(
+                [{"op": "update", "id": item.pk, "item_quantity": 2} for item in items]
+            )
+
+        selects = [
+            q
+            for q in queries
+            if q["sql"].startswith('SELECT "packing_lists_packingitem"')
+        ]
+        # the bulk load and the change feed
+        self.assertEqual(len(selects), 2)
+
+    def test_private_list_of_someone_else_is_forbidden(self):
+        private = PackingListFactory(trip=self.trip, list_type="private")
+        url = reverse("api-packing-items-sync", kwargs={"pk": private.pk})
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_bad_token_is_rejected(self):
+        response = self.client.get(self.url, {"token": "???"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid sync token."})
+
+    def test_non_string_token_is_rejected(self):
+        response = self.push([], token=12)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid sync token."})
+
+
+class ShoppingItemSyncTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.shopping_list = ShoppingListFactory(trip=self.trip)
+        self.url = reverse(
+            "api-shopping-items-sync", kwargs={"pk": self.shopping_list.pk}
+        )
+        self.client.force_login(self.user)
+
+    def push(self, changes):
+        return self.client.post(
+            self.url,
+            data=json.dumps({"changes": changes}),
+            content_type="application/json",
+        )
+
+    def test_duplicate_name_is_reported(self):
+        ShoppingItemFactory(shopping_list=self.shopping_list, item_name="Eggs")
+
+        data = self.push([{"op": "create", "item_name": " eggs"}]).json()
+
+        self.assertEqual(data["applied"][0]["status"], "duplicate")
+
+    def test_deleted_name_can_be_added_again(self):
+        ShoppingItemFactory(shopping_list=self.shopping_list, item_name="Eggs").delete()
+
+        data = self.push([{"op": "create", "item_name": "Eggs"}]).json()
+
+        self.assertEqual(data["applied"][0]["status"], "ok")
+        self.assertEqual(ShoppingItem.all_objects.count(), 2)
+
+    def test_purchase_records_the_buyer(self):
+        item = ShoppingItemFactory(shopping_list=self.shopping_list)
+
+        self.push([{"op": "update", "id": item.pk, "is_purchased": True}])
+
+        item.refresh_from_db()
+        self.assertEqual(item.purchased_by, self.user)
+
+
+class PruneSyncTombstonesTest(TestCase):
+
+    def test_drops_only_old_tombstones(self):
+        recent = PackingItemFactory()
+        recent.delete()
+        old = ShoppingItemFactory()
+        old.delete()
+        ShoppingItem.all_objects.filter(pk=old.pk).update(
+            deleted_at=timezone.now() - timedelta(days=60)
+        )
+
+        self.assertEqual(prune_sync_tombstones(), 1)
+        self.assertTrue(PackingItem.all_objects.filter(pk=recent.pk).exists())
+        self.assertFalse(ShoppingItem.all_objects.filter(pk=old.pk).exists())
@@ -0,0 +1,454 @@
+import json
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from trips.models import TripInvite, TripMember
+from .factories import (
+    UserFactory,
+    TripFactory,
+    PackingListFactory,
+    PackingItemFactory,
+    ShoppingListFactory,
+    ShoppingItemFactory,
+    NoteFactory,
+    NotificationFactory,
+)
+
+
+def selects(queries, table):
+    return [q for q in queries if q["sql"].startswith(f'SELECT "{table}"')]
+
+
+class ApiAuthTest(TestCase):
+
+    def test_anonymous_gets_json_401(self):
+        response = self.client.get(reverse("api-trip-list"))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"error": "Authentication required."})
+
+    def test_missing_csrf_token_gets_json_403(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(UserFactory())
+        url = reverse("api-trip-invite-batch", kwargs={"pk": TripFactory().pk})
+
+        response = client.post(url, data="{}", content_type="application/json")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {"error": "CSRF token missing or incorrect."})
+
+    def test_token_from_csrf_endpoint_is_accepted(self):
+        client = Client(enforce_csrf_checks=True)
+        user = UserFactory()
+        client.force_login(user)
+        token = client.get(reverse("api-csrf-token")).json()["csrf_token"]
+        url = reverse(
+            "api-trip-invite-batch", kwargs={"pk": TripFactory(owner=user).pk}
+        )
+
+        response = client.post(
+            url,
+            data=json.dumps({"users": [UserFactory().pk]}),
+            content_type="application/json",
+            HTTP_X_CSRFTOKEN=token,
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_csrf_failure_outside_the_api_is_a_page(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(UserFactory())
+
+        response = client.post(reverse("trip-create"))
+
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(response["Content-Type"].startswith("text/html"))
+
+    def test_writes_are_not_allowed(self):
+        self.client.force_login(UserFactory())
+        response = self.client.post(reverse("api-trip-list"))
+
+        self.assertEqual(response.status_code, 405)
+
+
+class TripApiTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user, title="Alps")
+        self.client.force_login(self.user)
+
+    def test_lists_owned_and_joined_trips(self):
+        joined = TripFactory(title="Rome")
+        TripMember.objects.create(trip=joined, user=self.user)
+        TripFactory(title="Someone else's")
+
+        response = self.client.get(reverse("api-trip-list"))
+
+        self.assertEqual(
+            [trip["title"] for trip in response.json()["results"]], ["Rome", "Alps"]
+        )
+        self.assertEqual(
+            set(response.json()["results"][1]),
+            {
+                "id",
+                "title",
+                "destination",
+                "start_date",
+                "end_date",
+                "version",
+                "owner_id",
+                "owner_username",
+            },
+        )
+
+    def test_cursor_pages_through_trips(self):
+        for _ in range(4):
+            TripFactory(owner=self.user)
+
+        first = self.client.get(reverse("api-trip-list"), {"limit": 3}).json()
+        second = self.client.get(
+            reverse("api-trip-list"), {"limit": 3, "cursor": first["next"]}
+        ).json()
+
+        self.assertEqual(len(first["results"]), 3)
+        self.assertEqual(len(second["results"]), 2)
+        self.assertIsNone(second["next"])
+        ids = [trip["id"] for trip in first["results"] + second["results"]]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse("api-trip-list"), {"cursor": "nope!"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_query_count_does_not_grow_with_trips(self):
+        for _ in range(20):
+            TripFactory(owner=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("api-trip-list"))
+
+        self.assertEqual(len(selects(queries, "trips_trip")), 1)
+
+    def test_owner_sees_members_and_pending_invites(self):
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        invited = UserFactory()
+        TripInvite.objects.create(trip=self.trip, invited_by=self.user, user=invited)
+
+        data = self.client.get(
+            reverse("api-trip-detail", kwargs={"pk": self.trip.pk})
+        ).json()
+
+        self.assertEqual(data["title"], "Alps")
+        self.assertEqual(
+            {m["username"] for m in data["members"]},
+            {self.user.username, member.username},
+        )
+        self.assertEqual([i["user_id"] for i in data["invites"]], [invited.pk])
+
+    def test_member_does_not_see_invites(self):
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        self.client.force_login(member)
+
+        data = self.client.get(
+            reverse("api-trip-detail", kwargs={"pk": self.trip.pk})
+        ).json()
+
+        self.assertNotIn("invites", data)
+
+    def test_non_member_gets_403(self):
+        self.client.force_login(UserFactory())
+        response = self.client.get(
+            reverse("api-trip-detail", kwargs={"pk": self.trip.pk})
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_missing_trip_gets_json_404(self):
+        response = self.client.get(reverse("api-trip-detail", kwargs={"pk": 999}))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"error": "Not found."})
+
+
+class TripFieldsAndIncludesTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+
+    def test_fields_limits_the_payload(self):
+        trip = TripFactory(owner=self.user, title="Alps")
+
+        data = self.client.get(
+            reverse("api-trip-detail", kwargs={"pk": trip.pk}),
+            {"fields": "title,owner_username", "include": ""},
+        ).json()
+
+        self.assertEqual(
+            data,
+            {"id": trip.pk, "title": "Alps", "owner_username": self.user.username},
+        )
+
+    def test_unknown_field_or_include_is_rejected(self):
+        url = reverse("api-trip-list")
+
+        self.assertEqual(self.client.get(url, {"fields": "secret"}).status_code, 400)
+        self.assertEqual(
+            self.client.get(url, {"include": "everything"}).json(),
+            {"error": 'Unknown include "everything".'},
+        )
+
+    def test_embeds_members_shopping_list_and_my_packing_lists(self):
+        trip = TripFactory(owner=self.user)
+        shopping_list = ShoppingListFactory(trip=trip)
+        ShoppingItemFactory(shopping_list=shopping_list)
+        mine = PackingListFactory(trip=trip, user=self.user)
+        other = UserFactory()
+        TripMember.objects.create(trip=trip, user=other)
+        PackingListFactory(trip=trip, user=other)
+
+        data = self.client.get(
+            reverse("api-trip-detail", kwargs={"pk": trip.pk}),
+            {"include": "members,shopping_list,packing_lists"},
+        ).json()
+
+        self.assertEqual(len(data["members"]), 2)
+        self.assertEqual(
+            data["shopping_list"],
+            {
+                "id": shopping_list.pk,
+                "item_count": 1,
+                "purchased_count": 0,
+                "version": 1,
+            },
+        )
+        self.assertEqual([p["id"] for p in data["packing_lists"]], [mine.pk])
+        self.assertNotIn("invites", data)
+
+    def test_trip_without_shopping_list_embeds_null(self):
+        trip = TripFactory(owner=self.user)
+
+        data = self.client.get(
+            reverse("api-trip-detail", kwargs={"pk": trip.pk}),
+            {"include": "shopping_list"},
+        ).json()
+
+        self.assertIsNone(data["shopping_list"])
+
+    def test_includes_cost_one_query_each_whatever_the_page_size(self):
+        for _ in range(5):
+            trip = TripFactory(owner=self.user)
+            ShoppingListFactory(trip=trip)
+            PackingListFactory(trip=trip, user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("api-trip-list"),
+                {"include": "members,invites,shopping_list,packing_lists"},
+            )
+
+        self.assertEqual(len(response.json()["results"]), 5)
+        self.assertEqual(len(selects(queries, "trips_trip")), 1)
+        self.assertEqual(len(selects(queries, "trips_tripmember")), 1)
+        self.assertEqual(len(selects(queries, "trips_tripinvite")), 1)
+        self.assertEqual(len(selects(queries, "packing_lists_packinglist")), 1)
+        self.assertEqual(len(selects(queries, "shopping_list_shoppinglist")), 0)
+
+
+class TripInviteBatchApiTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.url = reverse("api-trip-invite-batch", kwargs={"pk": self.trip.pk})
+        self.client.force_login(self.user)
+
+    def post(self, users):
+        return self.client.post(
+            self.url, data=json.dumps({"users": users}), content_type="application/json"
+        )
+
+    def test_returns_per_user_outcomes(self):
+        invited = UserFactory()
+
+        data = self.post([invited.pk, "ghost@example.com"]).json()
+
+        self.assertEqual(data["invited"], 1)
+        self.assertEqual(
+            [r["status"] for r in data["results"]], ["invited", "not_found"]
+        )
+
+    def test_only_the_owner_can_invite(self):
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        self.client.force_login(member)
+
+        self.assertEqual(self.post([UserFactory().pk]).status_code, 403)
+
+    def test_users_must_be_a_list(self):
+        self.assertEqual(self.post("everyone").status_code, 400)
+
+
+class PackingListApiTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.private = PackingListFactory(trip=self.trip, user=self.user)
+        self.shared = PackingListFactory(trip=self.trip, user=None, list_type="shared")
+        self.client.force_login(self.user)
+
+    def test_member_sees_shared_but_not_others_private_lists(self):
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        self.client.force_login(member)
+
+        response = self.client.get(
+            reverse("api-trip-packing-lists", kwargs={"pk": self.trip.pk})
+        )
+
+        self.assertEqual(
+            [p["id"] for p in response.json()["results"]], [self.shared.pk]
+        )
+
+    def test_items_are_compact_rows(self):
+        item = PackingItemFactory(packing_list=self.shared, item_name="Socks")
+        item.marked_as_packed(self.user)
+
+        data = self.client.get(
+            reverse("api-packing-items", kwargs={"pk": self.shared.pk})
+        ).json()
+
+        self.assertEqual(
+            data["results"],
+            [
+                {
+                    "id": item.pk,
+                    "item_name": "Socks",
+                    "item_quantity": 1,
+                    "is_packed": True,
+                    "version": 1,
+                    "packed_by_username": self.user.username,
+                }
+            ],
+        )
+
+    def test_private_list_is_forbidden_to_others(self):
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        self.client.force_login(member)
+
+        response = self.client.get(
+            reverse("api-packing-items", kwargs={"pk": self.private.pk})
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
+class ShoppingListApiTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.shopping_list = ShoppingListFactory(trip=self.trip)
+        self.client.force_login(self.user)
+
+    def test_summary_and_items(self):
+        ShoppingItemFactory(shopping_list=self.shopping_list, item_name="Eggs")
+
+        summary = self.client.get(
+            reverse("api-trip-shopping-list", kwargs={"pk": self.trip.pk})
+        ).json()
+        items = self.client.get(
+            reverse("api-shopping-items", kwargs={"pk": self.shopping_list.pk})
+        ).json()
+
+        self.assertEqual(summary["id"], self.shopping_list.pk)
+        self.assertEqual(summary["item_count"], 1)
+        self.assertEqual([i["item_name"] for i in items["results"]], ["Eggs"])
+
+    def test_non_member_gets_403(self):
+        self.client.force_login(UserFactory())
+        response = self.client.get(
+            reverse("api-shopping-items", kwargs={"pk": self.shopping_list.pk})
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
+class NoteApiTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.client.force_login(self.user)
+
+    def test_trip_notes_skip_other_users_private_notes(self):
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        shared = NoteFactory(trip=self.trip, user=member, note_type="shared")
+        NoteFactory(trip=self.trip, user=member, note_type="private")
+
+        response = self.client.get(
+            reverse("api-trip-notes", kwargs={"pk": self.trip.pk})
+        )
+
+        results = response.json()["results"]
+        self.assertEqual([n["id"] for n in results], [shared.pk])
+        self.assertNotIn("content", results[0])
+
+    def test_detail_includes_content(self):
+        note = NoteFactory(trip=self.trip, user=self.user, content="Pack light")
+
+        data = self.client.get(reverse("api-note-detail", kwargs={"pk": note.pk}))
+
+        self.assertEqual(data.json()["content"], "Pack light")
+
+    def test_hidden_note_is_404(self):
+        note = NoteFactory(trip=self.trip, note_type="private")
+
+        response = self.client.get(reverse("api-note-detail", kwargs={"pk": note.pk}))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class NotificationApiTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+
+    def test_lists_own_notifications_with_unread_filter(self):
+        unread = NotificationFactory(recipient=self.user)
+        NotificationFactory(recipient=self.user, is_read=True)
+        NotificationFactory()
+
+        response = self.client.get(reverse("api-notification-list"), {"unread": 1})
+
+        self.assertEqual([n["id"] for n in response.json()["results"]], [unread.pk])
+
+    def test_lists_pending_invites(self):
+        trip = TripFactory(title="Lisbon")
+        invite = TripInvite.objects.create(
+            trip=trip, invited_by=trip.owner, user=self.user
+        )
+
+        response = self.client.get(reverse("api-invite-list"))
+
+        self.assertEqual(response.json()["results"][0]["id"], invite.pk)
+        self.assertEqual(response.json()["results"][0]["trip_title"], "Lisbon")
+
+    def test_fields_apply_to_collections(self):
+        NotificationFactory(recipient=self.user, message="Hi")
+
+        response = self.client.get(
+            reverse("api-notification-list"), {"fields": "message"}
+        )
+
+        self.assertEqual(list(response.json()["results"][0]), ["id", "message"])
@@ -0,0 +1,66 @@
+from django.urls import path
+from .views import (
+    InviteListApiView,
+    NoteDetailApiView,
+    NotificationListApiView,
+    PackingItemsApiView,
+    PackingItemsSyncApiView,
+    ShoppingItemsApiView,
+    ShoppingItemsSyncApiView,
+    TripDetailApiView,
+    TripInviteBatchApiView,
+    TripListApiView,
+    TripNotesApiView,
+    TripPackingListsApiView,
+    TripShoppingListApiView,
+    csrf_token,
+)
+
+urlpatterns = [
+    path("csrf/", csrf_token, name="api-csrf-token"),
+    path("trips/", TripListApiView.as_view(), name="api-trip-list"),
+    path("trips/<int:pk>/", TripDetailApiView.as_view(), name="api-trip-detail"),
+    path(
+        "trips/<int:pk>/packing-lists/",
+        TripPackingListsApiView.as_view(),
+        name="api-trip-packing-lists",
+    ),
+    path(
+        "trips/<int:pk>/shopping-list/",
+        TripShoppingListApiView.as_view(),
+        name="api-trip-shopping-list",
+    ),
+    path(
+        "trips/<int:pk>/invites/",
+        TripInviteBatchApiView.as_view(),
+        name="api-trip-invite-batch",
+    ),
+    path("trips/<int:pk>/notes/", TripNotesApiView.as_view(), name="api-trip-notes"),
+    path(
+        "packing-lists/<int:pk>/items/",
+        PackingItemsApiView.as_view(),
+        name="api-packing-items",
+    ),
+    path(
+        "packing-lists/<int:pk>/sync/",
+        PackingItemsSyncApiView.as_view(),
+        name="api-packing-items-sync",
+    ),
+    path(
+        "shopping-lists/<int:pk>/items/",
+        ShoppingItemsApiView.as_view(),
+        name="api-shopping-items",
+    ),
+    path(
+        "shopping-lists/<int:pk>/sync/",
+        ShoppingItemsSyncApiView.as_view(),
+        name="api-shopping-items-sync",
+    ),
+    path("notes/<int:pk>/", NoteDetailApiView.as_view(), name="api-note-detail"),
+    path(
+        "notifications/",
+        NotificationListApiView.as_view(),
+        name="api-notification-list",
+    ),
+    path("invites/", InviteListApiView.as_view(), name="api-invite-list"),
+]
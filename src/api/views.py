@@ -0,0 +1,394 @@
+import json
+
+from django.core.exceptions import PermissionDenied
+from django.db.models import Prefetch, Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.middleware.csrf import get_token
+from django.views import View
+from django.views.csrf import csrf_failure as default_csrf_failure
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.http import require_GET
+from notes.models import Note
+from notifications.models import Notification
+from packing_lists.models import PackingList
+from packing_lists.views.packing_list_views import (
+    user_can_access_packing_list,
+    user_can_access_trip,
+)
+from shopping_list.models import ShoppingList
+from trips.forms import MAX_BATCH_INVITES
+from trips.models import Trip, TripInvite, TripMember
+from .pagination import InvalidCursor, paginate
+from .sync import PackingItemSync, ShoppingItemSync
+from .fields import (
+    EMBEDDED_SHOPPING_LIST,
+    INVITE_FIELDS,
+    NOTE_DETAIL_FIELDS,
+    NOTE_FIELDS,
+    NOTIFICATION_FIELDS,
+    PACKING_ITEM_FIELDS,
+    PACKING_LIST_FIELDS,
+    SHOPPING_ITEM_FIELDS,
+    SHOPPING_LIST_FIELDS,
+    TRIP_FIELDS,
+    TRIP_INCLUDES,
+)
+from .query import (
+    InvalidQuery,
+    related_paths,
+    requested_fields,
+    requested_includes,
+    resolve,
+    select_values,
+)
+
+
+def api_response(data, status=200):
+    # no whitespace between tokens, payloads are read by apps, not people
+    return JsonResponse(
+        data, status=status, json_dumps_params={"separators": (",", ":")}
+    )
+
+
+def api_error(message, status):
+    return api_response({"error": message}, status=status)
+
+
+def get_trip(user, pk):
+    """Trip the user is owner or participant of, 404/403 otherwise"""
+    trip = get_object_or_404(Trip, pk=pk)
+    if not user_can_access_trip(user, trip):
+        raise PermissionDenied
+    return trip
+
+
+@require_GET
+@ensure_csrf_cookie
+def csrf_token(request):
+    """Token for POSTs from apps - sent back in the X-CSRFToken header
+
+    The API uses the session cookie, so unsafe requests need the token
+    like forms do. Apps GET this once, keep the csrftoken cookie it sets
+    and send the token with every POST. It changes when the user logs in.
+    """
+    return api_response({"csrf_token": get_token(request)})
+
+
+def csrf_failure(request, reason=""):
+    """CSRF_FAILURE_VIEW - a JSON error under /api/, Django's page elsewhere"""
+    if request.path_info.startswith("/api/"):
+        return api_error("CSRF token missing or incorrect.", 403)
+    return default_csrf_failure(request, reason)
+
+
+class ApiView(View):
+    """JSON view, errors are JSON too instead of redirects and pages
+
+    POSTs need a CSRF token, see csrf_token().
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return api_error("Authentication required.", 401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return api_error("Not found.", 404)
+        except PermissionDenied:
+            return api_error("You do not have access to this resource.", 403)
+        except InvalidCursor:
+            return api_error("Invalid cursor.", 400)
+        except InvalidQuery as error:
+            return api_error(str(error), 400)
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        response = api_error("Method not allowed.", 405)
+        response["Allow"] = ", ".join(self._allowed_methods())
+        return response
+
+
+def trip_queryset(user, names, includes):
+    """Trips the user can see with just the requested columns and relations
+
+    Owner and shopping list are joined in, every other include is one
+    Prefetch query however many trips are on the page.
+    """
+    paths = {TRIP_FIELDS[name] for name in names} | {"owner_id"}
+    prefetches = []
+
+    if "shopping_list" in includes:
+        paths.update(f"shopping_list__{field}" for field in EMBEDDED_SHOPPING_LIST)
+    if "members" in includes:
+        members = TripMember.objects.select_related("user").only(
+            "trip", "role", "joined_at", "user__username"
+        )
+        prefetches.append(Prefetch("members", queryset=members))
+    if "invites" in includes:
+        invites = (
+            TripInvite.objects.filter(status="pending", trip__owner=user)
+            .select_related("user")
+            .only("trip", "created_at", "expires_at", "user__username")
+        )
+        prefetches.append(
+            Prefetch("invites", queryset=invites, to_attr="pending_invites")
+        )
+    if "packing_lists" in includes:
+        packing_lists = PackingList.objects.filter(
+            Q(list_type="private", user=user) | Q(list_type="shared")
+        ).only("trip", *PACKING_LIST_FIELDS.values())
+        prefetches.append(
+            Prefetch(
+                "packing_lists", queryset=packing_lists, to_attr="visible_packing_lists"
+            )
+        )
+
+    member_trips = TripMember.objects.filter(user=user).values("trip_id")
+    return (
+        Trip.objects.filter(Q(owner=user) | Q(pk__in=member_trips))
+        .select_related(*related_paths(paths))
+        .only(*paths)
+        .prefetch_related(*prefetches)
+    )
+
+
+def trip_payload(trip, names, includes, user):
+    data = {name: resolve(trip, TRIP_FIELDS[name]) for name in names}
+
+    if "members" in includes:
+        data["members"] = [
+            {
+                "user_id": member.user_id,
+                "username": member.user.username,
+                "role": member.role,
+                "joined_at": member.joined_at,
+            }
+            for member in trip.members.all()
+        ]
+    if "invites" in includes and trip.owner_id == user.pk:
+        data["invites"] = [
+            {
+                "id": invite.pk,
+                "user_id": invite.user_id,
+                "username": invite.user.username,
+                "created_at": invite.created_at,
+                "expires_at": invite.expires_at,
+            }
+            for invite in trip.pending_invites
+        ]
+    if "shopping_list" in includes:
+        try:
+            shopping_list = trip.shopping_list
+        except ShoppingList.DoesNotExist:
+            data["shopping_list"] = None
+        else:
+            data["shopping_list"] = {
+                field: getattr(shopping_list, field) for field in EMBEDDED_SHOPPING_LIST
+            }
+    if "packing_lists" in includes:
+        data["packing_lists"] = [
+            {
+                name: getattr(packing_list, path)
+                for name, path in PACKING_LIST_FIELDS.items()
+            }
+            for packing_list in trip.visible_packing_lists
+        ]
+    return data
+
+
+class TripListApiView(ApiView):
+    def get(self, request):
+        names = requested_fields(request, TRIP_FIELDS)
+        includes = requested_includes(request, TRIP_INCLUDES)
+
+        page = paginate(request, trip_queryset(request.user, names, includes))
+        page["results"] = [
+            trip_payload(trip, names, includes, request.user)
+            for trip in page["results"]
+        ]
+        return api_response(page)
+
+
+class TripDetailApiView(ApiView):
+    def get(self, request, pk):
+        names = requested_fields(request, TRIP_FIELDS)
+        includes = requested_includes(
+            request, TRIP_INCLUDES, default=("members", "invites")
+        )
+
+        try:
+            trip = trip_queryset(request.user, names, includes).get(pk=pk)
+        except Trip.DoesNotExist:
+            if Trip.objects.filter(pk=pk).exists():
+                raise PermissionDenied
+            raise Http404
+        return api_response(trip_payload(trip, names, includes, request.user))
+
+
+class TripInviteBatchApiView(ApiView):
+    """POST {"users": [id, email or username, ...]} - invites them all at once
+
+    Only JSON numbers are taken as ids, strings are emails or usernames.
+    """
+
+    http_method_names = ["post", "options"]
+
+    def post(self, request, pk):
+        trip = get_object_or_404(Trip, pk=pk)
+        if trip.owner_id != request.user.pk:
+            raise PermissionDenied
+
+        try:
+            users = json.loads(request.body).get("users")
+        except (ValueError, AttributeError):
+            return api_error("Request body must be a JSON object.", 400)
+        if not isinstance(users, list) or not users:
+            return api_error("users must be a non-empty list.", 400)
+        if len(users) > MAX_BATCH_INVITES:
+            return api_error(f"At most {MAX_BATCH_INVITES} users per request.", 400)
+
+        outcomes = TripInvite.invite_many(trip, request.user, users)
+        return api_response(
+            {
+                "results": outcomes,
+                "invited": sum(o["status"] == "invited" for o in outcomes),
+            }
+        )
+
+
+class TripPackingListsApiView(ApiView):
+    def get(self, request, pk):
+        trip = get_trip(request.user, pk)
+        packing_lists = PackingList.objects.filter(
+            Q(trip=trip, user=request.user, list_type="private")
+            | Q(trip=trip, list_type="shared")
+        )
+        packing_lists = select_values(request, packing_lists, PACKING_LIST_FIELDS)
+        return api_response(paginate(request, packing_lists))
+
+
+class PackingItemsApiView(ApiView):
+    def get(self, request, pk):
+        packing_list = get_object_or_404(
+            PackingList.objects.select_related("trip"), pk=pk
+        )
+        if not user_can_access_packing_list(request.user, packing_list):
+            raise PermissionDenied
+
+        items = select_values(request, packing_list.items.all(), PACKING_ITEM_FIELDS)
+        page = paginate(request, items)
+        page["version"] = packing_list.version
+        return api_response(page)
+
+
+class ItemSyncApiView(ApiView):
+    """GET pulls changes since ?token=, POST also pushes {"token", "changes"}"""
+
+    http_method_names = ["get", "post", "options"]
+    sync_class = None
+
+    def get_list(self):
+        raise NotImplementedError
+
+    def get(self, request, pk):
+        sync = self.sync_class(self.get_list(), request.user)
+        return api_response(sync.sync(request.GET.get("token"), []))
+
+    def post(self, request, pk):
+        sync = self.sync_class(self.get_list(), request.user)
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return api_error("Request body must be JSON.", 400)
+        if not isinstance(data, dict):
+            return api_error("Request body must be a JSON object.", 400)
+        return api_response(sync.sync(data.get("token"), data.get("changes", [])))
+
+
+class PackingItemsSyncApiView(ItemSyncApiView):
+    sync_class = PackingItemSync
+
+    def get_list(self):
+        packing_list = get_object_or_404(
+            PackingList.objects.select_related("trip"), pk=self.kwargs["pk"]
+        )
+        if not user_can_access_packing_list(self.request.user, packing_list):
+            raise PermissionDenied
+        return packing_list
+
+
+class TripShoppingListApiView(ApiView):
+    def get(self, request, pk):
+        trip = get_trip(request.user, pk)
+        shopping_list = get_object_or_404(
+            select_values(request, ShoppingList.objects.all(), SHOPPING_LIST_FIELDS),
+            trip=trip,
+        )
+        return api_response(shopping_list)
+
+
+class ShoppingItemsApiView(ApiView):
+    def get(self, request, pk):
+        shopping_list = get_object_or_404(
+            ShoppingList.objects.select_related("trip"), pk=pk
+        )
+        if not user_can_access_trip(request.user, shopping_list.trip):
+            raise PermissionDenied
+
+        items = select_values(
+            request, shopping_list.shopping_items.all(), SHOPPING_ITEM_FIELDS
+        )
+        page = paginate(request, items)
+        page["version"] = shopping_list.version
+        return api_response(page)
+
+
+class ShoppingItemsSyncApiView(ItemSyncApiView):
+    sync_class = ShoppingItemSync
+
+    def get_list(self):
+        shopping_list = get_object_or_404(
+            ShoppingList.objects.select_related("trip"), pk=self.kwargs["pk"]
+        )
+        if not user_can_access_trip(self.request.user, shopping_list.trip):
+            raise PermissionDenied
+        return shopping_list
+
+
+class TripNotesApiView(ApiView):
+    def get(self, request, pk):
+        trip = get_trip(request.user, pk)
+        notes = Note.objects.visible_to(request.user).filter(trip=trip)
+        notes = select_values(request, notes, NOTE_FIELDS)
+        return api_response(paginate(request, notes))
+
+
+class NoteDetailApiView(ApiView):
+    def get(self, request, pk):
+        # notes the user can't see are reported as missing, not forbidden
+        note = get_object_or_404(
+            select_values(
+                request, Note.objects.visible_to(request.user), NOTE_DETAIL_FIELDS
+            ),
+            pk=pk,
+        )
+        return api_response(note)
+
+
+class NotificationListApiView(ApiView):
+    def get(self, request):
+        notifications = Notification.objects.filter(recipient=request.user)
+        if request.GET.get("unread"):
+            notifications = notifications.filter(is_read=False)
+
+        notifications = select_values(request, notifications, NOTIFICATION_FIELDS)
+        return api_response(paginate(request, notifications))
+
+
+class InviteListApiView(ApiView):
+    def get(self, request):
+        invites = TripInvite.objects.filter(user=request.user, status="pending")
+        invites = select_values(request, invites, INVITE_FIELDS)
+        return api_response(paginate(request, invites))
@@ -0,0 +1,6 @@
+from .events import streams_events
+
+
+def live_events(request):
+    """Pages only open an EventSource when the server can stream it"""
+    return {"live_events": streams_events(request)}
@@ -0,0 +1,132 @@
+import asyncio
+import contextlib
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryBroker:
+    """Process-local pub/sub - used in tests and single-process development"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers[channel])
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:  # subscriber's event loop already closed
+                pass
+
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+
+        try:
+            while True:
+                yield await subscriber[1].get()
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+
+
+class RedisBroker:
+    """Redis pub/sub - shared by all web processes"""
+
+    def __init__(self, url):
+        import redis
+
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        self._client.publish(channel, message)
+
+    async def subscribe(self, channel):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+
+        try:
+            async for item in pubsub.listen():
+                if item["type"] == "message":
+                    yield item["data"].decode()
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    config = settings.EVENT_BROKER
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+def publish(channel, event, **data):
+    """Sends an event to everyone listening on the channel (best effort)"""
+    message = json.dumps({"event": event, **data})
+    try:
+        get_broker().publish(channel, message)
+    except Exception:
+        logger.exception("Could not publish %s event to %s", event, channel)
+
+
+async def event_stream(channel, heartbeat=15):
+    """Server-Sent Events body relaying channel messages to the client"""
+    subscription = get_broker().subscribe(channel)
+    next_message = asyncio.ensure_future(subscription.__anext__())
+
+    yield "retry: 5000\n\n"
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_message}, timeout=heartbeat)
+            if not done:
+                yield ": keep-alive\n\n"  # keeps proxies from closing the connection
+                continue
+
+            yield f"data: {next_message.result()}\n\n"
+            next_message = asyncio.ensure_future(subscription.__anext__())
+    finally:
+        next_message.cancel()
+        with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+            await next_message
+        await subscription.aclose()
+
+
+def streams_events(request):
+    """Whether the request is served by an ASGI server that can hold a stream
+
+    Under WSGI a streaming response with an async body is read to the end
+    before anything is sent - the stream would never flush and would pin
+    a worker thread for as long as the page stays open.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+def sse_response(request, channel):
+    if not streams_events(request):
+        # 204 tells EventSource to stop reconnecting
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(
+        event_stream(channel), content_type="text/event-stream"
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # no buffering behind nginx
+    return response
@@ -0,0 +1,2 @@
+class VersionConflict(Exception):
+    """Row was changed by someone else since it was read (optimistic locking)"""
@@ -0,0 +1,24 @@
+from django import forms
+from django.core.exceptions import ValidationError
+
+
+class ItemImportForm(forms.Form):
+    text = forms.CharField(
+        required=False,
+        label="Paste items",
+        widget=forms.Textarea(
+            attrs={"rows": 10, "placeholder": "3x socks\ntoothbrush\nsunscreen, 2"}
+        ),
+        help_text='One item per line, e.g. "3x socks" or "socks, 3".',
+    )
+    file = forms.FileField(
+        required=False,
+        label="Or upload a CSV file",
+        help_text="Columns: name, quantity.",
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get("text", "").strip() and not cleaned_data.get("file"):
+            raise ValidationError("Paste some items or choose a file.")
+        return cleaned_data
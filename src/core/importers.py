@@ -0,0 +1,161 @@
+import csv
+import io
+import re
+from dataclasses import dataclass
+
+from django.contrib import messages
+from django.db import transaction
+from django.shortcuts import redirect
+from django.views.generic import FormView
+
+from .forms import ItemImportForm
+
+MAX_IMPORT_ITEMS = 1000
+MAX_NAME_LENGTH = 100
+MAX_QUANTITY = 999
+
+# "3x socks", "3 x socks", "3 socks" and "socks x3", "socks x 3"
+LEADING_QUANTITY = re.compile(r"^(\d+)\s*[x×*]?\s+(.+)$", re.I)
+TRAILING_QUANTITY = re.compile(r"^(.+?)\s+[x×*]\s*(\d+)$", re.I)
+
+
+def normalize_name(name):
+    """Comparison key for item names - case and spacing don't matter"""
+    return " ".join(name.split()).casefold()
+
+
+@dataclass
+class ImportedItem:
+    name: str
+    quantity: int
+    line: int
+
+
+def _split_line(line):
+    """Name and quantity from one pasted line or CSV row, None for a header"""
+    row = [cell.strip() for cell in next(csv.reader([line]), [])]
+    if len(row) == 2:
+        name, quantity = row
+        if name.isdigit() and not quantity.isdigit():
+            name, quantity = quantity, name
+        if quantity.casefold() == "quantity":
+            return None
+        if quantity.isdigit():
+            return name, quantity
+
+    text = line.strip()
+    match = LEADING_QUANTITY.match(text)
+    if match:
+        return match.group(2).strip(), match.group(1)
+
+    match = TRAILING_QUANTITY.match(text)
+    if match:
+        return match.group(1).strip(), match.group(2)
+    return text, "1"
+
+
+def parse_items(lines):
+    """Yields ImportedItem or (line, error) for every non-empty line"""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+
+        parsed = _split_line(line.rstrip("\r\n"))
+        if parsed is None:
+            continue
+
+        name, quantity = parsed
+        if not name:
+            yield number, "missing item name"
+        elif len(name) > MAX_NAME_LENGTH:
+            yield number, f"name longer than {MAX_NAME_LENGTH} characters"
+        elif not quantity.isdigit() or not 1 <= int(quantity) <= MAX_QUANTITY:
+            yield number, f'quantity "{quantity}" is not between 1 and {MAX_QUANTITY}'
+        else:
+            yield ImportedItem(name, int(quantity), number)
+
+
+def collect_items(lines, existing_names):
+    """Parses lines into new items, merging repeats and skipping existing names
+
+    Returns (items, errors, skipped) - names compare case-insensitively.
+    """
+    items, errors, skipped = {}, [], 0
+    existing = {normalize_name(name) for name in existing_names}
+
+    for result in parse_items(lines):
+        if not isinstance(result, ImportedItem):
+            errors.append(result)
+            continue
+
+        key = normalize_name(result.name)
+        if key in existing:
+            skipped += 1
+        elif key in items:
+            items[key].quantity = min(
+                items[key].quantity + result.quantity, MAX_QUANTITY
+            )
+        elif len(items) == MAX_IMPORT_ITEMS:
+            errors.append((result.line, f"more than {MAX_IMPORT_ITEMS} items"))
+            break
+        else:
+            items[key] = result
+
+    return list(items.values()), errors, skipped
+
+
+class ItemImportView(FormView):
+    """Imports pasted or uploaded items into one list with a single bulk_create
+
+    Subclasses point at the list (get_target) and build unsaved items.
+    """
+
+    form_class = ItemImportForm
+    item_model = None
+    name_field = "item_name"
+
+    def get_target(self):
+        raise NotImplementedError
+
+    def get_existing_items(self, target):
+        raise NotImplementedError
+
+    def build_item(self, target, imported):
+        raise NotImplementedError
+
+    def after_import(self, target, created):
+        """Hook for counters and events, runs in the import transaction"""
+
+    def get_success_url(self):
+        raise NotImplementedError
+
+    def get_lines(self, form):
+        upload = form.cleaned_data.get("file")
+        if upload:
+            # read line by line, the upload is never held as one string
+            return io.TextIOWrapper(upload.file, encoding="utf-8-sig", errors="replace")
+        return io.StringIO(form.cleaned_data["text"])
+
+    def form_valid(self, form):
+        target = self.get_target()
+        existing = self.get_existing_items(target).values_list(
+            self.name_field, flat=True
+        )
+        items, errors, skipped = collect_items(self.get_lines(form), existing)
+
+        if errors:
+            for line, error in errors[:10]:
+                form.add_error(None, f"Line {line}: {error}")
+            return self.form_invalid(form)
+
+        with transaction.atomic():
+            created = self.item_model.objects.bulk_create(
+                self.build_item(target, imported) for imported in items
+            )
+            self.after_import(target, created)
+
+        message = f"Imported {len(created)} item{'s' if len(created) != 1 else ''}."
+        if skipped:
+            message += f" Skipped {skipped} already on the list."
+        messages.success(self.request, message)
+        return redirect(self.get_success_url())
@@ -0,0 +1,35 @@
+from django.core.cache import cache
+
+PREFIX = "metrics:"
+
+
+def incr(name, value=1):
+    """Adds to a named counter shared by all processes using the cache"""
+    key = PREFIX + name
+    if cache.add(key, value, timeout=None):
+        return
+    try:
+        cache.incr(key, value)
+    except ValueError:  # evicted between add() and incr()
+        cache.set(key, value, timeout=None)
+
+
+def get(name):
+    return cache.get(PREFIX + name, 0)
+
+
+def window_count(name, window, value=1):
+    """Counts events in the current fixed time window, returns the new total"""
+    key = f"{PREFIX}{name}:{window}"
+    if cache.add(key, value, timeout=120):
+        return value
+    try:
+        return cache.incr(key, value)
+    except ValueError:
+        cache.set(key, value, timeout=120)
+        return value
+
+
+def gauge(name, value):
+    """Stores the latest value of a measurement, e.g. a table size"""
+    cache.set(PREFIX + name, value, timeout=None)
@@ -2,6 +2,7 @@ from pathlib import Path
 import environ
 import os
 import django.core.mail.utils
+from celery.schedules import crontab
 
 env = environ.Env(DEBUG=(bool, False))
 
@@ -23,7 +24,7 @@ environ.Env.read_env(os.path.join(BASE_DIR.parent, ".env"))
 SECRET_KEY = env("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env("DEBUG")
 
 ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
 
@@ -46,6 +47,7 @@ INSTALLED_EXTENSIONS = [
     "shopping_list.apps.ShoppingListConfig",
     "notifications.apps.NotificationsConfig",
     "logs.apps.LogsConfig",
+    "api.apps.ApiConfig",
     "crispy_forms",
     "crispy_bootstrap4",
     "silk",
@@ -70,15 +72,24 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "django.template.context_processors.media",
-                "django.template.context_processors.request",
                 "notifications.context_processors.count_unread_notifications",
+                "core.context_processors.live_events",
+            ],
+            # compiled templates are kept in memory (warmed up in wsgi/asgi)
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                )
             ],
         },
     },
@@ -156,6 +167,9 @@ AUTH_USER_MODEL = "users.CustomUser"
 
 CRISPY_TEMPLATE_PACK = "bootstrap4"
 
+# JSON instead of the HTML 403 page for API requests
+CSRF_FAILURE_VIEW = "api.views.csrf_failure"
+
 LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "profile"
 LOGOUT_REDIRECT_URL = "home"
@@ -168,6 +182,12 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "noreply@tripsync.com"
 SERVER_EMAIL = "noreply@tripsync.com"
 
+# emails per minute and recipient domain the outbox sends before deferring
+EMAIL_RATE_LIMITS = {
+    "default": 120,
+    "gmail.com": 300,
+}
+
 import os
 
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
@@ -181,3 +201,75 @@ CELERY_RESULT_SERIALIZER = "json"
 
 CELERY_TIMEZONE = "Europe/Warsaw"
 CELERY_TASK_TRACK_STARTED = True
+
+CELERY_BEAT_SCHEDULE = {
+    "send-trip-reminders": {
+        "task": "notifications.tasks.send_trip_reminders",
+        "schedule": crontab(hour=8, minute=0),
+    },
+    "prune-notifications": {
+        "task": "notifications.tasks.prune_notifications",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "prune-sync-tombstones": {
+        "task": "api.tasks.prune_sync_tombstones",
+        "schedule": crontab(hour=3, minute=45),
+    },
+    "flush-email-outbox": {
+        "task": "users.tasks.flush_email_outbox",
+        "schedule": crontab(),
+    },
+    "send-immediate-digests": {
+        "task": "notifications.tasks.send_notification_digests",
+        "schedule": crontab(minute="*/5"),
+        "args": ("immediate",),
+    },
+    "send-hourly-digests": {
+        "task": "notifications.tasks.send_notification_digests",
+        "schedule": crontab(minute=0),
+        "args": ("hourly",),
+    },
+    "send-daily-digests": {
+        "task": "notifications.tasks.send_notification_digests",
+        "schedule": crontab(hour=18, minute=0),
+        "args": ("daily",),
+    },
+}
+
+# members are reminded this many days before a trip starts
+TRIP_REMINDER_DAYS = [7, 1]
+
+# read notifications are deleted after this many days, and nobody keeps
+# more than the newest NOTIFICATION_MAX_PER_USER
+NOTIFICATION_RETENTION_DAYS = 90
+NOTIFICATION_MAX_PER_USER = 500
+
+# deleted list items stay this long as tombstones for offline sync,
+# clients that haven't synced since then get the whole list again
+SYNC_TOMBSTONE_DAYS = 30
+
+# Cache - Redis when configured, per-process memory otherwise
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Pub/sub for live updates (Server-Sent Events) - same Redis as the cache
+if REDIS_URL:
+    EVENT_BROKER = {
+        "BACKEND": "core.events.RedisBroker",
+        "OPTIONS": {"url": REDIS_URL},
+    }
+else:
+    EVENT_BROKER = {"BACKEND": "core.events.InMemoryBroker"}
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+
+class LiveManager(models.Manager):
+    """Default manager of soft-deleted models - tombstones stay out of sight
+
+    Deleted rows keep their deleted_at so offline clients can sync the
+    deletion; use `all_objects` to see them.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+def purge_tombstones(model, days):
+    """Hard-deletes rows soft-deleted more than `days` ago, returns the count"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = model.all_objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,32 @@
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+
+TEMPLATE_SUFFIXES = (".html", ".txt")
+
+
+def project_template_names():
+    """Yields names of all templates shipped by the project's own apps"""
+    for app_config in apps.get_app_configs():
+        app_path = Path(app_config.path)
+        if not app_path.is_relative_to(settings.BASE_DIR):
+            continue  # third party app (admin, silk, crispy...)
+
+        template_dir = app_path / "templates"
+        if not template_dir.is_dir():
+            continue
+
+        for path in sorted(template_dir.rglob("*")):
+            if path.suffix in TEMPLATE_SUFFIXES:
+                yield path.relative_to(template_dir).as_posix()
+
+
+def warm_template_cache():
+    """Compiles every project template into the cached loader at process start"""
+    compiled = 0
+    for engine in engines.all():
+        for name in project_template_names():
+            engine.get_template(name)
+            compiled += 1
+    return compiled
@@ -0,0 +1,68 @@
+import asyncio
+from django.test import SimpleTestCase
+from core.events import InMemoryBroker, event_stream, get_broker, publish
+
+
+class InMemoryBrokerTest(SimpleTestCase):
+
+    def test_subscriber_receives_published_message(self):
+        broker = InMemoryBroker()
+
+        async def listen():
+            subscription = broker.subscribe("channel")
+            next_message = asyncio.ensure_future(subscription.__anext__())
+            await asyncio.sleep(0)
+            broker.publish("channel", "hello")
+            message = await asyncio.wait_for(next_message, timeout=1)
+            await subscription.aclose()
+            return message
+
+        self.assertEqual(asyncio.run(listen()), "hello")
+
+    def test_other_channels_are_not_delivered(self):
+        broker = InMemoryBroker()
+
+        async def listen():
+            subscription = broker.subscribe("channel")
+            next_message = asyncio.ensure_future(subscription.__anext__())
+            await asyncio.sleep(0)
+            broker.publish("other", "hello")
+            done, _ = await asyncio.wait({next_message}, timeout=0.1)
+            next_message.cancel()
+            return done
+
+        self.assertEqual(asyncio.run(listen()), set())
+
+    def test_publish_without_subscribers_is_noop(self):
+        InMemoryBroker().publish("channel", "hello")
+
+
+class EventStreamTest(SimpleTestCase):
+
+    def test_stream_relays_events_as_sse(self):
+        async def read_stream():
+            stream = event_stream("stream-test")
+            chunks = [await stream.__anext__()]
+            next_chunk = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0)
+            publish("stream-test", "item_added", item_id=1)
+            chunks.append(await asyncio.wait_for(next_chunk, timeout=1))
+            await stream.aclose()
+            return chunks
+
+        retry, data = asyncio.run(read_stream())
+        self.assertEqual(retry, "retry: 5000\n\n")
+        self.assertEqual(data, 'data: {"event": "item_added", "item_id": 1}\n\n')
+
+    def test_stream_sends_keep_alive_when_idle(self):
+        async def read_stream():
+            stream = event_stream("idle-test", heartbeat=0.01)
+            await stream.__anext__()
+            chunk = await stream.__anext__()
+            await stream.aclose()
+            return chunk
+
+        self.assertEqual(asyncio.run(read_stream()), ": keep-alive\n\n")
+
+    def test_default_broker_is_in_memory(self):
+        self.assertIsInstance(get_broker(), InMemoryBroker)
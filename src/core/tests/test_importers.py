@@ -0,0 +1,44 @@
+import io
+
+from django.test import SimpleTestCase
+
+from core.importers import MAX_QUANTITY, collect_items, parse_items
+
+
+class ParseItemsTest(SimpleTestCase):
+    def parse(self, text):
+        return list(parse_items(io.StringIO(text)))
+
+    def test_reads_paste_formats(self):
+        items = self.parse("3x socks\n2 x towel\nhat x4\n5 pens\ntoothbrush\n")
+
+        self.assertEqual(
+            [(item.name, item.quantity) for item in items],
+            [("socks", 3), ("towel", 2), ("hat", 4), ("pens", 5), ("toothbrush", 1)],
+        )
+
+    def test_reads_csv_rows_and_skips_header(self):
+        items = self.parse('name,quantity\nsunscreen,2\n3,"cables, usb"\n')
+
+        self.assertEqual(
+            [(item.name, item.quantity) for item in items],
+            [("sunscreen", 2), ("cables, usb", 3)],
+        )
+
+    def test_reports_invalid_lines(self):
+        results = self.parse(f"socks x{MAX_QUANTITY + 1}\n\n# comment\n" + "a" * 101)
+
+        self.assertEqual([line for line, _ in results], [1, 4])
+
+
+class CollectItemsTest(SimpleTestCase):
+    def test_merges_repeats_and_skips_existing(self):
+        items, errors, skipped = collect_items(
+            io.StringIO("2x Socks\nsocks\nHat\nmap\n"), existing_names=["hat"]
+        )
+
+        self.assertEqual(
+            [(item.name, item.quantity) for item in items], [("Socks", 3), ("map", 1)]
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(skipped, 1)
@@ -15,6 +15,7 @@ urlpatterns = [
     path("packing/", include("packing_lists.urls")),
     path("shopping-list/", include("shopping_list.urls")),
     path("notifications/", include("notifications.urls")),
+    path("api/v1/", include("api.urls")),
 ]
 
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -0,0 +1,21 @@
+from django.template import engines
+from django.test import SimpleTestCase
+from core.template_warmup import project_template_names, warm_template_cache
+
+
+class WarmTemplateCacheTest(SimpleTestCase):
+
+    def test_lists_project_templates_only(self):
+        names = list(project_template_names())
+
+        self.assertIn("dashboard/base.html", names)
+        self.assertIn("trips/trip_list.html", names)
+        self.assertNotIn("admin/base.html", names)
+
+    def test_compiles_templates_into_cached_loader(self):
+        compiled = warm_template_cache()
+
+        loader = engines["django"].engine.template_loaders[0]
+        self.assertEqual(compiled, len(list(project_template_names())))
+        self.assertIn("dashboard/base.html", loader.get_template_cache)
+        self.assertIn("notes/note_list.html", loader.get_template_cache)
@@ -14,3 +14,19 @@ def log_action(
         affected_user=affected_user,
         extra_data=extra_data or {},
     )
+
+
+def log_actions(action, content_object, performed_by, affected_users, extra_data=None):
+    """Like log_action, one row per affected user in a single INSERT"""
+    content_type = ContentType.objects.get_for_model(content_object)
+    return AuditLog.objects.bulk_create(
+        AuditLog(
+            content_type=content_type,
+            object_id=content_object.pk,
+            action=action,
+            performed_by=performed_by,
+            affected_user=affected_user,
+            extra_data=extra_data or {},
+        )
+        for affected_user in affected_users
+    )
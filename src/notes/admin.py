@@ -1,7 +1,13 @@
 from django.contrib import admin
-from .models import Note
+from .models import Note, NoteRevision
 
 
 @admin.register(Note)
 class NoteAdmin(admin.ModelAdmin):
     list_display = ("id", "note_type", "content", "created_at")
+
+
+@admin.register(NoteRevision)
+class NoteRevisionAdmin(admin.ModelAdmin):
+    list_display = ("id", "note", "number", "author", "is_snapshot", "created_at")
+    exclude = ("data",)
@@ -0,0 +1,16 @@
+from django import forms
+from .models import Note
+
+
+class NoteForm(forms.ModelForm):
+    class Meta:
+        model = Note
+        fields = ["title", "content", "content_format", "note_type"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # older clients don't send the format, they keep the current one
+        self.fields["content_format"].required = False
+
+    def clean_content_format(self):
+        return self.cleaned_data["content_format"] or self.instance.content_format
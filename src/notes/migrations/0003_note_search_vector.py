@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Kept in sync with notes.search.SEARCH_CONFIG
+POSTGRES_FORWARD = """
+CREATE FUNCTION notes_note_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notes_note_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content, search_vector ON notes_note
+    FOR EACH ROW EXECUTE FUNCTION notes_note_search_vector_update();
+
+UPDATE notes_note SET search_vector = NULL;
+
+CREATE INDEX notes_note_search_vector_gin
+    ON notes_note USING gin (search_vector);
+"""
+
+POSTGRES_BACKWARD = """
+DROP INDEX IF EXISTS notes_note_search_vector_gin;
+DROP TRIGGER IF EXISTS notes_note_search_vector_trigger ON notes_note;
+DROP FUNCTION IF EXISTS notes_note_search_vector_update();
+"""
+
+
+def install_trigger(apps, schema_editor):
+    # SQLite gets an FTS5 table instead, created on post_migrate
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_FORWARD)
+
+
+def remove_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0002_alter_note_note_type"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(install_trigger, remove_trigger),
+    ]
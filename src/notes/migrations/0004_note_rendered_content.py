@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:31
+
+from django.db import migrations, models
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+
+def render_existing_notes(apps, schema_editor):
+    # every existing note is plain text
+    Note = apps.get_model("notes", "Note")
+    batch = []
+    for note in Note.objects.only("content").iterator(chunk_size=500):
+        note.content_html = linebreaks(note.content, autoescape=True)
+        note.excerpt = Truncator(" ".join(note.content[:1120].split())).chars(280)
+        batch.append(note)
+        if len(batch) == 500:
+            Note.objects.bulk_update(batch, ["content_html", "excerpt"])
+            batch = []
+    Note.objects.bulk_update(batch, ["content_html", "excerpt"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0003_note_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="content_format",
+            field=models.CharField(
+                choices=[("plain", "Plain text"), ("markdown", "Markdown")],
+                default="plain",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="content_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(render_existing_notes, migrations.RunPython.noop),
+    ]
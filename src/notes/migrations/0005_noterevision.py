@@ -0,0 +1,99 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:34
+
+import django.db.models.deletion
+from django.conf import settings
+import zlib
+
+from django.db import migrations, models
+
+
+def snapshot_existing_notes(apps, schema_editor):
+    # gives every note a first revision to diff later edits against
+    Note = apps.get_model("notes", "Note")
+    NoteRevision = apps.get_model("notes", "NoteRevision")
+    batch = []
+    for note in Note.objects.only(
+        "user_id", "title", "content", "content_format"
+    ).iterator(chunk_size=500):
+        batch.append(
+            NoteRevision(
+                note_id=note.pk,
+                number=1,
+                author_id=note.user_id,
+                title=note.title,
+                content_format=note.content_format,
+                is_snapshot=True,
+                data=zlib.compress(note.content.encode(), 9),
+                content_length=len(note.content),
+            )
+        )
+        if len(batch) == 500:
+            NoteRevision.objects.bulk_create(batch)
+            batch = []
+    NoteRevision.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0004_note_rendered_content"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteRevision",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                ("title", models.CharField(max_length=200)),
+                (
+                    "content_format",
+                    models.CharField(
+                        choices=[("plain", "Plain text"), ("markdown", "Markdown")],
+                        default="plain",
+                        max_length=10,
+                    ),
+                ),
+                ("is_snapshot", models.BooleanField(default=False)),
+                ("data", models.BinaryField()),
+                ("content_length", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "author",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="note_revisions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "note",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="revisions",
+                        to="notes.note",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-number"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("note", "number"), name="unique_note_revision_number"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(snapshot_existing_notes, migrations.RunPython.noop),
+    ]
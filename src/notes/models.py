@@ -1,12 +1,27 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
-from trips.models import Trip
+from trips.models import Trip, TripMember
+from .rendering import INLINE_RENDER_LIMIT, render_excerpt, render_html
+from . import revisions
 
 User = get_user_model()
 
 
+class NoteQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Same rules as Note.can_view, as a single query"""
+        member_trips = TripMember.objects.filter(user=user).values("trip_id")
+        return self.filter(
+            models.Q(note_type="private", user=user)
+            | models.Q(note_type="shared", trip__owner=user)
+            | models.Q(note_type="shared", trip__in=member_trips)
+        )
+
+
 class Note(models.Model):
     NOTE_TYPE_CHOICES = [("private", "Private"), ("shared", "Shared")]
+    CONTENT_FORMAT_CHOICES = [("plain", "Plain text"), ("markdown", "Markdown")]
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notes")
     trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name="notes")
@@ -16,13 +31,46 @@ class Note(models.Model):
         max_length=10, choices=NOTE_TYPE_CHOICES, default="private"
     )
     content = models.TextField()
+    content_format = models.CharField(
+        max_length=10, choices=CONTENT_FORMAT_CHOICES, default="plain"
+    )
+    # compiled from content on save, see notes/rendering.py
+    content_html = models.TextField(blank=True, editable=False)
+    excerpt = models.CharField(max_length=300, blank=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # filled by a database trigger on PostgreSQL, see notes/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = NoteQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        content_changed = update_fields is None or bool(
+            {"content", "content_format"} & set(update_fields)
+        )
+        render_later = content_changed and len(self.content) > INLINE_RENDER_LIMIT
+
+        if content_changed:
+            self.excerpt = render_excerpt(self.content, self.content_format)
+            # big notes show plain text until the task has compiled them
+            self.content_html = (
+                "" if render_later else render_html(self.content, self.content_format)
+            )
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "excerpt", "content_html"}
+
+        super().save(*args, **kwargs)
+
+        if render_later:
+            from .tasks import render_note_html
+
+            transaction.on_commit(lambda: render_note_html.delay(self.pk))
+
     def is_owner(self, user):
         return self.user == user
 
@@ -40,3 +88,113 @@ class Note(models.Model):
 
     def __str__(self):
         return f" Note: {self.title} - Trip: {self.trip.title}"
+
+
+class NoteRevision(models.Model):
+    """One saved state of a note, kept as a compressed delta or snapshot"""
+
+    # a full snapshot at least this often keeps reconstruction short
+    SNAPSHOT_EVERY = 10
+
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="revisions")
+    number = models.PositiveIntegerField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="note_revisions",
+    )
+    title = models.CharField(max_length=200)
+    content_format = models.CharField(
+        max_length=10, choices=Note.CONTENT_FORMAT_CHOICES, default="plain"
+    )
+    is_snapshot = models.BooleanField(default=False)
+    # zlib: the full content for snapshots, a json delta otherwise
+    data = models.BinaryField()
+    content_length = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["note", "number"], name="unique_note_revision_number"
+            )
+        ]
+
+    @classmethod
+    def record(cls, note, author):
+        """Stores the note's current state, unless it matches the last revision"""
+        with transaction.atomic():
+            # serializes concurrent edits of the same note
+            Note.objects.select_for_update().filter(pk=note.pk).first()
+
+            chain = list(note.revisions.order_by("-number")[: cls.SNAPSHOT_EVERY])
+            previous = chain[0] if chain else None
+            if previous is not None:
+                previous_content = cls.reconstruct(chain)
+                if (previous_content, previous.title, previous.content_format) == (
+                    note.content,
+                    note.title,
+                    note.content_format,
+                ):
+                    return previous
+
+            revision = cls(
+                note=note,
+                number=previous.number + 1 if previous else 1,
+                author=author,
+                title=note.title,
+                content_format=note.content_format,
+                content_length=len(note.content),
+            )
+
+            snapshot = revisions.pack_snapshot(note.content)
+            if previous is None or cls._deltas_since_snapshot(chain) + 1 >= (
+                cls.SNAPSHOT_EVERY
+            ):
+                revision.is_snapshot, revision.data = True, snapshot
+            else:
+                delta = revisions.pack_delta(
+                    revisions.make_delta(previous_content, note.content)
+                )
+                # a rewrite can make the delta bigger than the note itself
+                if len(delta) < len(snapshot):
+                    revision.data = delta
+                else:
+                    revision.is_snapshot, revision.data = True, snapshot
+
+            revision.save()
+            return revision
+
+    @staticmethod
+    def _deltas_since_snapshot(chain):
+        return next(i for i, revision in enumerate(chain) if revision.is_snapshot)
+
+    @staticmethod
+    def reconstruct(chain):
+        """Content of chain[0], given revisions newest first back to a snapshot"""
+        deltas = []
+        for revision in chain:
+            if revision.is_snapshot:
+                content = revisions.unpack_snapshot(revision.data)
+                break
+            deltas.append(revision)
+        else:
+            raise ValueError("Revision chain has no snapshot")
+
+        for revision in reversed(deltas):
+            content = revisions.apply_delta(
+                content, revisions.unpack_delta(revision.data)
+            )
+        return content
+
+    def get_content(self):
+        chain = self.note.revisions.filter(number__lte=self.number).order_by("-number")[
+            : self.SNAPSHOT_EVERY
+        ]
+        return self.reconstruct(list(chain))
+
+    def __str__(self):
+        return f"{self.note.title} #{self.number}"
@@ -0,0 +1,40 @@
+import html
+
+import markdown
+import nh3
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 280
+# notes longer than this are compiled by a celery task instead of on save
+INLINE_RENDER_LIMIT = 20_000
+
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "nl2br"]
+ALLOWED_TAGS = {
+    "a", "abbr", "blockquote", "br", "code", "dd", "del", "div", "dl", "dt",
+    "em", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "img", "li", "ol", "p",
+    "pre", "span", "strong", "sup", "table", "tbody", "td", "th", "thead", "tr",
+    "ul",
+}  # fmt: skip
+
+
+def render_html(content, content_format):
+    """Compiles note content into sanitized HTML"""
+    if content_format == "markdown":
+        html = markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS)
+        return nh3.clean(html, tags=ALLOWED_TAGS, link_rel="noopener noreferrer")
+
+    return linebreaks(content, autoescape=True)
+
+
+def render_excerpt(content, content_format):
+    """Plain-text preview for list cards, built from the start of the note"""
+    # a few times the excerpt length is enough, and keeps huge notes cheap
+    head = content[: EXCERPT_LENGTH * 4]
+
+    if content_format == "markdown":
+        # drop every tag, the template escapes the text again
+        head = html.unescape(nh3.clean(markdown.markdown(head), tags=set()))
+
+    text = " ".join(head.split())
+    return Truncator(text).chars(EXCERPT_LENGTH)
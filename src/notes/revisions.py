@@ -0,0 +1,49 @@
+import json
+import zlib
+from difflib import SequenceMatcher
+
+
+def make_delta(old, new):
+    """Line-based delta turning old into new
+
+    A list of [start, end] ranges copied from the old lines and strings
+    inserted as-is, so unchanged text costs a few bytes.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+
+    ops = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            ops.append("".join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old, ops):
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0] : op[1]])
+    return "".join(parts)
+
+
+def pack_snapshot(content):
+    return zlib.compress(content.encode(), 9)
+
+
+def pack_delta(ops):
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode(), 9)
+
+
+def unpack_snapshot(data):
+    return zlib.decompress(data).decode()
+
+
+def unpack_delta(data):
+    return json.loads(zlib.decompress(data))
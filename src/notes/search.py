@@ -0,0 +1,171 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Note
+
+# must match the configuration used by the trigger in migration 0003
+SEARCH_CONFIG = "english"
+RESULT_LIMIT = 50
+
+# control characters never appear in note text, so they can mark matches
+# before the snippet is escaped and turned into <mark> tags
+MATCH_START = "\x02"
+MATCH_STOP = "\x03"
+
+# plain literals, the statements are fixed DDL with no outside input
+SQLITE_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_note_fts
+        USING fts5(title, content, content='notes_note', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_note_fts_insert AFTER INSERT ON notes_note
+    BEGIN
+        INSERT INTO notes_note_fts(rowid, title, content)
+            VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_note_fts_delete AFTER DELETE ON notes_note
+    BEGIN
+        INSERT INTO notes_note_fts(notes_note_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_note_fts_update AFTER UPDATE ON notes_note
+    BEGIN
+        INSERT INTO notes_note_fts(notes_note_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO notes_note_fts(rowid, title, content)
+            VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+SQLITE_FTS_REBUILD_SQL = "INSERT INTO notes_note_fts(notes_note_fts) VALUES ('rebuild')"
+SQLITE_SEARCH_SQL = """
+    SELECT rowid,
+           bm25(notes_note_fts, 10.0, 1.0),
+           snippet(notes_note_fts, 1, %s, %s, ' … ', 24)
+    FROM notes_note_fts
+    WHERE notes_note_fts MATCH %s AND rowid IN ({visible_sql})
+    ORDER BY bm25(notes_note_fts, 10.0, 1.0)
+    LIMIT %s
+"""
+
+
+def install_sqlite_fts(using="default", **kwargs):
+    """Creates the FTS5 fallback index used by local and test databases
+
+    Runs after every migrate: SQLite drops triggers whenever a migration
+    rebuilds notes_note, so they are recreated and the index rebuilt.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' "
+            "AND name LIKE %s",
+            ["notes_note_fts_%"],
+        )
+        if cursor.fetchone()[0] == 3:
+            return
+
+        for statement in SQLITE_FTS_SQL:
+            cursor.execute(statement)
+        cursor.execute(SQLITE_FTS_REBUILD_SQL)
+
+
+def highlight(snippet):
+    """Escapes a snippet and wraps the marked matches in <mark>"""
+    html = escape(snippet or "")
+    html = html.replace(MATCH_START, "<mark>").replace(MATCH_STOP, "</mark>")
+    # the whole snippet is escaped above, only our own <mark> tags are raw
+    return mark_safe(html)  # nosec B308, B703
+
+
+def search_notes(user, query, trip=None, limit=RESULT_LIMIT):
+    """Ranked notes matching the query that the user is allowed to see
+
+    Every returned note carries `rank` and a highlighted `snippet`.
+    """
+    query = query.strip()
+    if not query:
+        return []
+
+    notes = Note.objects.visible_to(user)
+    if trip is not None:
+        notes = notes.filter(trip=trip)
+
+    if connections[notes.db].vendor == "postgresql":
+        results = _search_postgres(notes, query, limit)
+    else:
+        results = _search_sqlite(notes, query, limit)
+
+    for note in results:
+        note.snippet = highlight(note.snippet)
+    return results
+
+
+def _search_postgres(notes, query, limit):
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+
+    return list(
+        notes.filter(search_vector=search_query)
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            snippet=SearchHeadline(
+                "content",
+                search_query,
+                config=SEARCH_CONFIG,
+                start_sel=MATCH_START,
+                stop_sel=MATCH_STOP,
+                max_fragments=2,
+                fragment_delimiter=" … ",
+            ),
+        )
+        .select_related("trip", "user")
+        .defer("content", "content_html", "search_vector")
+        .order_by("-rank", "-created_at")[:limit]
+    )
+
+
+def _fts5_query(query):
+    """Quotes every word, so user input can't use FTS5 query syntax"""
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in query.split()]
+    return " ".join(terms)
+
+
+def _search_sqlite(notes, query, limit):
+    visible_sql, visible_params = notes.values("pk").query.sql_with_params()
+
+    with connections[notes.db].cursor() as cursor:
+        # visible_sql is the ORM's own compiled subquery with its values
+        # passed as params, nothing from the request is formatted in
+        sql = SQLITE_SEARCH_SQL.format(visible_sql=visible_sql)  # nosec B608
+        cursor.execute(
+            sql, [MATCH_START, MATCH_STOP, _fts5_query(query), *visible_params, limit]
+        )
+        matches = cursor.fetchall()
+
+    by_pk = (
+        Note.objects.select_related("trip", "user")
+        .defer("content", "content_html", "search_vector")
+        .in_bulk([pk for pk, _, _ in matches])
+    )
+
+    results = []
+    for pk, score, snippet in matches:
+        note = by_pk.get(pk)
+        if note is None:  # deleted between the match and the lookup
+            continue
+        # bm25 is lower for better matches, flip it to read like ts_rank
+        note.rank = -score
+        note.snippet = snippet
+        results.append(note)
+    return results
@@ -0,0 +1,22 @@
+from celery import shared_task
+
+from .models import Note
+from .rendering import render_html
+
+
+@shared_task
+def render_note_html(note_id):
+    """Compiles a large note outside the request that saved it"""
+    note = (
+        Note.objects.filter(pk=note_id)
+        .only("content", "content_format", "updated_at")
+        .first()
+    )
+    if note is None:
+        return
+
+    html = render_html(note.content, note.content_format)
+    # an edit in the meantime queued its own render, so this one is dropped
+    Note.objects.filter(pk=note_id, updated_at=note.updated_at).update(
+        content_html=html
+    )
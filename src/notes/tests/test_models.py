@@ -1,5 +1,10 @@
+from unittest import mock
+
 from django.test import TestCase
 from trips.models import TripMember
+from notes.models import NoteRevision
+from notes.rendering import INLINE_RENDER_LIMIT
+from notes.tasks import render_note_html
 from .factories import UserFactory, TripFactory, NoteFactory
 
 
@@ -63,3 +68,78 @@ class NoteModelTest(TestCase):
         self.assertEqual(
             str(self.note), f" Note: {self.note.title} - Trip: {self.trip.title}"
         )
+
+
+class NoteRenderingTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+
+    def test_plain_note_is_escaped(self):
+        note = NoteFactory(user=self.user, trip=self.trip, content="<b>Hi</b>")
+
+        self.assertEqual(note.content_html, "<p>&lt;b&gt;Hi&lt;/b&gt;</p>")
+        self.assertEqual(note.excerpt, "<b>Hi</b>")
+
+    def test_markdown_is_compiled_and_sanitized(self):
+        note = NoteFactory(
+            user=self.user,
+            trip=self.trip,
+            content_format="markdown",
+            content="# Day 1\n\n**Ferry** <script>alert(1)</script>",
+        )
+
+        self.assertIn("<h1>Day 1</h1>", note.content_html)
+        self.assertIn("<strong>Ferry</strong>", note.content_html)
+        self.assertNotIn("<script>", note.content_html)
+        self.assertEqual(note.excerpt, "Day 1 Ferry")
+
+    def test_large_note_is_compiled_after_commit(self):
+        content = "word " * (INLINE_RENDER_LIMIT // 5 + 1)
+
+        with mock.patch("notes.tasks.render_note_html.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                note = NoteFactory(user=self.user, trip=self.trip, content=content)
+
+        self.assertEqual(note.content_html, "")
+        self.assertTrue(note.excerpt.startswith("word word"))
+        delay.assert_called_once_with(note.pk)
+
+        render_note_html.apply(args=[note.pk])
+        note.refresh_from_db()
+        self.assertTrue(note.content_html.startswith("<p>word word"))
+
+
+class NoteRevisionTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.note = NoteFactory(user=self.user, content="line 1\nline 2\n")
+
+    def edit(self, content):
+        self.note.content = content
+        self.note.save()
+        return NoteRevision.record(self.note, self.user)
+
+    def test_every_revision_can_be_rebuilt(self):
+        contents = [f"day {i}\n" + "same line\n" * 50 for i in range(25)]
+        recorded = [self.edit(content) for content in contents]
+
+        for revision, content in zip(recorded, contents):
+            self.assertEqual(revision.get_content(), content)
+
+    def test_deltas_store_changed_bytes_and_snapshots_repeat(self):
+        body = "".join(f"unchanged line {i}\n" for i in range(200))
+        revisions = [self.edit(f"edit {i}\n" + body) for i in range(12)]
+
+        snapshots = [r.number for r in revisions if r.is_snapshot]
+        self.assertEqual(snapshots, [1, 11])
+        self.assertLess(len(revisions[1].data), len(revisions[0].data) / 10)
+
+    def test_unchanged_note_adds_no_revision(self):
+        first = NoteRevision.record(self.note, self.user)
+        second = NoteRevision.record(self.note, self.user)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.note.revisions.count(), 1)
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.db.models import QuerySet
+from django.test import TestCase
+from trips.models import TripMember
+from notes.search import highlight, search_notes, MATCH_START, MATCH_STOP
+from .factories import UserFactory, TripFactory, NoteFactory
+
+
+class SearchNotesTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+
+    def test_finds_note_by_content_and_highlights_match(self):
+        NoteFactory(
+            user=self.user, trip=self.trip, content="Ferry to the island at noon"
+        )
+        NoteFactory(user=self.user, trip=self.trip, content="Museum tickets")
+
+        results = search_notes(self.user, "ferry")
+
+        self.assertEqual(len(results), 1)
+        self.assertIn("<mark>Ferry</mark>", results[0].snippet)
+
+    def test_title_match_ranks_first(self):
+        in_content = NoteFactory(
+            user=self.user, trip=self.trip, title="Day two", content="Pack the tent"
+        )
+        in_title = NoteFactory(
+            user=self.user, trip=self.trip, title="Tent", content="Borrow one"
+        )
+
+        results = search_notes(self.user, "tent")
+
+        self.assertEqual(results, [in_title, in_content])
+
+    def test_index_follows_updates_and_deletes(self):
+        note = NoteFactory(user=self.user, trip=self.trip, content="Old plan")
+        note.content = "New itinerary"
+        note.save()
+
+        self.assertEqual(search_notes(self.user, "plan"), [])
+        self.assertEqual(search_notes(self.user, "itinerary"), [note])
+
+        note.delete()
+        self.assertEqual(search_notes(self.user, "itinerary"), [])
+
+    def test_note_deleted_during_search_is_skipped(self):
+        kept = NoteFactory(user=self.user, trip=self.trip, content="Tent pegs")
+        gone = NoteFactory(user=self.user, trip=self.trip, content="Tent poles")
+        in_bulk = QuerySet.in_bulk
+
+        def delete_then_load(queryset, *args, **kwargs):
+            gone.delete()
+            return in_bulk(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, "in_bulk", delete_then_load):
+            results = search_notes(self.user, "tent")
+
+        self.assertEqual(results, [kept])
+
+    def test_respects_visibility(self):
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        shared = NoteFactory(
+            user=self.user, trip=self.trip, note_type="shared", content="Hotel code"
+        )
+        NoteFactory(user=self.user, trip=self.trip, content="Hotel budget")
+
+        self.assertEqual(search_notes(member, "hotel"), [shared])
+        self.assertEqual(search_notes(UserFactory(), "hotel"), [])
+
+    def test_scoped_to_trip(self):
+        other_trip = TripFactory(owner=self.user)
+        note = NoteFactory(user=self.user, trip=self.trip, content="Sunscreen")
+        NoteFactory(user=self.user, trip=other_trip, content="Sunscreen")
+
+        self.assertEqual(search_notes(self.user, "sunscreen", trip=self.trip), [note])
+
+    def test_query_syntax_is_treated_as_text(self):
+        NoteFactory(user=self.user, trip=self.trip, content='Say "hi" OR NOT')
+
+        self.assertEqual(len(search_notes(self.user, '"hi" OR')), 1)
+        self.assertEqual(search_notes(self.user, "   "), [])
+
+    def test_highlight_escapes_note_html(self):
+        snippet = f"<b>{MATCH_START}x{MATCH_STOP}</b>"
+
+        self.assertEqual(highlight(snippet), "&lt;b&gt;<mark>x</mark>&lt;/b&gt;")
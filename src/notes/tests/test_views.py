@@ -1,8 +1,10 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.messages import get_messages
 from trips.models import TripMember
-from notes.models import Note
+from notes.models import Note, NoteRevision
 from .factories import UserFactory, TripFactory, NoteFactory
 
 
@@ -39,6 +41,29 @@ class NoteListViewTest(TestCase):
 
         self.assertIn(self.note, response.context["private_notes"])
 
+    def test_notes_load_in_a_single_query(self):
+        NoteFactory(user=self.user, trip=self.trip, note_type="shared")
+        NoteFactory(user=UserFactory(), trip=self.trip, note_type="private")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        note_queries = [
+            q for q in queries if q["sql"].startswith('SELECT "notes_note"')
+        ]
+        self.assertEqual(len(note_queries), 1)
+        self.assertEqual(response.context["notes_count"], 2)
+        self.assertEqual(len(response.context["shared_notes"]), 1)
+
+    def test_cards_show_excerpt_without_loading_content(self):
+        response = self.client.get(self.url)
+
+        note = response.context["private_notes"][0]
+        self.assertEqual(
+            note.get_deferred_fields(), {"content", "content_html", "search_vector"}
+        )
+        self.assertContains(response, self.note.excerpt)
+
     def test_member_sees_shared_note(self):
         shared_note = NoteFactory(user=self.user, trip=self.trip, note_type="shared")
         member = UserFactory()
@@ -114,6 +139,13 @@ class NoteCreateViewTest(TestCase):
         self.assertEqual(len(messages), 1)
         self.assertIn("created successfully", str(messages[0]))
 
+    def test_creates_markdown_note(self):
+        self.data.update(content="**bold**", content_format="markdown")
+        self.client.post(self.url, self.data)
+
+        note = Note.objects.get(title="New Note")
+        self.assertEqual(note.content_html, "<p><strong>bold</strong></p>")
+
 
 class NoteDetailViewTest(TestCase):
     def setUp(self):
@@ -155,6 +187,23 @@ class NoteDetailViewTest(TestCase):
 
         self.assertEqual(response.status_code, 200)
 
+    def test_unchanged_note_returns_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edited_note_invalidates_etag(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+        self.note.content = "Changed content"
+        self.note.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Changed content")
+
 
 class NoteUpdateViewTest(TestCase):
     def setUp(self):
@@ -243,3 +292,85 @@ class NoteDeleteViewTest(TestCase):
 
         self.assertEqual(len(messages), 1)
         self.assertIn("deleted successfully", str(messages[0]))
+
+
+class NoteSearchViewTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.note = NoteFactory(user=self.user, trip=self.trip, content="Ferry times")
+
+        self.url = reverse("note-search", kwargs={"trip_id": self.trip.pk})
+        self.client.force_login(self.user)
+
+    def test_trip_search_returns_results(self):
+        response = self.client.get(self.url, {"q": "ferry"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["results"], [self.note])
+        self.assertContains(response, "<mark>Ferry</mark>")
+
+    def test_search_across_trips(self):
+        response = self.client.get(reverse("note-search-all"), {"q": "ferry"})
+
+        self.assertEqual(response.context["results"], [self.note])
+        self.assertIsNone(response.context["trip"])
+
+    def test_non_member_is_redirected(self):
+        self.client.force_login(UserFactory())
+        response = self.client.get(self.url, {"q": "ferry"})
+
+        self.assertRedirects(response, reverse("trip-list"))
+
+
+class NoteRevisionViewsTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.note = NoteFactory(user=self.user, trip=self.trip, content="First")
+        NoteRevision.record(self.note, self.user)
+
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse("note-edit", kwargs={"pk": self.note.pk}),
+            {"title": "Test Note", "content": "Second", "note_type": "private"},
+        )
+
+    def test_update_records_revision(self):
+        self.assertEqual(
+            [r.get_content() for r in self.note.revisions.all()], ["Second", "First"]
+        )
+
+    def test_history_lists_revisions(self):
+        response = self.client.get(
+            reverse("note-revisions", kwargs={"pk": self.note.pk})
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["revisions"]), 2)
+
+    def test_restore_brings_back_old_content(self):
+        url = reverse("note-revision-restore", kwargs={"pk": self.note.pk, "number": 1})
+        self.assertContains(self.client.get(url), "First")
+
+        response = self.client.post(url)
+
+        self.assertRedirects(
+            response, reverse("note-detail", kwargs={"pk": self.note.pk})
+        )
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.content, "First")
+        self.assertEqual(self.note.revisions.count(), 3)
+
+    def test_only_owner_can_restore(self):
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        self.client.force_login(member)
+
+        response = self.client.post(
+            reverse("note-revision-restore", kwargs={"pk": self.note.pk, "number": 1})
+        )
+
+        self.assertRedirects(response, reverse("trip-list"))
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.content, "Second")
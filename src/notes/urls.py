@@ -5,12 +5,27 @@ from .views import (
     NoteDetailView,
     NoteUpdateView,
     NoteDeleteView,
+    NoteSearchView,
+    NoteRevisionListView,
+    NoteRevisionRestoreView,
 )
 
 urlpatterns = [
     path("<int:trip_id>/notes/", NoteListView.as_view(), name="note-list"),
     path("<int:trip_id>/notes/create/", NoteCreateView.as_view(), name="note-create"),
+    path("<int:trip_id>/notes/search/", NoteSearchView.as_view(), name="note-search"),
+    path("notes/search/", NoteSearchView.as_view(), name="note-search-all"),
     path("notes/<int:pk>/", NoteDetailView.as_view(), name="note-detail"),
     path("notes/<int:pk>/edit/", NoteUpdateView.as_view(), name="note-edit"),
     path("notes/<int:pk>/delete/", NoteDeleteView.as_view(), name="note-delete"),
+    path(
+        "notes/<int:pk>/revisions/",
+        NoteRevisionListView.as_view(),
+        name="note-revisions",
+    ),
+    path(
+        "notes/<int:pk>/revisions/<int:number>/restore/",
+        NoteRevisionRestoreView.as_view(),
+        name="note-revision-restore",
+    ),
 ]
@@ -1,10 +1,16 @@
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import redirect, get_object_or_404
+from django.db.models import Q
+from django.shortcuts import redirect, get_object_or_404, render
 from trips.models import Trip
-from .models import Note
+from .forms import NoteForm
+from .models import Note, NoteRevision
+from .search import search_notes
+from core.mixins import ConditionalGetMixin
 from django.views.generic import (
+    TemplateView,
+    View,
     ListView,
     DetailView,
     CreateView,
@@ -16,7 +22,7 @@ from django.views.generic import (
 class NoteCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     model = Note
     template_name = "notes/note_create.html"
-    fields = ["title", "content", "note_type"]
+    form_class = NoteForm
 
     def get_trip_or_404(self):
         return get_object_or_404(Trip, pk=self.kwargs["trip_id"])
@@ -35,7 +41,9 @@ class NoteCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         messages.success(
             self.request, f'Note "{form.instance.title}" created successfully.'
         )
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        NoteRevision.record(self.object, self.request.user)
+        return response
 
     def get_success_url(self):
         return reverse_lazy("note-list", kwargs={"trip_id": self.object.trip.id})
@@ -65,22 +73,16 @@ class NoteListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         )
 
     def get_queryset(self):
+        # bodies are not needed for the cards, they show the excerpt
         user = self.request.user
-        self.trip = get_object_or_404(Trip, pk=self.kwargs["trip_id"])
-
-        private_notes = Note.objects.filter(
-            trip=self.trip, note_type="private", user=user
-        )
-        shared_notes = Note.objects.filter(trip=self.trip, note_type="shared")
-
-        all_notes = (
-            (private_notes | shared_notes)
-            .select_related("user", "trip")
+        return (
+            Note.objects.filter(trip=self.trip)
+            .filter(Q(note_type="private", user=user) | Q(note_type="shared"))
+            .select_related("user")
+            .defer("content", "content_html", "search_vector")
             .order_by("-created_at")
         )
 
-        return all_notes
-
     def handle_no_permission(self):
         if not self.request.user.is_authenticated:
             return super().handle_no_permission()
@@ -90,23 +92,44 @@ class NoteListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        all_notes = self.get_queryset()
+        # one query for both columns, split in memory
+        private_notes, shared_notes = [], []
+        for note in context["notes"]:
+            note.trip = self.trip
+            if note.note_type == "private":
+                private_notes.append(note)
+            else:
+                shared_notes.append(note)
 
         context["trip"] = self.trip
-        context["private_notes"] = all_notes.filter(note_type="private")
-        context["shared_notes"] = all_notes.filter(note_type="shared")
+        context["private_notes"] = private_notes
+        context["shared_notes"] = shared_notes
+        context["notes_count"] = len(private_notes) + len(shared_notes)
 
         return context
 
 
-class NoteDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class NoteDetailView(
+    LoginRequiredMixin, UserPassesTestMixin, ConditionalGetMixin, DetailView
+):
     model = Note
     template_name = "notes/note_details.html"
     context_object_name = "note"
 
+    def get_queryset(self):
+        return Note.objects.select_related("trip", "user")
+
     def test_func(self):
-        note = self.get_object()
-        return note.can_view(self.request.user)
+        self.note = self.get_object()
+        return self.note.can_view(self.request.user)
+
+    def get_etag_parts(self):
+        return [
+            self.note.updated_at.isoformat(),
+            bool(self.note.content_html),  # large notes are compiled later
+            self.note.trip.version,
+            self.note.is_owner(self.request.user),
+        ]
 
     def handle_no_permission(self):
         if not self.request.user.is_authenticated:
@@ -118,7 +141,7 @@ class NoteDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
 class NoteUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Note
     template_name = "notes/note_create.html"
-    fields = ["title", "content", "note_type"]
+    form_class = NoteForm
 
     def test_func(self):
         note = self.get_object()
@@ -128,7 +151,9 @@ class NoteUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         messages.success(
             self.request, f'Note "{form.instance.title}" updated successfully.'
         )
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        NoteRevision.record(self.object, self.request.user)
+        return response
 
     def get_success_url(self):
         return reverse_lazy("note-list", kwargs={"trip_id": self.object.trip.id})
@@ -166,3 +191,104 @@ class NoteDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
             return super().handle_no_permission()
         messages.error(self.request, "Only the note creator can delete this note.")
         return redirect("trip-list")
+
+
+class NoteSearchView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """Searches one trip's notes, or all the user's trips without trip_id"""
+
+    template_name = "notes/note_search.html"
+
+    def test_func(self):
+        self.trip = None
+        if "trip_id" not in self.kwargs:
+            return True
+
+        self.trip = get_object_or_404(Trip, pk=self.kwargs["trip_id"])
+        return self.trip.is_owner(self.request.user) or self.trip.is_participant(
+            self.request.user
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get("q", "")[:200]
+
+        context["trip"] = self.trip
+        context["query"] = query
+        context["results"] = search_notes(self.request.user, query, trip=self.trip)
+        return context
+
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        messages.error(self.request, "You are not a member of this Trip.")
+        return redirect("trip-list")
+
+
+class NoteRevisionListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+    model = NoteRevision
+    template_name = "notes/note_revision_list.html"
+    context_object_name = "revisions"
+
+    def test_func(self):
+        self.note = get_object_or_404(
+            Note.objects.select_related("trip"), pk=self.kwargs["pk"]
+        )
+        return self.note.can_view(self.request.user)
+
+    def get_queryset(self):
+        # the list shows metadata only, contents are rebuilt on demand
+        return self.note.revisions.select_related("author").defer("data")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["note"] = self.note
+        return context
+
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        messages.error(self.request, "You are not a member of this Trip.")
+        return redirect("trip-list")
+
+
+class NoteRevisionRestoreView(LoginRequiredMixin, UserPassesTestMixin, View):
+    template_name = "notes/note_revision_restore.html"
+
+    def test_func(self):
+        self.note = get_object_or_404(Note, pk=self.kwargs["pk"])
+        return self.note.can_edit(self.request.user)
+
+    def get_revision(self):
+        return get_object_or_404(self.note.revisions, number=self.kwargs["number"])
+
+    def get(self, request, *args, **kwargs):
+        revision = self.get_revision()
+        return render(
+            request,
+            self.template_name,
+            {
+                "note": self.note,
+                "revision": revision,
+                "content": revision.get_content(),
+            },
+        )
+
+    def post(self, request, *args, **kwargs):
+        revision = self.get_revision()
+
+        self.note.title = revision.title
+        self.note.content = revision.get_content()
+        self.note.content_format = revision.content_format
+        self.note.save()
+        NoteRevision.record(self.note, request.user)
+
+        messages.success(
+            request, f'Note "{self.note.title}" restored to revision {revision.number}.'
+        )
+        return redirect("note-detail", pk=self.note.pk)
+
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        messages.error(self.request, "Only the note creator can restore revisions.")
+        return redirect("trip-list")
@@ -0,0 +1,105 @@
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Count, F, Max, Window
+from django.db.models.functions import RowNumber
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Notification
+
+DIGEST_BATCH_SIZE = 100
+# notifications listed in one email, the rest are summed up
+DIGEST_ITEMS = 10
+
+
+def pending_digests(frequency):
+    """Recipients with unread, not yet emailed notifications, one row each"""
+    return (
+        Notification.objects.filter(
+            is_read=False,
+            emailed_at__isnull=True,
+            recipient__email_digest=frequency,
+        )
+        .exclude(recipient__email="")
+        .values("recipient_id", "recipient__username", "recipient__email")
+        .annotate(total=Count("pk"), last_pk=Max("pk"))
+        .order_by("recipient_id")
+    )
+
+
+def listed_notifications(recipients):
+    """The newest DIGEST_ITEMS rows of each recipient's digest, by recipient"""
+    by_recipient = {recipient["recipient_id"]: [] for recipient in recipients}
+    last_pks = {r["recipient_id"]: r["last_pk"] for r in recipients}
+    rows = (
+        Notification.objects.filter(
+            recipient_id__in=by_recipient,
+            is_read=False,
+            emailed_at__isnull=True,
+            pk__lte=max(last_pks.values()),
+        )
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("recipient_id"),
+                order_by=[F("created_at").desc(), F("pk").desc()],
+            )
+        )
+        .filter(position__lte=DIGEST_ITEMS)
+        .order_by("recipient_id", "position")
+        .values("pk", "recipient_id", "message", "created_at")
+    )
+    for row in rows:
+        # newer than the count - left for the next run's digest
+        if row["pk"] <= last_pks[row["recipient_id"]]:
+            by_recipient[row["recipient_id"]].append(row)
+    return by_recipient
+
+
+def build_digest(recipient, notifications):
+    total = recipient["total"]
+    body = render_to_string(
+        "notifications/email/digest.txt",
+        {
+            "username": recipient["recipient__username"],
+            "notifications": notifications,
+            "total": total,
+            "more": total - len(notifications),
+        },
+    )
+    subject = (
+        f"You have {total} new notification{'s' if total != 1 else ''} on TripSync"
+    )
+    return EmailMessage(subject, body, to=[recipient["recipient__email"]])
+
+
+def send_digests(frequency, batch_size=DIGEST_BATCH_SIZE):
+    """Emails one digest per recipient over a single SMTP connection
+
+    Recipients are taken in keyset batches: one aggregate query and one
+    query for the listed notifications per batch. Each digest is marked
+    emailed right after it went out, so an SMTP failure halfway through
+    doesn't send the earlier ones again. Returns the number sent.
+    """
+    pending = pending_digests(frequency)
+    last_recipient, sent = 0, 0
+
+    with get_connection() as connection:
+        while True:
+            batch = list(pending.filter(recipient_id__gt=last_recipient)[:batch_size])
+            if not batch:
+                return sent
+
+            listed = listed_notifications(batch)
+            for recipient in batch:
+                message = build_digest(recipient, listed[recipient["recipient_id"]])
+                if not connection.send_messages([message]):
+                    continue
+                sent += 1
+                # everything the digest counted - newer ones wait for the next run
+                Notification.objects.filter(
+                    recipient_id=recipient["recipient_id"],
+                    is_read=False,
+                    emailed_at__isnull=True,
+                    pk__lte=recipient["last_pk"],
+                ).update(emailed_at=timezone.now())
+            last_recipient = batch[-1]["recipient_id"]
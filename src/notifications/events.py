@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models import Count
+from core.events import publish
+
+
+def notifications_channel(user_id):
+    return f"notifications:{user_id}"
+
+
+def _preview(notification):
+    return {
+        "id": notification.pk,
+        "type": notification.notification_type,
+        "message": notification.message,
+    }
+
+
+def publish_unread_counts(user_ids, new_notifications=()):
+    """Pushes fresh unread counts (and previews of new notifications) once committed
+
+    All counts come from one grouped query, however many users changed.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return
+    previews = {n.recipient_id: _preview(n) for n in new_notifications}
+
+    def send():
+        from .models import Notification
+
+        counts = dict(
+            Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+            .order_by()
+            .values("recipient_id")
+            .annotate(unread=Count("pk"))
+            .values_list("recipient_id", "unread")
+        )
+        for user_id in user_ids:
+            data = {"unread": counts.get(user_id, 0)}
+            if user_id in previews:
+                data["notification"] = previews[user_id]
+            publish(notifications_channel(user_id), "unread_changed", **data)
+
+    transaction.on_commit(send)
@@ -0,0 +1,39 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from .models import Notification
+
+
+class IdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return [int(pk) for pk in value or []]
+        except (TypeError, ValueError):
+            raise ValidationError("Invalid notification id.")
+
+
+class NotificationBulkActionForm(forms.Form):
+    ACTION_CHOICES = [
+        ("read", "Mark as read"),
+        ("unread", "Mark as unread"),
+        ("delete", "Delete"),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    ids = IdListField(required=False)
+    notification_type = forms.ChoiceField(
+        choices=[("", "---------"), *Notification.NOTIFICATION_TYPE_CHOICES],
+        required=False,
+    )
+    trip = forms.IntegerField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not (
+            cleaned_data.get("ids")
+            or cleaned_data.get("notification_type")
+            or cleaned_data.get("trip")
+        ):
+            raise ValidationError("Select notifications, a type or a trip.")
+        return cleaned_data
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="dedupe_key",
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0002_notification_dedupe_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="emailed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
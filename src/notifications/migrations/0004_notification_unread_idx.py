@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_notification_emailed_at"),
+        ("trips", "0010_alter_trip_start_date"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "is_read"], name="notification_unread_idx"
+            ),
+        ),
+    ]
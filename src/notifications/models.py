@@ -1,10 +1,20 @@
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from .events import publish_unread_counts
 
 User = get_user_model()
 
 
+class NotificationQuerySet(models.QuerySet):
+    def mark_read(self):
+        """One UPDATE, returns how many were unread - read ones keep their read_at"""
+        return self.filter(is_read=False).update(is_read=True, read_at=timezone.now())
+
+    def mark_unread(self):
+        return self.filter(is_read=True).update(is_read=False, read_at=None)
+
+
 class Notification(models.Model):
 
     NOTIFICATION_TYPE_CHOICES = [
@@ -41,9 +51,30 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     read_at = models.DateTimeField(null=True, blank=True)
+    # set once the notification went out in an email digest
+    emailed_at = models.DateTimeField(null=True, blank=True)
+    # set for generated notifications, so reruns of a job can't duplicate them
+    dedupe_key = models.CharField(max_length=100, null=True, blank=True, unique=True)
+
+    objects = NotificationQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # unread badge count on every page
+            models.Index(
+                fields=["recipient", "is_read"], name="notification_unread_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        publish_unread_counts([self.recipient_id], [self] if is_new else ())
+
+    def delete(self, *args, **kwargs):
+        publish_unread_counts([self.recipient_id])
+        return super().delete(*args, **kwargs)
 
     def mark_as_read(self):
         if not self.is_read:
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from core import metrics
+
+from .events import publish_unread_counts
+from .models import Notification
+
+RETENTION_BATCH_SIZE = 1000
+
+
+def _delete_in_batches(notifications, batch_size):
+    """Deletes the rows in primary key order, one short DELETE per batch"""
+    last_pk, deleted = 0, 0
+    while True:
+        pks = list(
+            notifications.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            return deleted
+        deleted += Notification.objects.filter(pk__in=pks).delete()[0]
+        last_pk = pks[-1]
+
+
+def delete_expired(days, batch_size=RETENTION_BATCH_SIZE):
+    """Read notifications older than `days` days"""
+    cutoff = timezone.now() - timedelta(days=days)
+    return _delete_in_batches(
+        Notification.objects.filter(is_read=True, created_at__lt=cutoff), batch_size
+    )
+
+
+def delete_over_cap(cap, batch_size=RETENTION_BATCH_SIZE):
+    """Keeps only the newest `cap` notifications of every user"""
+    crowded = (
+        Notification.objects.order_by()
+        .values("recipient_id")
+        .annotate(total=Count("pk"))
+        .filter(total__gt=cap)
+        .values_list("recipient_id", flat=True)
+    )
+
+    deleted = 0
+    for recipient_id in crowded:
+        own = Notification.objects.filter(recipient_id=recipient_id)
+        oldest_kept = own.order_by("-pk").values_list("pk", flat=True)[cap - 1]
+        deleted += _delete_in_batches(own.filter(pk__lt=oldest_kept), batch_size)
+        publish_unread_counts([recipient_id])
+    return deleted
+
+
+def apply_retention_policy():
+    """Prunes notifications as configured, reports the counts as metrics"""
+    expired = delete_expired(settings.NOTIFICATION_RETENTION_DAYS)
+    over_cap = delete_over_cap(settings.NOTIFICATION_MAX_PER_USER)
+    retained = Notification.objects.count()
+
+    metrics.incr("notifications.deleted.expired", expired)
+    metrics.incr("notifications.deleted.over_cap", over_cap)
+    metrics.gauge("notifications.retained", retained)
+    return {"expired": expired, "over_cap": over_cap, "retained": retained}
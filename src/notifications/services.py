@@ -0,0 +1,103 @@
+from django.db import transaction
+
+from .events import publish_unread_counts
+from .models import Notification
+
+
+def _pk(obj):
+    return getattr(obj, "pk", obj)
+
+
+def resolve_recipients(trip=None, recipients=None, exclude=()):
+    """Recipient ids - the given users, or every member of the trip
+
+    Members are read with a single query on the membership table.
+    """
+    if recipients is None:
+        from trips.models import TripMember
+
+        recipients = TripMember.objects.filter(trip_id=_pk(trip)).values_list(
+            "user_id", flat=True
+        )
+
+    excluded = {_pk(user) for user in exclude}
+    ids = dict.fromkeys(_pk(user) for user in recipients)
+    return [pk for pk in ids if pk not in excluded]
+
+
+def notify(
+    notification_type, message="", trip=None, sender=None, recipients=None, exclude=()
+):
+    """Writes one notification per recipient with a single bulk_create
+
+    Without recipients every member of the trip is notified. Users and
+    trips can be passed as instances or primary keys.
+    """
+    if recipients is None and trip is None:
+        raise ValueError("notify() needs recipients or a trip")
+
+    recipient_ids = resolve_recipients(trip, recipients, exclude)
+    created = Notification.objects.bulk_create(
+        Notification(
+            recipient_id=recipient_id,
+            sender_id=_pk(sender),
+            notification_type=notification_type,
+            trip_id=_pk(trip),
+            message=message,
+        )
+        for recipient_id in recipient_ids
+    )
+    publish_unread_counts(recipient_ids, created)
+    return created
+
+
+def notify_on_commit(
+    notification_type, message="", trip=None, sender=None, recipients=None, exclude=()
+):
+    """Like notify(), but written by a Celery worker once the transaction commits
+
+    Members are resolved in the worker, so the request pays for neither
+    the membership query nor the insert.
+    """
+    from .tasks import send_notifications
+
+    kwargs = {
+        "message": message,
+        "trip_id": _pk(trip),
+        "sender_id": _pk(sender),
+        "recipient_ids": (
+            None if recipients is None else [_pk(user) for user in recipients]
+        ),
+        "exclude_ids": [_pk(user) for user in exclude],
+    }
+    transaction.on_commit(lambda: send_notifications.delay(notification_type, **kwargs))
+
+
+def bulk_update_notifications(
+    user, action, ids=None, notification_type=None, trip=None
+):
+    """Marks read/unread or deletes the user's matching notifications
+
+    Runs as a single UPDATE or DELETE and returns the number of rows
+    changed. Open badges get the new unread count.
+    """
+    notifications = Notification.objects.filter(recipient=user)
+    if ids is not None:
+        notifications = notifications.filter(pk__in=ids)
+    if notification_type:
+        notifications = notifications.filter(notification_type=notification_type)
+    if trip is not None:
+        notifications = notifications.filter(trip_id=_pk(trip))
+
+    if action == "read":
+        affected = notifications.mark_read()
+    elif action == "unread":
+        affected = notifications.mark_unread()
+    elif action == "delete":
+        affected = notifications.delete()[0]
+    else:
+        raise ValueError(f"Unknown notification action: {action}")
+
+    if affected:
+        publish_unread_counts([_pk(user)])
+    return affected
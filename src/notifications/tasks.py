@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from trips.models import Trip, TripMember
+
+from .digests import send_digests
+from .events import publish_unread_counts
+from .models import Notification
+from .retention import apply_retention_policy
+from .services import notify
+
+REMINDER_BATCH_SIZE = 1000
+
+
+@shared_task
+def send_notifications(
+    notification_type,
+    message="",
+    trip_id=None,
+    sender_id=None,
+    recipient_ids=None,
+    exclude_ids=(),
+):
+    """Fans a notification out to its recipients, returns how many were written"""
+    # the trip may be gone by the time the worker picks this up
+    if trip_id is not None and not Trip.objects.filter(pk=trip_id).exists():
+        return 0
+
+    created = notify(
+        notification_type,
+        message=message,
+        trip=trip_id,
+        sender=sender_id,
+        recipients=recipient_ids,
+        exclude=exclude_ids,
+    )
+    return len(created)
+
+
+def reminder_message(title, days):
+    if days == 1:
+        return f'Your trip "{title}" starts tomorrow!'
+    return f'Your trip "{title}" starts in {days} days.'
+
+
+def create_trip_reminders(days, batch_size=REMINDER_BATCH_SIZE):
+    """Reminds every member of trips starting in `days` days
+
+    Trips come from the indexed start_date, their memberships are walked
+    in keyset batches on the (trip, user) unique key. Reminders already
+    sent are skipped by dedupe key, so a rerun creates nothing. Returns
+    the number of reminders created.
+    """
+    start_date = timezone.localdate() + timedelta(days=days)
+    titles = dict(Trip.objects.filter(start_date=start_date).values_list("pk", "title"))
+    if not titles:
+        return 0
+    memberships = TripMember.objects.filter(trip_id__in=titles).order_by(
+        "trip_id", "user_id"
+    )
+
+    last, total = None, 0
+    while True:
+        page = memberships
+        if last is not None:
+            trip_id, user_id = last
+            page = page.filter(
+                Q(trip_id__gt=trip_id) | Q(trip_id=trip_id, user_id__gt=user_id)
+            )
+        batch = list(page.values_list("trip_id", "user_id")[:batch_size])
+        if not batch:
+            return total
+
+        keys = {
+            f"trip_reminder:{trip_id}:{start_date}:{user_id}": (trip_id, user_id)
+            for trip_id, user_id in batch
+        }
+        sent = set(
+            Notification.objects.filter(dedupe_key__in=keys).values_list(
+                "dedupe_key", flat=True
+            )
+        )
+        created = [
+            Notification(
+                recipient_id=user_id,
+                trip_id=trip_id,
+                notification_type="trip_reminder",
+                message=reminder_message(titles[trip_id], days),
+                dedupe_key=key,
+            )
+            for key, (trip_id, user_id) in keys.items()
+            if key not in sent
+        ]
+        if created:
+            # a concurrent run may have written some in the meantime
+            Notification.objects.bulk_create(created, ignore_conflicts=True)
+            publish_unread_counts(n.recipient_id for n in created)
+        last = batch[-1]
+        total += len(created)
+
+
+@shared_task
+def send_trip_reminders():
+    """Beat job - reminders for every configured number of days ahead"""
+    return {days: create_trip_reminders(days) for days in settings.TRIP_REMINDER_DAYS}
+
+
+@shared_task
+def send_notification_digests(frequency):
+    """Beat job - emails unread notifications to users on this digest schedule"""
+    return send_digests(frequency)
+
+
+@shared_task
+def prune_notifications():
+    """Beat job - applies the notification retention policy"""
+    return apply_retention_policy()
@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+from notifications.digests import DIGEST_ITEMS, send_digests
+from notifications.models import Notification
+from .factories import UserFactory, NotificationFactory
+
+
+class SendDigestsTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory(email_digest="hourly")
+        NotificationFactory(recipient=self.user, message="Anna invited you to Alps.")
+        NotificationFactory(recipient=self.user, message="Your trip starts tomorrow!")
+
+    def test_groups_unread_notifications_into_one_email(self):
+        NotificationFactory(recipient=self.user, message="Old news", is_read=True)
+
+        sent = send_digests("hourly")
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        email = mail.outbox[0]
+        self.assertEqual(email.to, [self.user.email])
+        self.assertEqual(email.subject, "You have 2 new notifications on TripSync")
+        self.assertIn("Anna invited you to Alps.", email.body)
+        self.assertNotIn("Old news", email.body)
+
+    def test_rerun_sends_only_new_notifications(self):
+        send_digests("hourly")
+        self.assertEqual(send_digests("hourly"), 0)
+
+        NotificationFactory(recipient=self.user, message="Bob left your trip.")
+        send_digests("hourly")
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn("Bob left your trip.", mail.outbox[1].body)
+        self.assertNotIn("Anna", mail.outbox[1].body)
+
+    def test_respects_digest_preference(self):
+        NotificationFactory(recipient=UserFactory(email_digest="daily"))
+        NotificationFactory(recipient=UserFactory(email_digest="off"))
+
+        self.assertEqual(send_digests("hourly"), 1)
+        self.assertEqual(send_digests("daily"), 1)
+        self.assertEqual(
+            Notification.objects.filter(emailed_at__isnull=True).count(), 1
+        )
+
+    def test_users_get_no_digest_until_they_choose_one(self):
+        NotificationFactory(recipient=UserFactory())
+
+        for frequency in ("immediate", "hourly", "daily"):
+            send_digests(frequency)
+
+        self.assertEqual([email.to for email in mail.outbox], [[self.user.email]])
+
+    def test_long_backlog_is_capped_with_a_summary_line(self):
+        for number in range(15):
+            NotificationFactory(recipient=self.user, message=f"Update {number}")
+
+        send_digests("hourly")
+
+        body = mail.outbox[0].body
+        self.assertEqual(body.count("\n- "), DIGEST_ITEMS)
+        self.assertIn("...and 7 more.", body)
+        self.assertFalse(
+            Notification.objects.filter(
+                recipient=self.user, emailed_at__isnull=True
+            ).exists()
+        )
+
+    def test_digests_sent_before_an_smtp_failure_are_marked(self):
+        other = UserFactory(email_digest="hourly")
+        NotificationFactory(recipient=other)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=[1, OSError("connection lost")],
+        ):
+            with self.assertRaises(OSError):
+                send_digests("hourly")
+
+        self.assertFalse(
+            Notification.objects.filter(
+                recipient=self.user, emailed_at__isnull=True
+            ).exists()
+        )
+        self.assertTrue(
+            Notification.objects.filter(
+                recipient=other, emailed_at__isnull=True
+            ).exists()
+        )
+
+    def test_batches_share_one_connection(self):
+        for _ in range(4):
+            NotificationFactory(recipient=UserFactory(email_digest="hourly"))
+
+        with mock.patch(
+            "notifications.digests.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            sent = send_digests("hourly", batch_size=2)
+
+        self.assertEqual(sent, 5)
+        get_connection.assert_called_once()
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from core.events import get_broker
+from notifications.events import notifications_channel
+from notifications.services import notify
+from .factories import UserFactory, NotificationFactory
+
+
+class NotificationEventsTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.url = reverse("notification-events")
+        self.client.force_login(self.user)
+
+    def next_event(self, action):
+        """Runs the action and returns the first event pushed to the user"""
+
+        async def listen():
+            subscription = get_broker().subscribe(notifications_channel(self.user.pk))
+            next_message = asyncio.ensure_future(subscription.__anext__())
+            await asyncio.sleep(0)
+            await sync_to_async(action)()
+            message = await asyncio.wait_for(next_message, timeout=1)
+            await subscription.aclose()
+            return json.loads(message)
+
+        return async_to_sync(listen)()
+
+    async def test_user_gets_event_stream(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "text/event-stream")
+
+    def test_wsgi_request_is_not_held_open(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 204)
+
+    def test_pages_only_subscribe_under_asgi(self):
+        page = reverse("notification-list")
+
+        self.assertNotContains(self.client.get(page), self.url)
+
+        async_to_sync(self.async_client.aforce_login)(self.user)
+        self.assertContains(async_to_sync(self.async_client.get)(page), self.url)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+
+        self.assertRedirects(response, f"{reverse('login')}?next={self.url}")
+
+    def test_new_notification_pushes_count_and_preview(self):
+        NotificationFactory(recipient=self.user)
+
+        def send():
+            with self.captureOnCommitCallbacks(execute=True):
+                notify("trip_reminder", message="Pack!", recipients=[self.user])
+
+        event = self.next_event(send)
+
+        self.assertEqual(event["event"], "unread_changed")
+        self.assertEqual(event["unread"], 2)
+        self.assertEqual(event["notification"]["message"], "Pack!")
+
+    def test_marking_all_read_pushes_zero(self):
+        NotificationFactory(recipient=self.user)
+
+        def mark_all_read():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse("notification-mark-all-read"))
+
+        event = self.next_event(mark_all_read)
+
+        self.assertEqual(event["unread"], 0)
+        self.assertNotIn("notification", event)
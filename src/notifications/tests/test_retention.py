@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core import metrics
+from notifications.models import Notification
+from notifications.retention import (
+    apply_retention_policy,
+    delete_expired,
+    delete_over_cap,
+)
+from .factories import UserFactory, NotificationFactory
+
+
+def age(notification, days):
+    Notification.objects.filter(pk=notification.pk).update(
+        created_at=timezone.now() - timedelta(days=days)
+    )
+
+
+class RetentionTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+
+    def test_deletes_only_old_read_notifications(self):
+        old_read = NotificationFactory(recipient=self.user, is_read=True)
+        old_unread = NotificationFactory(recipient=self.user)
+        new_read = NotificationFactory(recipient=self.user, is_read=True)
+        age(old_read, 100)
+        age(old_unread, 100)
+
+        self.assertEqual(delete_expired(90, batch_size=1), 1)
+        self.assertEqual(
+            set(Notification.objects.values_list("pk", flat=True)),
+            {old_unread.pk, new_read.pk},
+        )
+
+    def test_cap_keeps_newest_per_user(self):
+        notifications = [NotificationFactory(recipient=self.user) for _ in range(5)]
+        other = NotificationFactory()
+
+        self.assertEqual(delete_over_cap(2, batch_size=2), 3)
+        self.assertEqual(
+            set(Notification.objects.values_list("pk", flat=True)),
+            {notifications[-2].pk, notifications[-1].pk, other.pk},
+        )
+
+    @override_settings(NOTIFICATION_RETENTION_DAYS=30, NOTIFICATION_MAX_PER_USER=3)
+    def test_policy_reports_metrics(self):
+        expired = NotificationFactory(recipient=self.user, is_read=True)
+        age(expired, 31)
+        for _ in range(4):
+            NotificationFactory(recipient=self.user)
+
+        result = apply_retention_policy()
+
+        self.assertEqual(result, {"expired": 1, "over_cap": 1, "retained": 3})
+        self.assertEqual(metrics.get("notifications.deleted.expired"), 1)
+        self.assertEqual(metrics.get("notifications.deleted.over_cap"), 1)
+        self.assertEqual(metrics.get("notifications.retained"), 3)
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from trips.models import TripMember
+from notifications.models import Notification
+from notifications.services import notify, notify_on_commit
+from notifications.tasks import (
+    create_trip_reminders,
+    send_notifications,
+    send_trip_reminders,
+)
+from .factories import UserFactory, TripFactory
+
+
+def statements(queries):
+    """Executed SELECTs and INSERTs, leaving out profiler EXPLAINs"""
+    return [q for q in queries if q["sql"].startswith(("SELECT", "INSERT"))]
+
+
+class NotifyTest(TestCase):
+
+    def setUp(self):
+        self.owner = UserFactory()
+        self.trip = TripFactory(owner=self.owner)
+        self.members = [UserFactory() for _ in range(5)]
+        for member in self.members:
+            TripMember.objects.create(trip=self.trip, user=member)
+
+    def test_notifies_all_members_with_two_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            created = notify(
+                "trip_reminder",
+                message="Trip starts tomorrow!",
+                trip=self.trip,
+                exclude=[self.owner],
+            )
+
+        # one membership query, one insert
+        self.assertEqual(len(statements(queries)), 2)
+        self.assertEqual(len(created), 5)
+        self.assertEqual(
+            set(Notification.objects.values_list("recipient_id", flat=True)),
+            {member.pk for member in self.members},
+        )
+
+    def test_explicit_recipients_skip_membership_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            notify(
+                "invite_accepted",
+                recipients=[self.owner, self.owner.pk],
+                sender=self.members[0],
+                trip=self.trip,
+            )
+
+        self.assertEqual(len(statements(queries)), 1)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, self.owner)
+        self.assertEqual(notification.sender, self.members[0])
+
+    def test_requires_recipients_or_trip(self):
+        with self.assertRaises(ValueError):
+            notify("trip_reminder")
+
+    def test_on_commit_variant_queues_the_task_after_commit(self):
+        with mock.patch("notifications.tasks.send_notifications.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                notify_on_commit("trip_reminder", message="Soon!", trip=self.trip)
+                delay.assert_not_called()
+
+        delay.assert_called_once_with(
+            "trip_reminder",
+            message="Soon!",
+            trip_id=self.trip.pk,
+            sender_id=None,
+            recipient_ids=None,
+            exclude_ids=[],
+        )
+        self.assertFalse(Notification.objects.exists())
+
+    def test_task_notifies_every_member(self):
+        result = send_notifications.apply(
+            args=["trip_reminder"], kwargs={"message": "Soon!", "trip_id": self.trip.pk}
+        )
+
+        self.assertEqual(result.get(), 6)
+        self.assertEqual(Notification.objects.count(), 6)
+
+    def test_task_skips_deleted_trip(self):
+        trip_id = self.trip.pk
+        self.trip.delete()
+
+        result = send_notifications.apply(
+            args=["trip_reminder"],
+            kwargs={"trip_id": trip_id, "recipient_ids": [self.owner.pk]},
+        )
+
+        self.assertEqual(result.get(), 0)
+        self.assertFalse(Notification.objects.exists())
+
+
+class TripReminderTest(TestCase):
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.trip = TripFactory(
+            title="Alps",
+            start_date=self.today + timedelta(days=7),
+            end_date=self.today + timedelta(days=14),
+        )
+        for _ in range(4):
+            TripMember.objects.create(trip=self.trip, user=UserFactory())
+        TripFactory(
+            start_date=self.today + timedelta(days=8),
+            end_date=self.today + timedelta(days=9),
+        )
+
+    def test_reminds_every_member_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            reminded = create_trip_reminders(7, batch_size=2)
+
+        self.assertEqual(reminded, 5)
+        # the trips, 3 batch reads (2 + 2 + 1) and the empty read that ends
+        # the loop, a dedupe key lookup and an insert per batch
+        self.assertEqual(len(statements(queries)), 11)
+        self.assertEqual(
+            set(Notification.objects.values_list("recipient_id", flat=True)),
+            set(self.trip.members.values_list("user_id", flat=True)),
+        )
+        self.assertEqual(
+            Notification.objects.first().message, 'Your trip "Alps" starts in 7 days.'
+        )
+
+    def test_rerun_does_not_duplicate(self):
+        self.assertEqual(create_trip_reminders(7), 5)
+        self.assertEqual(create_trip_reminders(7), 0)
+
+        self.assertEqual(Notification.objects.count(), 5)
+
+    def test_trips_on_other_days_are_left_alone(self):
+        self.assertEqual(create_trip_reminders(3), 0)
+        self.assertFalse(Notification.objects.exists())
+
+    @override_settings(TRIP_REMINDER_DAYS=[7, 1])
+    def test_beat_task_covers_configured_days(self):
+        self.assertEqual(send_trip_reminders(), {7: 5, 1: 0})
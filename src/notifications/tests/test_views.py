@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.messages import get_messages
 from notifications.models import Notification
@@ -171,3 +173,85 @@ class NotificationDeleteViewTest(TestCase):
 
         self.assertEqual(len(messages), 1)
         self.assertIn("deleted", str(messages[0]))
+
+
+class NotificationBulkActionViewTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.url = reverse("notification-bulk")
+        self.client.force_login(self.user)
+
+    def post_json(self, data):
+        return self.client.post(self.url, data, HTTP_ACCEPT="application/json")
+
+    def test_marks_selected_read_in_one_update(self):
+        selected = [NotificationFactory(recipient=self.user) for _ in range(3)]
+        NotificationFactory(recipient=self.user)
+        others = NotificationFactory(is_read=False)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_json(
+                {"action": "read", "ids": [n.pk for n in selected] + [others.pk]}
+            )
+
+        updates = [q for q in queries if q["sql"].startswith('UPDATE "notifications_')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(response.json()["affected"], 3)
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.user, is_read=False).count(), 1
+        )
+        self.assertFalse(
+            Notification.objects.filter(is_read=True, read_at__isnull=True).exists()
+        )
+        others.refresh_from_db()
+        self.assertFalse(others.is_read)
+
+    def test_mark_unread_clears_read_at(self):
+        notification = NotificationFactory(recipient=self.user)
+        notification.mark_as_read()
+
+        response = self.post_json({"action": "unread", "ids": [notification.pk]})
+
+        self.assertEqual(response.json()["affected"], 1)
+        notification.refresh_from_db()
+        self.assertIsNone(notification.read_at)
+
+    def test_deletes_by_type_in_one_statement(self):
+        NotificationFactory(recipient=self.user, notification_type="trip_reminder")
+        NotificationFactory(recipient=self.user, notification_type="trip_reminder")
+        kept = NotificationFactory(recipient=self.user, notification_type="trip_invite")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_json(
+                {"action": "delete", "notification_type": "trip_reminder"}
+            )
+
+        deletes = [
+            q for q in queries if q["sql"].startswith('DELETE FROM "notifications_')
+        ]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(response.json()["affected"], 2)
+        self.assertEqual(list(Notification.objects.all()), [kept])
+
+    def test_filters_by_trip_and_redirects_for_forms(self):
+        notification = NotificationFactory(recipient=self.user)
+        NotificationFactory(recipient=self.user)
+
+        response = self.client.post(
+            self.url, {"action": "read", "trip": notification.trip_id}
+        )
+
+        self.assertRedirects(response, reverse("notification-list"))
+        self.assertIn(
+            "1 notification marked as read",
+            str(list(get_messages(response.wsgi_request))[0]),
+        )
+
+    def test_requires_a_selection(self):
+        NotificationFactory(recipient=self.user)
+
+        response = self.post_json({"action": "delete"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Notification.objects.count(), 1)
@@ -4,15 +4,19 @@ from .views import (
     NotificationMarkReadView,
     NotificationMarkAllReadView,
     NotificationDeleteView,
+    NotificationBulkActionView,
+    notification_events,
 )
 
 urlpatterns = [
     path("", NotificationListView.as_view(), name="notification-list"),
+    path("events/", notification_events, name="notification-events"),
     path(
         "<int:pk>/read/",
         NotificationMarkReadView.as_view(),
         name="notification-mark-read",
     ),
+    path("bulk/", NotificationBulkActionView.as_view(), name="notification-bulk"),
     path(
         "read-all/",
         NotificationMarkAllReadView.as_view(),
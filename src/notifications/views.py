@@ -1,9 +1,17 @@
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import redirect
+from django.db.models.functions import Coalesce, Now
+from django.http import Http404, JsonResponse
 from django.views import View
+from django.views.decorators.http import require_GET
 from django.views.generic import ListView
+from core.events import sse_response
+from .events import notifications_channel, publish_unread_counts
+from .forms import NotificationBulkActionForm
 from .models import Notification
+from .services import bulk_update_notifications
 
 
 class NotificationListView(LoginRequiredMixin, ListView):
@@ -29,23 +37,79 @@ class NotificationListView(LoginRequiredMixin, ListView):
 
 class NotificationMarkReadView(LoginRequiredMixin, View):
     def post(self, request, pk):
-        notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
-        notification.mark_as_read()
+        # one UPDATE - a notification that was already read keeps its read_at
+        updated = Notification.objects.filter(pk=pk, recipient=request.user).update(
+            is_read=True, read_at=Coalesce("read_at", Now())
+        )
+        if not updated:
+            raise Http404("No notification found.")
+        publish_unread_counts([request.user.pk])
         return redirect("notification-list")
 
 
 class NotificationMarkAllReadView(LoginRequiredMixin, View):
     def post(self, request):
-        Notification.objects.filter(recipient=request.user, is_read=False).update(
-            is_read=True
-        )
+        bulk_update_notifications(request.user, "read")
         messages.success(request, "All notifications marked as read.")
         return redirect("notification-list")
 
 
 class NotificationDeleteView(LoginRequiredMixin, View):
     def post(self, request, pk):
-        notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
-        notification.delete()
+        deleted, _ = Notification.objects.filter(pk=pk, recipient=request.user).delete()
+        if not deleted:
+            raise Http404("No notification found.")
+        publish_unread_counts([request.user.pk])
         messages.success(request, "Notification deleted.")
         return redirect("notification-list")
+
+
+class NotificationBulkActionView(LoginRequiredMixin, View):
+    """Read, unread or delete many notifications - by ids, type or trip"""
+
+    MESSAGES = {
+        "read": "marked as read",
+        "unread": "marked as unread",
+        "delete": "deleted",
+    }
+
+    def post(self, request):
+        form = NotificationBulkActionForm(request.POST)
+        wants_json = request.headers.get("Accept", "").startswith("application/json")
+
+        if not form.is_valid():
+            if wants_json:
+                return JsonResponse(
+                    {"success": False, "errors": form.errors}, status=400
+                )
+            for error in form.non_field_errors():
+                messages.error(request, error)
+            return redirect("notification-list")
+
+        action = form.cleaned_data["action"]
+        affected = bulk_update_notifications(
+            request.user,
+            action,
+            ids=form.cleaned_data["ids"] or None,
+            notification_type=form.cleaned_data["notification_type"] or None,
+            trip=form.cleaned_data["trip"],
+        )
+
+        if wants_json:
+            return JsonResponse(
+                {"success": True, "action": action, "affected": affected}
+            )
+
+        messages.success(
+            request,
+            f"{affected} notification{'s' if affected != 1 else ''} {self.MESSAGES[action]}.",
+        )
+        return redirect("notification-list")
+
+
+@login_required
+@require_GET
+async def notification_events(request):
+    """Unread count changes and new notification previews as Server-Sent Events"""
+    user = await request.auser()
+    return sse_response(request, notifications_channel(user.pk))
@@ -4,12 +4,12 @@ from .models import PackingList, PackingListTemplate, PackingItem, PackingItemTe
 
 @admin.register(PackingListTemplate)
 class PackingListTemplateAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "user", "created_at")
+    list_display = ("id", "name", "user", "is_public", "parent", "created_at")
 
 
 @admin.register(PackingItemTemplate)
 class PackingTemplateItemAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "quantity", "template")
+    list_display = ("id", "name", "quantity", "template", "overrides", "is_removed")
 
 
 @admin.register(PackingList)
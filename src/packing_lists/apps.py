@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import pre_delete
 
 
 class PackingListConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "packing_lists"
+
+    def ready(self):
+        from .models import PackingListTemplate, materialize_forks_on_delete
+
+        pre_delete.connect(materialize_forks_on_delete, sender=PackingListTemplate)
@@ -0,0 +1,26 @@
+from django.db import transaction
+from core.events import publish
+
+
+def packing_list_channel(packing_list_id):
+    return f"packing_list:{packing_list_id}"
+
+
+def publish_item_event(item, event, item_id=None):
+    """Pushes an item change to live viewers of the list once it is committed"""
+    payload = {
+        "item_id": item_id or item.pk,
+        "item_name": item.item_name,
+        "item_quantity": item.item_quantity,
+        "version": item.version,
+        "is_packed": item.is_packed,
+        "packed_by": item.packed_by.username if item.packed_by else None,
+    }
+    channel = packing_list_channel(item.packing_list_id)
+    transaction.on_commit(lambda: publish(channel, event, **payload))
+
+
+def publish_list_event(packing_list_id, event, **data):
+    """Pushes a change that touches many items, viewers reload the list"""
+    channel = packing_list_channel(packing_list_id)
+    transaction.on_commit(lambda: publish(channel, event, **data))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from packing_lists.models import PackingList
+from shopping_list.models import ShoppingList
+
+
+class Command(BaseCommand):
+    help = "Recomputes item counters on packing and shopping lists that drifted"
+
+    def handle(self, *args, **options):
+        packing_fixed = PackingList.reconcile_counters()
+        shopping_fixed = ShoppingList.reconcile_counters()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fixed {packing_fixed} packing list(s) "
+                f"and {shopping_fixed} shopping list(s)."
+            )
+        )
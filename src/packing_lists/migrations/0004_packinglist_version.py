@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packing_lists", "0003_alter_packingitemtemplate_template"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packinglist",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
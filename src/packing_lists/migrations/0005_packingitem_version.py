@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packing_lists", "0004_packinglist_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packingitem",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+def fill_counters(apps, schema_editor):
+    PackingList = apps.get_model("packing_lists", "PackingList")
+    lists = PackingList.objects.annotate(
+        actual_items=models.Count("items"),
+        actual_done=models.Count("items", filter=models.Q(items__is_packed=True)),
+    )
+    for item_list in lists:
+        PackingList.objects.filter(pk=item_list.pk).update(
+            item_count=item_list.actual_items, packed_count=item_list.actual_done
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packing_lists", "0005_packingitem_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packinglist",
+            name="item_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="packinglist",
+            name="packed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packing_lists", "0006_packinglist_item_count_packinglist_packed_count"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="packingitemtemplate",
+            options={"ordering": ["pk"]},
+        ),
+        migrations.AddField(
+            model_name="packingitemtemplate",
+            name="is_removed",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="packingitemtemplate",
+            name="overrides",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="overridden_by",
+                to="packing_lists.packingitemtemplate",
+            ),
+        ),
+        migrations.AddField(
+            model_name="packinglisttemplate",
+            name="is_public",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="packinglisttemplate",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="forks",
+                to="packing_lists.packinglisttemplate",
+            ),
+        ),
+    ]
@@ -1,29 +1,138 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from trips.models import Trip
+from core.exceptions import VersionConflict
+from core.sync import LiveManager
 
 User = get_user_model()
 
 
+class PackingListTemplateQuerySet(models.QuerySet):
+    def with_item_count(self):
+        """Annotates item_count, counting inherited items of forks"""
+
+        def count(**filters):
+            rows = (
+                PackingItemTemplate.objects.filter(**filters)
+                .order_by()
+                .values("template")
+                .annotate(total=models.Count("pk"))
+                .values("total")
+            )
+            return Coalesce(models.Subquery(rows), 0)
+
+        own = count(
+            template=models.OuterRef("pk"), overrides__isnull=True, is_removed=False
+        )
+        inherited = count(template=models.OuterRef("parent"), is_removed=False)
+        hidden = count(
+            template=models.OuterRef("pk"), overrides__isnull=False, is_removed=True
+        )
+        return self.annotate(item_count=own + inherited - hidden)
+
+
 class PackingListTemplate(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="packing_templates"
     )
     name = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
+    # public templates are listed in the library and can be forked by anyone
+    is_public = models.BooleanField(default=False)
+    # a fork stores only its differences from the parent (copy-on-write);
+    # parents are always root templates, so items resolve in one query
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="forks",
+    )
+
+    objects = PackingListTemplateQuerySet.as_manager()
+
+    def effective_items(self):
+        """Own items plus the parent's items this template hasn't overridden"""
+        own = models.Q(template=self, is_removed=False)
+        if self.parent_id is None:
+            return PackingItemTemplate.objects.filter(own)
+
+        shadowed = self.items.filter(overrides__isnull=False).values("overrides")
+        inherited = models.Q(template_id=self.parent_id, is_removed=False) & ~models.Q(
+            pk__in=shadowed
+        )
+        return PackingItemTemplate.objects.filter(own | inherited)
+
+    def can_be_forked_by(self, user):
+        return self.is_public or self.user_id == user.pk
+
+    def fork(self, user):
+        """New template for the user that shares this template's items"""
+        if self.parent_id is None:
+            return PackingListTemplate.objects.create(
+                user=user, name=self.name, parent=self
+            )
+
+        # forking a fork keeps the chain one level deep: same parent, and the
+        # (usually few) overlay rows are copied
+        fork = PackingListTemplate.objects.create(
+            user=user, name=self.name, parent_id=self.parent_id
+        )
+        PackingItemTemplate.objects.bulk_create(
+            PackingItemTemplate(
+                template=fork,
+                name=item.name,
+                quantity=item.quantity,
+                overrides_id=item.overrides_id,
+                is_removed=item.is_removed,
+            )
+            for item in self.items.all()
+        )
+        return fork
+
+    def materialize_forks(self, exclude_user=None):
+        """Copies inherited items into every fork, before this template goes away"""
+        forks = self.forks.all()
+        if exclude_user is not None:
+            forks = forks.exclude(user=exclude_user)
+
+        parent_items = list(self.items.filter(is_removed=False))
+        copies = []
+        for fork in forks:
+            shadowed = set(
+                fork.items.filter(overrides__isnull=False).values_list(
+                    "overrides", flat=True
+                )
+            )
+            copies.extend(
+                PackingItemTemplate(
+                    template=fork, name=item.name, quantity=item.quantity
+                )
+                for item in parent_items
+                if item.pk not in shadowed
+            )
+        PackingItemTemplate.objects.bulk_create(copies)
+        # with the parent gone, hide markers have nothing left to hide
+        PackingItemTemplate.objects.filter(template__in=forks, is_removed=True).delete()
 
     def apply_to_trip(self, trip, user):
         packing_list = PackingList.objects.create(
             trip=trip, user=user, list_type="private"
         )
 
-        for item in self.items.all():
-            PackingItem.objects.create(
+        items = PackingItem.objects.bulk_create(
+            PackingItem(
                 packing_list=packing_list,
                 item_name=item.name,
                 item_quantity=item.quantity,
                 added_by=user,
             )
+            for item in self.effective_items()
+        )
+        # bulk_create skips save(), so counters are moved in one go
+        PackingList.record_item_change(packing_list.pk, items=len(items))
 
         return packing_list
 
@@ -37,11 +146,30 @@ class PackingItemTemplate(models.Model):
     )
     name = models.CharField(max_length=100)
     quantity = models.IntegerField(default=1)
+    # in a fork: the parent item this row replaces, or hides when is_removed
+    overrides = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="overridden_by",
+    )
+    is_removed = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["pk"]
 
     def __str__(self):
         return f"{self.name}: x{self.quantity}"
 
 
+def materialize_forks_on_delete(sender, instance, origin=None, **kwargs):
+    """pre_delete receiver - forks keep their items when the parent is deleted"""
+    # the user's own forks are deleted in the same cascade
+    exclude_user = origin if isinstance(origin, User) else None
+    instance.materialize_forks(exclude_user=exclude_user)
+
+
 class PackingList(models.Model):
     LIST_TYPE_CHOICES = [("private", "Private"), ("shared", "Shared")]
 
@@ -58,10 +186,62 @@ class PackingList(models.Model):
         blank=True,
         related_name="private_packing_lists",
     )
+    # bumped on every item change - part of fragment cache keys
+    version = models.PositiveIntegerField(default=0)
+    # maintained by PackingItem, repaired by `manage.py reconcile_list_counters`
+    item_count = models.PositiveIntegerField(default=0)
+    packed_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ["list_type", "-created_at"]
 
+    def bump_version(self):
+        """Invalidates cached fragments rendered for this list"""
+        PackingList.objects.filter(pk=self.pk).update(version=models.F("version") + 1)
+
+    @classmethod
+    def record_item_change(cls, pk, items=0, packed=0):
+        """Bumps the version and shifts the counters in a single UPDATE"""
+        cls.objects.filter(pk=pk).update(
+            version=models.F("version") + 1,
+            item_count=models.F("item_count") + items,
+            packed_count=models.F("packed_count") + packed,
+        )
+
+    @classmethod
+    def reconcile_counters(cls):
+        """Recomputes counters from the item table, returns the number of lists fixed"""
+        live_items = models.Q(items__deleted_at__isnull=True)
+        lists = cls.objects.annotate(
+            actual_items=models.Count("items", filter=live_items),
+            actual_packed=models.Count(
+                "items", filter=live_items & models.Q(items__is_packed=True)
+            ),
+        ).exclude(
+            item_count=models.F("actual_items"), packed_count=models.F("actual_packed")
+        )
+
+        fixed = 0
+        for packing_list in lists:
+            cls.objects.filter(pk=packing_list.pk).update(
+                version=models.F("version") + 1,
+                item_count=packing_list.actual_items,
+                packed_count=packing_list.actual_packed,
+            )
+            fixed += 1
+        return fixed
+
+    @property
+    def unpacked_count(self):
+        return self.item_count - self.packed_count
+
+    @property
+    def progress(self):
+        """Packed share in percent, for progress bars"""
+        if not self.item_count:
+            return 0
+        return round(self.packed_count * 100 / self.item_count)
+
     def __str__(self):
         if self.list_type == "private" and self.user:
             return f"{self.user.username} {self.trip.title} list"
@@ -77,6 +257,11 @@ class PackingItem(models.Model):
     item_quantity = models.IntegerField(default=1)
     is_packed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # change feed for offline sync, see api/sync.py
+    updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # optimistic locking - every write increments it
+    version = models.PositiveIntegerField(default=0)
 
     # for shared list
     added_by = models.ForeignKey(
@@ -94,16 +279,81 @@ class PackingItem(models.Model):
         related_name="packed_items",
     )
 
+    objects = LiveManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ["-is_packed", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["packing_list", "updated_at"], name="packing_item_sync_idx"
+            )
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so that save() can tell whether packed_count has to move
+        instance._loaded_is_packed = instance.__dict__.get("is_packed")
+        return instance
+
+    def update_if_current(self, **changes):
+        """Writes only the given fields, if nobody changed the item since it was read"""
+        changes["updated_at"] = timezone.now()
+        updated = PackingItem.objects.filter(pk=self.pk, version=self.version).update(
+            version=models.F("version") + 1, **changes
+        )
+        if not updated:
+            raise VersionConflict(
+                f'Item "{self.item_name}" was changed by someone else.'
+            )
+
+        items = packed = 0
+        if "is_packed" in changes:
+            packed = int(changes["is_packed"]) - int(self.is_packed)
+        if changes.get("deleted_at"):
+            items, packed = -1, -int(self.is_packed)
+
+        for field, value in changes.items():
+            setattr(self, field, value)
+        self.version += 1
+        self._loaded_is_packed = self.is_packed
+
+        PackingList.record_item_change(self.packing_list_id, items=items, packed=packed)
 
     def marked_as_packed(self, user):
-        self.is_packed = True
+        changes = {"is_packed": True}
 
         if self.packing_list.list_type == "shared" and user:
-            self.packed_by = user
+            changes["packed_by"] = user
+
+        self.update_if_current(**changes)
+
+    def marked_as_unpacked(self):
+        self.update_if_current(is_packed=False, packed_by=None)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            items, packed = 1, int(self.is_packed)
+        else:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+            items = packed = 0
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None or "is_packed" in update_fields:
+                packed = int(self.is_packed) - int(
+                    getattr(self, "_loaded_is_packed", self.is_packed)
+                )
+
+        super().save(*args, **kwargs)
+        self._loaded_is_packed = self.is_packed
+        PackingList.record_item_change(self.packing_list_id, items=items, packed=packed)
 
-        self.save()
+    def delete(self, *args, **kwargs):
+        """Soft delete - the row stays as a tombstone for offline clients"""
+        self.update_if_current(deleted_at=timezone.now())
+        return 1, {self._meta.label: 1}
 
     def __str__(self):
         return f"{self.item_name} x{self.item_quantity}"
@@ -0,0 +1,70 @@
+import threading
+from django.db import connection
+from django.test import TransactionTestCase
+from core.exceptions import VersionConflict
+from packing_lists.models import PackingItem, PackingList
+from .factories import UserFactory, TripFactory, PackingListFactory, PackingItemFactory
+
+
+class ConcurrentToggleTest(TransactionTestCase):
+    """Members toggling the same item at once - exactly one write may win"""
+
+    THREADS = 8
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.packing_list = PackingListFactory(
+            trip=self.trip, user=None, list_type="shared"
+        )
+        self.item = PackingItemFactory(
+            packing_list=self.packing_list, added_by=self.user
+        )
+
+    def toggle_concurrently(self, toggle):
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+
+        def worker(index):
+            try:
+                item = PackingItem.objects.get(pk=self.item.pk)
+                barrier.wait()  # everybody read version 0 before anybody writes
+                toggle(item, index)
+                results.append("ok")
+            except VersionConflict:
+                results.append("conflict")
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_only_one_concurrent_toggle_wins(self):
+        results = self.toggle_concurrently(
+            lambda item, index: (
+                item.marked_as_packed(self.user)
+                if index % 2
+                else item.marked_as_unpacked()
+            )
+        )
+
+        self.assertEqual(results.count("ok"), 1)
+        self.assertEqual(results.count("conflict"), self.THREADS - 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.version, 1)
+
+    def test_list_version_counts_only_successful_writes(self):
+        self.packing_list.refresh_from_db()
+        list_version = self.packing_list.version
+
+        self.toggle_concurrently(lambda item, index: item.marked_as_packed(self.user))
+
+        self.assertEqual(
+            PackingList.objects.get(pk=self.packing_list.pk).version, list_version + 1
+        )
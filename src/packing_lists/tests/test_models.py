@@ -1,4 +1,9 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from core.exceptions import VersionConflict
+from packing_lists.models import PackingItem, PackingList, PackingListTemplate
 from .factories import (
     UserFactory,
     TripFactory,
@@ -24,6 +29,69 @@ class PackingListModelTest(TestCase):
         self.assertEqual(str(packing_list), f"Shared {trip.title} list")
 
 
+class PackingListCountersTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.packing_list = PackingListFactory(user=self.user)
+
+    def test_counters_follow_item_create_toggle_and_delete(self):
+        item = PackingItemFactory(packing_list=self.packing_list)
+        PackingItemFactory(packing_list=self.packing_list, is_packed=True)
+
+        self.packing_list.refresh_from_db()
+        self.assertEqual(self.packing_list.item_count, 2)
+        self.assertEqual(self.packing_list.packed_count, 1)
+
+        item.marked_as_packed(self.user)
+        self.packing_list.refresh_from_db()
+        self.assertEqual(self.packing_list.packed_count, 2)
+        self.assertEqual(self.packing_list.progress, 100)
+
+        item.delete()
+        self.packing_list.refresh_from_db()
+        self.assertEqual(self.packing_list.item_count, 1)
+        self.assertEqual(self.packing_list.packed_count, 1)
+
+    def test_save_moves_packed_count_only_when_flag_changes(self):
+        item = PackingItemFactory(packing_list=self.packing_list)
+        item = PackingItem.objects.get(pk=item.pk)
+
+        item.item_name = "Renamed"
+        item.save()
+        item.is_packed = True
+        item.save()
+
+        self.packing_list.refresh_from_db()
+        self.assertEqual(self.packing_list.item_count, 1)
+        self.assertEqual(self.packing_list.packed_count, 1)
+
+    def test_delete_leaves_a_tombstone_out_of_counts(self):
+        item = PackingItemFactory(packing_list=self.packing_list, is_packed=True)
+
+        item.delete()
+
+        self.assertFalse(self.packing_list.items.exists())
+        tombstone = PackingItem.all_objects.get(pk=item.pk)
+        self.assertIsNotNone(tombstone.deleted_at)
+        self.assertEqual(tombstone.version, 1)
+        self.assertEqual(PackingList.reconcile_counters(), 0)
+
+    def test_reconcile_command_repairs_drift(self):
+        PackingItemFactory(packing_list=self.packing_list, is_packed=True)
+        PackingList.objects.filter(pk=self.packing_list.pk).update(
+            item_count=7, packed_count=0
+        )
+
+        out = StringIO()
+        call_command("reconcile_list_counters", stdout=out)
+
+        self.packing_list.refresh_from_db()
+        self.assertEqual(self.packing_list.item_count, 1)
+        self.assertEqual(self.packing_list.packed_count, 1)
+        self.assertIn("Fixed 1 packing list(s)", out.getvalue())
+
+
 class PackingItemModelTest(TestCase):
 
     def setUp(self):
@@ -57,6 +125,41 @@ class PackingItemModelTest(TestCase):
         self.assertTrue(item.is_packed)
         self.assertEqual(item.packed_by, self.user)
 
+    def test_item_changes_bump_list_version(self):
+        self.packing_list.refresh_from_db()
+        version = self.packing_list.version
+
+        self.item.marked_as_packed(self.user)
+        self.item.delete()
+
+        self.packing_list.refresh_from_db()
+        self.assertEqual(self.packing_list.version, version + 2)
+
+    def test_marked_as_unpacked_clears_packed_by(self):
+        shared_list = PackingListFactory(trip=self.trip, user=None, list_type="shared")
+        item = PackingItemFactory(packing_list=shared_list, added_by=self.user)
+        item.marked_as_packed(self.user)
+        item.marked_as_unpacked()
+        item.refresh_from_db()
+        self.assertFalse(item.is_packed)
+        self.assertIsNone(item.packed_by)
+
+    def test_toggle_increments_version(self):
+        self.item.marked_as_packed(self.user)
+        self.assertEqual(self.item.version, 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.version, 1)
+
+    def test_stale_toggle_raises_version_conflict(self):
+        stale = PackingItem.objects.get(pk=self.item.pk)
+        self.item.marked_as_packed(self.user)
+
+        with self.assertRaises(VersionConflict):
+            stale.marked_as_unpacked()
+
+        self.item.refresh_from_db()
+        self.assertTrue(self.item.is_packed)
+
 
 class PackingListTemplateModelTest(TestCase):
 
@@ -76,6 +179,104 @@ class PackingListTemplateModelTest(TestCase):
         self.assertEqual(packing_list.trip, trip)
         self.assertEqual(packing_list.user, user)
         self.assertEqual(packing_list.items.count(), 2)
+        packing_list.refresh_from_db()
+        self.assertEqual(packing_list.item_count, 2)
+
+
+class PackingListTemplateForkTest(TestCase):
+
+    def setUp(self):
+        self.parent = PackingListTemplateFactory(name="Beach week", is_public=True)
+        self.towel = PackingItemTemplateFactory(template=self.parent, name="Towel")
+        self.hat = PackingItemTemplateFactory(template=self.parent, name="Hat")
+        self.user = UserFactory()
+        self.fork = self.parent.fork(self.user)
+
+    def names(self, template):
+        return sorted(template.effective_items().values_list("name", "quantity"))
+
+    def test_fork_shares_parent_items_without_copying(self):
+        self.assertEqual(self.fork.items.count(), 0)
+        self.assertEqual(self.names(self.fork), [("Hat", 1), ("Towel", 1)])
+
+    def test_overrides_and_removals_stay_in_the_fork(self):
+        PackingItemTemplateFactory(
+            template=self.fork, name="Towel", quantity=2, overrides=self.towel
+        )
+        PackingItemTemplateFactory(
+            template=self.fork, name="Hat", overrides=self.hat, is_removed=True
+        )
+        PackingItemTemplateFactory(template=self.fork, name="Snorkel")
+
+        self.assertEqual(self.names(self.fork), [("Snorkel", 1), ("Towel", 2)])
+        self.assertEqual(self.names(self.parent), [("Hat", 1), ("Towel", 1)])
+        counts = dict(
+            PackingListTemplate.objects.with_item_count().values_list(
+                "pk", "item_count"
+            )
+        )
+        self.assertEqual(counts, {self.parent.pk: 2, self.fork.pk: 2})
+
+    def test_fork_of_fork_points_at_the_root(self):
+        PackingItemTemplateFactory(
+            template=self.fork, name="Hat", overrides=self.hat, is_removed=True
+        )
+
+        second = self.fork.fork(UserFactory())
+
+        self.assertEqual(second.parent, self.parent)
+        self.assertEqual(self.names(second), [("Towel", 1)])
+
+    def test_apply_to_trip_materializes_effective_items(self):
+        PackingItemTemplateFactory(
+            template=self.fork, name="Towel", quantity=3, overrides=self.towel
+        )
+
+        packing_list = self.fork.apply_to_trip(TripFactory(owner=self.user), self.user)
+
+        self.assertEqual(
+            sorted(packing_list.items.values_list("item_name", "item_quantity")),
+            [("Hat", 1), ("Towel", 3)],
+        )
+
+    def test_deleting_parent_copies_items_into_forks(self):
+        PackingItemTemplateFactory(
+            template=self.fork, name="Hat", overrides=self.hat, is_removed=True
+        )
+
+        self.parent.delete()
+        self.fork.refresh_from_db()
+
+        self.assertIsNone(self.fork.parent)
+        self.assertEqual(self.names(self.fork), [("Towel", 1)])
+
+    def test_hidden_item_stays_hidden_after_parent_is_deleted(self):
+        PackingItemTemplateFactory(
+            template=self.fork, name="Hat", overrides=self.hat, is_removed=True
+        )
+        self.parent.delete()
+        self.fork.refresh_from_db()
+
+        second = self.fork.fork(UserFactory())
+
+        self.assertFalse(self.fork.items.filter(is_removed=True).exists())
+        self.assertEqual(self.names(second), [("Towel", 1)])
+        self.assertEqual(
+            PackingListTemplate.objects.with_item_count().get(pk=second.pk).item_count,
+            1,
+        )
+
+    def test_leftover_hide_markers_are_not_inherited(self):
+        self.hat.is_removed = True
+        self.hat.save()
+
+        self.assertEqual(self.names(self.fork), [("Towel", 1)])
+        self.assertEqual(
+            PackingListTemplate.objects.with_item_count()
+            .get(pk=self.fork.pk)
+            .item_count,
+            1,
+        )
 
 
 class PackingItemTemplateModelTest(TestCase):
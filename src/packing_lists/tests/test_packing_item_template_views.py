@@ -132,3 +132,29 @@ class PackingItemTemplateDeleteViewTest(TestCase):
         messages = list(get_messages(response.wsgi_request))
         self.assertEqual(len(messages), 1)
         self.assertIn("deleted", str(messages[0]))
+
+
+class PackingItemTemplateImportViewTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.template = PackingListTemplateFactory(user=self.user)
+        PackingItemTemplateFactory(template=self.template, name="Towel")
+        self.url = reverse(
+            "packing-item-template-import", kwargs={"template_pk": self.template.pk}
+        )
+        self.client.force_login(self.user)
+
+    def test_owner_can_import_items(self):
+        self.client.post(self.url, {"text": "2x socks\ntowel\nhat"})
+
+        self.assertEqual(
+            set(self.template.items.values_list("name", "quantity")),
+            {("Towel", 1), ("socks", 2), ("hat", 1)},
+        )
+
+    def test_other_user_cannot_import(self):
+        self.client.force_login(UserFactory())
+        self.client.post(self.url, {"text": "socks"})
+
+        self.assertEqual(self.template.items.count(), 1)
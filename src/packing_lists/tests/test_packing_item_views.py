@@ -1,8 +1,13 @@
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.messages import get_messages
 from trips.models import TripMember
-from packing_lists.models import PackingItem
+from packing_lists.models import PackingItem, PackingList
 from .factories import UserFactory, TripFactory, PackingListFactory, PackingItemFactory
 
 
@@ -111,6 +116,23 @@ class PackingItemUpdateViewTest(TestCase):
         self.assertEqual(len(messages), 1)
         self.assertIn("updated", str(messages[0]))
 
+    def test_stale_version_is_rejected(self):
+        self.item.marked_as_packed(self.user)  # someone else changed the item
+
+        response = self.client.post(self.url, {**self.data, "version": 0})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "changed by someone else")
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.item_name, "Test Item")
+
+    def test_current_version_is_saved(self):
+        self.client.post(self.url, {**self.data, "version": self.item.version})
+        self.item.refresh_from_db()
+
+        self.assertEqual(self.item.item_name, "Updated Item")
+        self.assertEqual(self.item.version, 1)
+
 
 class PackingItemDeleteViewTest(TestCase):
 
@@ -154,3 +176,110 @@ class PackingItemDeleteViewTest(TestCase):
         messages = list(get_messages(response.wsgi_request))
         self.assertEqual(len(messages), 1)
         self.assertIn("deleted", str(messages[0]))
+
+
+class TogglePackingItemViewTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.packing_list = PackingListFactory(
+            trip=self.trip, user=None, list_type="shared"
+        )
+        self.item = PackingItemFactory(
+            packing_list=self.packing_list, added_by=self.user
+        )
+        self.url = reverse("toggle-item-packed", kwargs={"item_id": self.item.pk})
+        self.client.force_login(self.user)
+
+    def toggle(self, **data):
+        return self.client.post(
+            self.url, data=json.dumps(data), content_type="application/json"
+        )
+
+    def test_marks_item_packed(self):
+        response = self.toggle(is_packed=True, version=0)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "success": True,
+                "is_packed": True,
+                "packed_by": self.user.username,
+                "version": 1,
+            },
+        )
+
+    def test_stale_version_returns_conflict(self):
+        self.toggle(is_packed=True, version=0)
+        response = self.toggle(is_packed=False, version=0)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.json()["conflict"])
+        self.assertTrue(response.json()["is_packed"])
+        self.assertEqual(response.json()["version"], 1)
+
+    def test_non_member_is_denied(self):
+        self.client.force_login(UserFactory())
+        response = self.toggle(is_packed=True)
+
+        self.assertEqual(response.status_code, 403)
+
+
+class PackingItemImportViewTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.packing_list = PackingListFactory(
+            trip=self.trip, user=self.user, list_type="private"
+        )
+        PackingItemFactory(packing_list=self.packing_list, item_name="Passport")
+        self.url = reverse(
+            "packing-item-import", kwargs={"list_pk": self.packing_list.pk}
+        )
+        self.client.force_login(self.user)
+
+    def test_imports_paste_with_batched_insert(self):
+        text = "\n".join(f"{i % 3 + 1}x item {i}" for i in range(500))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"text": text + "\npassport"})
+
+        inserts = [
+            q for q in queries if q["sql"].startswith('INSERT INTO "packing_lists_')
+        ]
+        # one statement on PostgreSQL, SQLite splits it at 999 parameters
+        self.assertLess(len(inserts), 10)
+        self.assertRedirects(
+            response,
+            reverse("packing-list-details", kwargs={"pk": self.packing_list.pk}),
+        )
+        self.packing_list.refresh_from_db()
+        self.assertEqual(self.packing_list.item_count, 501)
+        self.assertEqual(PackingItem.objects.get(item_name="item 4").item_quantity, 2)
+
+    def test_imports_csv_upload(self):
+        upload = SimpleUploadedFile("items.csv", b"name,quantity\nsocks,3\nhat,1\n")
+
+        self.client.post(self.url, {"file": upload})
+
+        self.assertEqual(
+            set(self.packing_list.items.values_list("item_name", "item_quantity")),
+            {("Passport", 1), ("socks", 3), ("hat", 1)},
+        )
+
+    def test_invalid_line_imports_nothing(self):
+        response = self.client.post(self.url, {"text": "socks\n0x hats"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Line 2")
+        self.assertEqual(self.packing_list.items.count(), 1)
+
+    def test_other_user_cannot_import(self):
+        self.client.force_login(UserFactory())
+        response = self.client.post(self.url, {"text": "socks"})
+
+        self.assertRedirects(response, reverse("trip-list"))
+        self.assertEqual(PackingList.objects.get().item_count, 1)
@@ -1,7 +1,7 @@
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.messages import get_messages
-from packing_lists.models import PackingListTemplate, PackingList
+from packing_lists.models import PackingListTemplate, PackingList, PackingItemTemplate
 from .factories import (
     UserFactory,
     TripFactory,
@@ -211,3 +211,103 @@ class ApplyPackingListTemplateViewTest(TestCase):
         messages = list(get_messages(response.wsgi_request))
         self.assertEqual(len(messages), 1)
         self.assertIn("applied", str(messages[0]))
+
+
+class PackingListTemplateLibraryTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.public = PackingListTemplateFactory(name="Beach week", is_public=True)
+        self.item = PackingItemTemplateFactory(template=self.public, name="Towel")
+        self.client.force_login(self.user)
+
+    def test_library_lists_only_public_templates(self):
+        private = PackingListTemplateFactory()
+
+        response = self.client.get(reverse("packing-list-template-library"))
+
+        self.assertIn(self.public, response.context["list_templates"])
+        self.assertNotIn(private, response.context["list_templates"])
+
+    def test_public_template_can_be_viewed_and_forked(self):
+        url = reverse("packing-list-template-details", kwargs={"pk": self.public.pk})
+        self.assertContains(self.client.get(url), "Add to My Templates")
+
+        response = self.client.post(
+            reverse("packing-list-template-fork", kwargs={"pk": self.public.pk})
+        )
+
+        fork = PackingListTemplate.objects.get(user=self.user)
+        self.assertRedirects(
+            response, reverse("packing-list-template-details", kwargs={"pk": fork.pk})
+        )
+        self.assertEqual(fork.parent, self.public)
+
+    def test_private_template_cannot_be_forked(self):
+        private = PackingListTemplateFactory()
+
+        response = self.client.post(
+            reverse("packing-list-template-fork", kwargs={"pk": private.pk})
+        )
+
+        self.assertRedirects(response, reverse("packing-list-template-library"))
+        self.assertFalse(PackingListTemplate.objects.filter(user=self.user).exists())
+
+    def test_editing_inherited_item_writes_to_the_fork(self):
+        fork = self.public.fork(self.user)
+        url = reverse(
+            "packing-item-template-override",
+            kwargs={"template_pk": fork.pk, "pk": self.item.pk},
+        )
+
+        self.client.post(url, {"name": "Beach towel", "quantity": 2})
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.name, "Towel")
+        self.assertEqual(
+            list(fork.effective_items().values_list("name", "quantity")),
+            [("Beach towel", 2)],
+        )
+
+    def test_editing_inherited_item_twice_keeps_one_override(self):
+        fork = self.public.fork(self.user)
+        url = reverse(
+            "packing-item-template-override",
+            kwargs={"template_pk": fork.pk, "pk": self.item.pk},
+        )
+
+        self.client.post(url, {"name": "Beach towel", "quantity": 2})
+        self.client.post(url, {"name": "Beach towel", "quantity": 3})
+
+        self.assertEqual(fork.items.filter(overrides=self.item).count(), 1)
+        self.assertEqual(
+            list(fork.effective_items().values_list("name", "quantity")),
+            [("Beach towel", 3)],
+        )
+        self.assertEqual(
+            PackingListTemplate.objects.with_item_count().get(pk=fork.pk).item_count,
+            1,
+        )
+
+    def test_removing_inherited_item_hides_it_in_the_fork(self):
+        fork = self.public.fork(self.user)
+        url = reverse(
+            "packing-item-template-hide",
+            kwargs={"template_pk": fork.pk, "pk": self.item.pk},
+        )
+
+        self.client.post(url)
+
+        self.assertFalse(fork.effective_items().exists())
+        self.assertTrue(PackingItemTemplate.objects.filter(pk=self.item.pk).exists())
+
+    def test_cannot_override_items_of_unrelated_template(self):
+        own = PackingListTemplateFactory(user=self.user)
+        url = reverse(
+            "packing-item-template-override",
+            kwargs={"template_pk": own.pk, "pk": self.item.pk},
+        )
+
+        response = self.client.post(url, {"name": "Mine", "quantity": 1})
+
+        self.assertRedirects(response, reverse("packing-list-template-list"))
@@ -1,9 +1,20 @@
+import asyncio
+import json
+from asgiref.sync import async_to_sync, sync_to_async
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.messages import get_messages
 from trips.models import TripMember
+from notifications.models import Notification
+from core.events import get_broker
 from packing_lists.models import PackingList
-from .factories import UserFactory, TripFactory, PackingListFactory
+from packing_lists.events import packing_list_channel
+from .factories import (
+    UserFactory,
+    TripFactory,
+    PackingListFactory,
+    PackingItemFactory,
+)
 
 
 class PackingListCreateViewTest(TestCase):
@@ -134,6 +145,50 @@ class PackingListDetailViewTest(TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    def test_live_updates_only_subscribed_under_asgi(self):
+        events_url = reverse("packing-list-events", kwargs={"pk": self.packing_list.pk})
+
+        self.assertNotContains(self.client.get(self.url), events_url)
+
+        async_to_sync(self.async_client.aforce_login)(self.user)
+        response = async_to_sync(self.async_client.get)(self.url)
+        self.assertContains(response, events_url)
+
+    def test_unchanged_list_returns_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_csrf_secret_invalidates_etag(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+        # logging in again rotates the secret behind the logout form's token
+        self.client.cookies["csrftoken"] = "a" * 32
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_notification_invalidates_etag(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+        Notification.objects.create(
+            recipient=self.user, notification_type="trip_invite", message="Hi"
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_item_change_invalidates_etag(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+        PackingItemFactory(packing_list=self.packing_list, added_by=self.user)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
 
 class PackingListDeleteViewTest(TestCase):
 
@@ -203,3 +258,63 @@ class PackingListsForTripViewTest(TestCase):
         self.client.force_login(other)
         response = self.client.get(self.url)
         self.assertRedirects(response, reverse("trip-list"))
+
+
+class PackingListEventsViewTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.packing_list = PackingListFactory(
+            trip=self.trip, user=None, list_type="shared"
+        )
+        self.item = PackingItemFactory(
+            packing_list=self.packing_list, added_by=self.user
+        )
+        self.url = reverse("packing-list-events", kwargs={"pk": self.packing_list.pk})
+        self.client.force_login(self.user)
+
+    def toggle_item(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("toggle-item-packed", kwargs={"item_id": self.item.pk}),
+                data=json.dumps({"is_packed": True}),
+                content_type="application/json",
+            )
+
+    async def test_member_gets_event_stream(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "text/event-stream")
+
+    def test_wsgi_request_is_not_held_open(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 204)
+
+    def test_non_member_is_denied(self):
+        self.client.force_login(UserFactory())
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_toggle_publishes_item_event(self):
+        channel = packing_list_channel(self.packing_list.pk)
+
+        async def listen_while_toggling():
+            subscription = get_broker().subscribe(channel)
+            next_message = asyncio.ensure_future(subscription.__anext__())
+            await asyncio.sleep(0)
+            await sync_to_async(self.toggle_item)()
+            message = await asyncio.wait_for(next_message, timeout=1)
+            await subscription.aclose()
+            return json.loads(message)
+
+        event = async_to_sync(listen_while_toggling)()
+
+        self.assertEqual(event["event"], "item_toggled")
+        self.assertEqual(event["item_id"], self.item.pk)
+        self.assertTrue(event["is_packed"])
+        self.assertEqual(event["packed_by"], self.user.username)
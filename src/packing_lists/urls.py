@@ -7,11 +7,16 @@ from .views.packing_list_template_views import (
     PackingListTemplateDeleteView,
     ApplyPackingListTemplateView,
     SelectTemplateForTripView,
+    PackingListTemplateLibraryView,
+    ForkPackingListTemplateView,
 )
 from .views.packing_item_template_views import (
     PackingItemTemplateCreateView,
     PackingItemTemplateUpdateView,
     PackingItemTemplateDeleteView,
+    PackingItemTemplateImportView,
+    PackingItemTemplateOverrideView,
+    PackingItemTemplateHideView,
 )
 from .views.packing_list_views import (
     PackingListDetailView,
@@ -21,11 +26,13 @@ from .views.packing_list_views import (
     SavePackingListAsTemplateView,
     PackingListCreateSharedView,
     toggle_item_packed,
+    packing_list_events,
 )
 from .views.packing_item_views import (
     PackingItemCreateView,
     PackingItemUpdateView,
     PackingItemDeleteView,
+    PackingItemImportView,
 )
 
 urlpatterns = [
@@ -39,6 +46,16 @@ urlpatterns = [
         PackingListTemplateCreateView.as_view(),
         name="packing-list-template-create",
     ),
+    path(
+        "templates/library/",
+        PackingListTemplateLibraryView.as_view(),
+        name="packing-list-template-library",
+    ),
+    path(
+        "templates/<int:pk>/fork/",
+        ForkPackingListTemplateView.as_view(),
+        name="packing-list-template-fork",
+    ),
     path(
         "templates/<int:pk>/",
         PackingListTemplateDetailView.as_view(),
@@ -64,6 +81,21 @@ urlpatterns = [
         PackingItemTemplateCreateView.as_view(),
         name="packing-item-template-create",
     ),
+    path(
+        "templates/<int:template_pk>/items/import/",
+        PackingItemTemplateImportView.as_view(),
+        name="packing-item-template-import",
+    ),
+    path(
+        "templates/<int:template_pk>/inherited/<int:pk>/update/",
+        PackingItemTemplateOverrideView.as_view(),
+        name="packing-item-template-override",
+    ),
+    path(
+        "templates/<int:template_pk>/inherited/<int:pk>/delete/",
+        PackingItemTemplateHideView.as_view(),
+        name="packing-item-template-hide",
+    ),
     path(
         "template-items/<int:pk>/update/",
         PackingItemTemplateUpdateView.as_view(),
@@ -97,6 +129,11 @@ urlpatterns = [
     path(
         "lists/<int:pk>/", PackingListDetailView.as_view(), name="packing-list-details"
     ),
+    path(
+        "lists/<int:pk>/events/",
+        packing_list_events,
+        name="packing-list-events",
+    ),
     path(
         "lists/<int:pk>/save-as-template/",
         SavePackingListAsTemplateView.as_view(),
@@ -112,6 +149,11 @@ urlpatterns = [
         PackingItemCreateView.as_view(),
         name="packing-item-create",
     ),
+    path(
+        "lists/<int:list_pk>/items/import/",
+        PackingItemImportView.as_view(),
+        name="packing-item-import",
+    ),
     path(
         "items/<int:pk>/update/",
         PackingItemUpdateView.as_view(),
@@ -1,8 +1,9 @@
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import redirect, get_object_or_404
-from django.views.generic import CreateView, UpdateView, DeleteView
+from django.views.generic import CreateView, UpdateView, DeleteView, View
+from core.importers import ItemImportView
 from ..models import PackingItemTemplate, PackingListTemplate
 
 
@@ -101,6 +102,11 @@ class PackingItemTemplateDeleteView(
     def form_valid(self, form):
         self.template_pk = self.get_object().template.pk
         messages.success(self.request, f'Template-item "{self.object.name}" deleted!')
+        if self.object.overrides_id:
+            # still has to hide the parent's item
+            self.object.is_removed = True
+            self.object.save(update_fields=["is_removed"])
+            return redirect(self.get_success_url())
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -113,3 +119,130 @@ class PackingItemTemplateDeleteView(
             return super().handle_no_permission()
         messages.error(self.request, "You cannot delete this item.")
         return redirect("packing-list-template-list")
+
+
+class InheritedItemMixin(LoginRequiredMixin, UserPassesTestMixin):
+    """A fork's owner changing an item the fork inherits from its parent"""
+
+    def test_func(self):
+        self.packing_template = get_object_or_404(
+            PackingListTemplate, pk=self.kwargs["template_pk"]
+        )
+        self.inherited_item = get_object_or_404(
+            PackingItemTemplate, pk=self.kwargs["pk"]
+        )
+        return (
+            user_owns_template(self.request.user, self.packing_template)
+            and self.packing_template.parent_id is not None
+            and self.inherited_item.template_id == self.packing_template.parent_id
+        )
+
+    def get_success_url(self):
+        return reverse(
+            "packing-list-template-details", kwargs={"pk": self.packing_template.pk}
+        )
+
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        messages.error(self.request, "You cannot change this item.")
+        return redirect("packing-list-template-list")
+
+
+class PackingItemTemplateOverrideView(InheritedItemMixin, CreateView):
+    """Edits an inherited item by storing the fork's own version of it"""
+
+    model = PackingItemTemplate
+    template_name = "packing_lists/packing_item_template_create.html"
+    fields = ["name", "quantity"]
+
+    def get_initial(self):
+        current = (
+            self.packing_template.items.filter(
+                overrides=self.inherited_item, is_removed=False
+            ).first()
+            or self.inherited_item
+        )
+        return {"name": current.name, "quantity": current.quantity}
+
+    def form_valid(self, form):
+        # one override per inherited item - a second edit or a double
+        # submit changes it instead of shadowing the item twice
+        self.object, _ = PackingItemTemplate.objects.update_or_create(
+            template=self.packing_template,
+            overrides=self.inherited_item,
+            defaults={
+                "name": form.cleaned_data["name"],
+                "quantity": form.cleaned_data["quantity"],
+                "is_removed": False,
+            },
+        )
+        messages.success(self.request, f'Template-item "{self.object.name}" updated!')
+        return redirect(self.get_success_url())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["packing_template"] = self.packing_template
+        return context
+
+
+class PackingItemTemplateHideView(InheritedItemMixin, View):
+    """Removes an inherited item from the fork only"""
+
+    def post(self, request, *args, **kwargs):
+        PackingItemTemplate.objects.update_or_create(
+            template=self.packing_template,
+            overrides=self.inherited_item,
+            defaults={
+                "name": self.inherited_item.name,
+                "quantity": self.inherited_item.quantity,
+                "is_removed": True,
+            },
+        )
+        messages.success(
+            request, f'Template-item "{self.inherited_item.name}" deleted!'
+        )
+        return redirect(self.get_success_url())
+
+
+class PackingItemTemplateImportView(
+    LoginRequiredMixin, UserPassesTestMixin, ItemImportView
+):
+    item_model = PackingItemTemplate
+    name_field = "name"
+    template_name = "packing_lists/packing_item_import.html"
+
+    def test_func(self):
+        self.packing_template = get_object_or_404(
+            PackingListTemplate, pk=self.kwargs["template_pk"]
+        )
+        return user_owns_template(self.request.user, self.packing_template)
+
+    def get_target(self):
+        return self.packing_template
+
+    def get_existing_items(self, target):
+        return target.effective_items()
+
+    def build_item(self, target, imported):
+        return PackingItemTemplate(
+            template=target, name=imported.name, quantity=imported.quantity
+        )
+
+    def get_success_url(self):
+        return reverse(
+            "packing-list-template-details", kwargs={"pk": self.packing_template.pk}
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["heading"] = "Import Template Items"
+        context["subtitle"] = self.packing_template.name
+        context["cancel_url"] = self.get_success_url()
+        return context
+
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        messages.error(self.request, "You cannot add items to this template.")
+        return redirect("packing-list-template-list")
@@ -1,9 +1,12 @@
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import redirect, get_object_or_404
+from core.exceptions import VersionConflict
+from core.importers import ItemImportView
 from django.views.generic import CreateView, UpdateView, DeleteView
 from ..models import PackingItem, PackingList
+from ..events import publish_item_event, publish_list_event
 
 
 def user_can_access_packing_list(user, packing_list):
@@ -52,7 +55,9 @@ class PackingItemCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView)
             self.request,
             f'Item "{form.instance.item_name}" successfully added to the packing list.',
         )
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        publish_item_event(self.object, "item_added")
+        return response
 
     def get_success_url(self):
         return reverse_lazy(
@@ -82,8 +87,26 @@ class PackingItemUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView)
         return user_can_edit_packing_item(self.request.user, item.packing_list)
 
     def form_valid(self, form):
-        messages.success(self.request, f'Item "{form.instance.item_name}" updated!')
-        return super().form_valid(form)
+        item = form.instance
+        try:
+            # version of the item the user was editing
+            item.version = int(self.request.POST["version"])
+        except (KeyError, ValueError):
+            pass
+
+        try:
+            item.update_if_current(
+                item_name=form.cleaned_data["item_name"],
+                item_quantity=form.cleaned_data["item_quantity"],
+            )
+        except VersionConflict as e:
+            item.refresh_from_db(fields=["version"])  # resubmitting will overwrite
+            form.add_error(None, f"{e} Review the current values and save again.")
+            return self.form_invalid(form)
+
+        messages.success(self.request, f'Item "{item.item_name}" updated!')
+        publish_item_event(item, "item_updated")
+        return redirect(self.get_success_url())
 
     def get_success_url(self):
         return reverse_lazy(
@@ -107,9 +130,12 @@ class PackingItemDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView)
 
     def form_valid(self, form):
         self.list_pk = self.get_object().packing_list.pk
+        item_id = self.object.pk
 
         messages.success(self.request, f'Item "{self.object.item_name}" deleted!')
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        publish_item_event(self.object, "item_deleted", item_id=item_id)
+        return response
 
     def get_success_url(self):
         return reverse_lazy("packing-list-details", kwargs={"pk": self.list_pk})
@@ -119,3 +145,49 @@ class PackingItemDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView)
             return super().handle_no_permission()
         messages.error(self.request, "You cannot delete this item.")
         return redirect("trip-list")
+
+
+class PackingItemImportView(LoginRequiredMixin, UserPassesTestMixin, ItemImportView):
+    item_model = PackingItem
+    template_name = "packing_lists/packing_item_import.html"
+
+    def test_func(self):
+        self.packing_list = get_object_or_404(
+            PackingList.objects.select_related("trip"), pk=self.kwargs["list_pk"]
+        )
+        return user_can_access_packing_list(self.request.user, self.packing_list)
+
+    def get_target(self):
+        return self.packing_list
+
+    def get_existing_items(self, target):
+        return target.items.all()
+
+    def build_item(self, target, imported):
+        return PackingItem(
+            packing_list=target,
+            item_name=imported.name,
+            item_quantity=imported.quantity,
+            added_by=self.request.user,
+        )
+
+    def after_import(self, target, created):
+        # bulk_create skips save(), so counters are moved in one go
+        PackingList.record_item_change(target.pk, items=len(created))
+        publish_list_event(target.pk, "items_imported", count=len(created))
+
+    def get_success_url(self):
+        return reverse("packing-list-details", kwargs={"pk": self.packing_list.pk})
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["heading"] = "Import Packing Items"
+        context["subtitle"] = self.packing_list.trip.title
+        context["cancel_url"] = self.get_success_url()
+        return context
+
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        messages.error(self.request, "You cannot add items to this list.")
+        return redirect("trip-list")
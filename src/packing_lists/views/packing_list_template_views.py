@@ -1,6 +1,7 @@
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db.models import Count
 from django.shortcuts import redirect, get_object_or_404
 from ..models import PackingListTemplate, PackingList
 from trips.models import Trip
@@ -19,6 +20,11 @@ def user_owns_template(user, template):
     return template.user == user
 
 
+def user_can_view_template(user, template):
+    """Owners see their templates, everyone sees public ones"""
+    return template.is_public or user_owns_template(user, template)
+
+
 def user_can_apply_template_to_trip(user, trip):
     """Checks if user can apply template to trip (owner or participant)"""
     return trip.is_owner(user) or trip.is_participant(user)
@@ -35,17 +41,59 @@ class PackingListTemplateListView(LoginRequiredMixin, ListView):  # templates us
     context_object_name = "list_templates"
 
     def get_queryset(self):
-        return PackingListTemplate.objects.filter(user=self.request.user).order_by(
-            "name"
+        return (
+            PackingListTemplate.objects.filter(user=self.request.user)
+            .with_item_count()
+            .order_by("name")
+        )
+
+
+class PackingListTemplateLibraryView(LoginRequiredMixin, ListView):
+    """Public templates of all users, most forked first"""
+
+    model = PackingListTemplate
+    template_name = "packing_lists/packing_list_template_library.html"
+    context_object_name = "list_templates"
+    paginate_by = 20
+
+    def get_queryset(self):
+        return (
+            PackingListTemplate.objects.filter(is_public=True)
+            .select_related("user")
+            .with_item_count()
+            .annotate(fork_count=Count("forks"))
+            .order_by("-fork_count", "name")
         )
 
 
+class ForkPackingListTemplateView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Creates the user's own copy-on-write fork of a template"""
+
+    def test_func(self):
+        self.packing_template = get_object_or_404(
+            PackingListTemplate, pk=self.kwargs["pk"]
+        )
+        return self.packing_template.can_be_forked_by(self.request.user)
+
+    def post(self, request, *args, **kwargs):
+        fork = self.packing_template.fork(request.user)
+
+        messages.success(request, f'Template "{fork.name}" added to your templates.')
+        return redirect("packing-list-template-details", pk=fork.pk)
+
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        messages.error(self.request, "You cannot use this template.")
+        return redirect("packing-list-template-library")
+
+
 class PackingListTemplateCreateView(LoginRequiredMixin, CreateView):
     """Creates an empty packing list template"""
 
     model = PackingListTemplate
     template_name = "packing_lists/packing_list_template_create.html"
-    fields = ["name"]
+    fields = ["name", "is_public"]
 
     def form_valid(self, form):
         form.instance.user = self.request.user
@@ -109,8 +157,10 @@ class SelectTemplateForTripView(LoginRequiredMixin, UserPassesTestMixin, ListVie
         return user_can_apply_template_to_trip(self.request.user, trip)
 
     def get_queryset(self):
-        return PackingListTemplate.objects.filter(user=self.request.user).order_by(
-            "name"
+        return (
+            PackingListTemplate.objects.filter(user=self.request.user)
+            .with_item_count()
+            .order_by("name")
         )
 
     def get_context_data(self, **kwargs):
@@ -126,10 +176,17 @@ class PackingListTemplateDetailView(
     model = PackingListTemplate
     template_name = "packing_lists/packing_list_template_details.html"
     context_object_name = "packing_template"
+    queryset = PackingListTemplate.objects.select_related("parent__user")
 
     def test_func(self):
         template = self.get_object()
-        return user_owns_template(self.request.user, template)
+        return user_can_view_template(self.request.user, template)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["items"] = self.object.effective_items()
+        context["is_owner"] = user_owns_template(self.request.user, self.object)
+        return context
 
     def handle_no_permission(self):
         if not self.request.user.is_authenticated:
@@ -143,7 +200,7 @@ class PackingListTemplateUpdateView(
 ):
     model = PackingListTemplate
     template_name = "packing_lists/packing_list_template_create.html"
-    fields = ["name"]
+    fields = ["name", "is_public"]
 
     def test_func(self):
         template = self.get_object()
@@ -1,15 +1,20 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.http import JsonResponse
 import json
 from django.urls import reverse_lazy
 from django.db.models import Q
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404, aget_object_or_404
 from django.views.generic import DeleteView, DetailView, View, ListView
 from ..models import PackingList, PackingListTemplate, PackingItemTemplate, PackingItem
 from trips.models import Trip
+from core.exceptions import VersionConflict
+from core.mixins import ConditionalGetMixin
+from core.events import sse_response
+from ..events import packing_list_channel, publish_item_event
 
 
 def user_can_access_trip(user, trip):
@@ -25,14 +30,22 @@ def user_can_access_packing_list(user, packing_list):
         return user_can_access_trip(user, packing_list.trip)
 
 
-class PackingListDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class PackingListDetailView(
+    LoginRequiredMixin, UserPassesTestMixin, ConditionalGetMixin, DetailView
+):
     model = PackingList
     template_name = "packing_lists/packing_list_details.html"
     context_object_name = "packing_list"
 
+    def get_queryset(self):
+        return PackingList.objects.select_related("trip")
+
     def test_func(self):
-        packing_list = self.get_object()
-        return user_can_access_packing_list(self.request.user, packing_list)
+        self.packing_list = self.get_object()
+        return user_can_access_packing_list(self.request.user, self.packing_list)
+
+    def get_etag_parts(self):
+        return [self.packing_list.version, self.packing_list.trip.version]
 
     def handle_no_permission(self):
         if not self.request.user.is_authenticated:
@@ -225,19 +238,36 @@ def toggle_item_packed(request, item_id):
         data = json.loads(request.body)
         is_packed = data.get("is_packed", False)
 
+        if "version" in data:  # version the client has seen
+            item.version = int(data["version"])
+
         # Toggle packed status
-        if is_packed:
-            item.marked_as_packed(request.user)
-        else:
-            item.is_packed = False
-            item.packed_by = None
-            item.save()
+        try:
+            if is_packed:
+                item.marked_as_packed(request.user)
+            else:
+                item.marked_as_unpacked()
+        except VersionConflict as e:
+            item.refresh_from_db()
+            return JsonResponse(
+                {
+                    "success": False,
+                    "error": str(e),
+                    "conflict": True,
+                    "is_packed": item.is_packed,
+                    "version": item.version,
+                },
+                status=409,
+            )
+
+        publish_item_event(item, "item_toggled")
 
         return JsonResponse(
             {
                 "success": True,
                 "is_packed": item.is_packed,
                 "packed_by": item.packed_by.username if item.packed_by else None,
+                "version": item.version,
             }
         )
 
@@ -245,3 +275,20 @@ def toggle_item_packed(request, item_id):
         return JsonResponse({"success": False, "error": "Item not found"}, status=404)
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+
+@login_required
+@require_GET
+async def packing_list_events(request, pk):
+    """Live item changes of the list as Server-Sent Events"""
+    packing_list = await aget_object_or_404(
+        PackingList.objects.select_related("trip"), pk=pk
+    )
+    user = await request.auser()
+
+    if not await sync_to_async(user_can_access_packing_list)(user, packing_list):
+        return JsonResponse(
+            {"success": False, "error": "Permission denied"}, status=403
+        )
+
+    return sse_response(request, packing_list_channel(packing_list.pk))
@@ -0,0 +1,26 @@
+from django.db import transaction
+from core.events import publish
+
+
+def shopping_list_channel(shopping_list_id):
+    return f"shopping_list:{shopping_list_id}"
+
+
+def publish_item_event(item, event, item_id=None):
+    """Pushes an item change to live viewers of the list once it is committed"""
+    payload = {
+        "item_id": item_id or item.pk,
+        "item_name": item.item_name,
+        "item_quantity": item.item_quantity,
+        "version": item.version,
+        "is_purchased": item.is_purchased,
+        "purchased_by": item.purchased_by.username if item.purchased_by else None,
+    }
+    channel = shopping_list_channel(item.shopping_list_id)
+    transaction.on_commit(lambda: publish(channel, event, **payload))
+
+
+def publish_list_event(shopping_list_id, event, **data):
+    """Pushes a change that touches many items, viewers reload the list"""
+    channel = shopping_list_channel(shopping_list_id)
+    transaction.on_commit(lambda: publish(channel, event, **data))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0002_shoppinglist_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shoppingitem",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
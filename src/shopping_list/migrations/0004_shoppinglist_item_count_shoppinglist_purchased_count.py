@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+def fill_counters(apps, schema_editor):
+    ShoppingList = apps.get_model("shopping_list", "ShoppingList")
+    lists = ShoppingList.objects.annotate(
+        actual_items=models.Count("shopping_items"),
+        actual_done=models.Count(
+            "shopping_items", filter=models.Q(shopping_items__is_purchased=True)
+        ),
+    )
+    for item_list in lists:
+        ShoppingList.objects.filter(pk=item_list.pk).update(
+            item_count=item_list.actual_items, purchased_count=item_list.actual_done
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0003_shoppingitem_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="item_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="purchased_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
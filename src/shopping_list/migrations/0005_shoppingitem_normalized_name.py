@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:10
+
+from django.db import migrations, models
+
+
+def fill_normalized_names(apps, schema_editor):
+    """Sets the key and merges items that only differed in case or spacing"""
+    ShoppingItem = apps.get_model("shopping_list", "ShoppingItem")
+    ShoppingList = apps.get_model("shopping_list", "ShoppingList")
+
+    kept = {}
+    merged_lists = set()
+    for item in ShoppingItem.objects.order_by("pk").iterator(chunk_size=500):
+        item.normalized_name = " ".join(item.item_name.split()).casefold()
+        key = (item.shopping_list_id, item.normalized_name)
+
+        if key not in kept:
+            kept[key] = item
+            ShoppingItem.objects.filter(pk=item.pk).update(
+                normalized_name=item.normalized_name
+            )
+            continue
+
+        first = kept[key]
+        first.item_quantity += item.item_quantity
+        first.is_purchased = first.is_purchased and item.is_purchased
+        ShoppingItem.objects.filter(pk=first.pk).update(
+            item_quantity=first.item_quantity, is_purchased=first.is_purchased
+        )
+        item.delete()
+        merged_lists.add(item.shopping_list_id)
+
+    for shopping_list in ShoppingList.objects.filter(pk__in=merged_lists):
+        items = ShoppingItem.objects.filter(shopping_list=shopping_list)
+        shopping_list.item_count = items.count()
+        shopping_list.purchased_count = items.filter(is_purchased=True).count()
+        shopping_list.save(update_fields=["item_count", "purchased_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0004_shoppinglist_item_count_shoppinglist_purchased_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shoppingitem",
+            name="normalized_name",
+            field=models.CharField(default="", editable=False, max_length=100),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_normalized_names, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="shoppingitem",
+            constraint=models.UniqueConstraint(
+                fields=("shopping_list", "normalized_name"),
+                name="unique_shopping_item_name",
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0005_shoppingitem_normalized_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="shoppingitem",
+            name="unique_shopping_item_name",
+        ),
+        migrations.AddField(
+            model_name="shoppingitem",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="shoppingitem",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="shoppingitem",
+            index=models.Index(
+                fields=["shopping_list", "updated_at"], name="shopping_item_sync_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="shoppingitem",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=("shopping_list", "normalized_name"),
+                name="unique_shopping_item_name",
+            ),
+        ),
+    ]
@@ -1,6 +1,12 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.db.models.functions import Coalesce, Lower, Trim
+from django.utils import timezone
+from packing_lists.models import PackingItem
 from trips.models import Trip
+from core.exceptions import VersionConflict
+from core.importers import normalize_name
+from core.sync import LiveManager
 
 User = get_user_model()
 
@@ -10,10 +16,146 @@ class ShoppingList(models.Model):
         Trip, on_delete=models.CASCADE, related_name="shopping_list"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # bumped on every item change - part of fragment cache keys
+    version = models.PositiveIntegerField(default=0)
+    # maintained by ShoppingItem, repaired by `manage.py reconcile_list_counters`
+    item_count = models.PositiveIntegerField(default=0)
+    purchased_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ["-created_at"]
 
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        super().save(*args, **kwargs)
+
+        if is_new:  # trip cards show a link to the shopping list
+            self.trip.bump_version()
+
+    def delete(self, *args, **kwargs):
+        self.trip.bump_version()
+        return super().delete(*args, **kwargs)
+
+    def bump_version(self):
+        """Invalidates cached fragments rendered for this list"""
+        ShoppingList.objects.filter(pk=self.pk).update(version=models.F("version") + 1)
+
+    @classmethod
+    def record_item_change(cls, pk, items=0, purchased=0):
+        """Bumps the version and shifts the counters in a single UPDATE"""
+        cls.objects.filter(pk=pk).update(
+            version=models.F("version") + 1,
+            item_count=models.F("item_count") + items,
+            purchased_count=models.F("purchased_count") + purchased,
+        )
+
+    @classmethod
+    def reconcile_counters(cls):
+        """Recomputes counters from the item table, returns the number of lists fixed"""
+        live_items = models.Q(shopping_items__deleted_at__isnull=True)
+        lists = cls.objects.annotate(
+            actual_items=models.Count("shopping_items", filter=live_items),
+            actual_purchased=models.Count(
+                "shopping_items",
+                filter=live_items & models.Q(shopping_items__is_purchased=True),
+            ),
+        ).exclude(
+            item_count=models.F("actual_items"),
+            purchased_count=models.F("actual_purchased"),
+        )
+
+        fixed = 0
+        for shopping_list in lists:
+            cls.objects.filter(pk=shopping_list.pk).update(
+                version=models.F("version") + 1,
+                item_count=shopping_list.actual_items,
+                purchased_count=shopping_list.actual_purchased,
+            )
+            fixed += 1
+        return fixed
+
+    def refresh_counters(self):
+        """Recounts this list's items in a single UPDATE"""
+        items = ShoppingItem.objects.filter(shopping_list=models.OuterRef("pk"))
+
+        def count(queryset):
+            return Coalesce(
+                models.Subquery(
+                    queryset.values("shopping_list")
+                    .annotate(total=models.Count("pk"))
+                    .values("total")
+                ),
+                0,
+            )
+
+        ShoppingList.objects.filter(pk=self.pk).update(
+            version=models.F("version") + 1,
+            item_count=count(items),
+            purchased_count=count(items.filter(is_purchased=True)),
+        )
+
+    def generate_from_packing_lists(self, user):
+        """Merges unpacked items of every packing list on the trip into this list
+
+        Items are grouped by normalized name and their quantities summed.
+        Items already on this list get the summed quantity, so running it
+        again doesn't double anything. Returns the number of items merged.
+        """
+        groups = (
+            PackingItem.objects.filter(
+                packing_list__trip_id=self.trip_id, is_packed=False
+            )
+            .annotate(key=Lower(Trim("item_name")))
+            .values("key")
+            .annotate(
+                name=models.Min("item_name"), quantity=models.Sum("item_quantity")
+            )
+        )
+
+        # SQL can't collapse inner whitespace portably, finish grouping here
+        merged = {}
+        for group in groups:
+            key = normalize_name(group["name"])
+            if key in merged:
+                merged[key].item_quantity += group["quantity"]
+            else:
+                merged[key] = ShoppingItem(
+                    shopping_list=self,
+                    item_name=group["name"].strip(),
+                    normalized_name=key,
+                    item_quantity=group["quantity"],
+                    added_by=user,
+                )
+        if not merged:
+            return 0
+        total = len(merged)  # existing items are popped off below
+
+        with transaction.atomic():
+            # the unique constraint skips tombstones, so ON CONFLICT can't
+            # target it - update the live items first, insert the rest
+            existing = self.shopping_items.filter(
+                normalized_name__in=merged
+            ).select_for_update()
+            now = timezone.now()
+            for item in existing:
+                item.item_quantity = merged.pop(item.normalized_name).item_quantity
+                item.version += 1
+                item.updated_at = now
+            ShoppingItem.objects.bulk_update(
+                existing, ["item_quantity", "version", "updated_at"]
+            )
+            ShoppingItem.objects.bulk_create(merged.values())
+            self.refresh_counters()
+
+        return total
+
+    @property
+    def progress(self):
+        """Purchased share in percent, for progress bars"""
+        if not self.item_count:
+            return 0
+        return round(self.purchased_count * 100 / self.item_count)
+
     def __str__(self):
         return f" {self.trip.title} Shopping list"
 
@@ -23,9 +165,16 @@ class ShoppingItem(models.Model):
         ShoppingList, on_delete=models.CASCADE, related_name="shopping_items"
     )
     item_name = models.CharField(max_length=100)
+    # one row per thing to buy, however it was spelled
+    normalized_name = models.CharField(max_length=100, editable=False)
     item_quantity = models.IntegerField(default=1)
     is_purchased = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # change feed for offline sync, see api/sync.py
+    updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # optimistic locking - every write increments it
+    version = models.PositiveIntegerField(default=0)
 
     added_by = models.ForeignKey(
         User,
@@ -42,14 +191,94 @@ class ShoppingItem(models.Model):
         related_name="purchased_items",
     )
 
+    objects = LiveManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ["is_purchased", "-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["shopping_list", "normalized_name"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="unique_shopping_item_name",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["shopping_list", "updated_at"], name="shopping_item_sync_idx"
+            )
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so that save() can tell whether purchased_count has to move
+        instance._loaded_is_purchased = instance.__dict__.get("is_purchased")
+        return instance
+
+    def update_if_current(self, **changes):
+        """Writes only the given fields, if nobody changed the item since it was read"""
+        if "item_name" in changes:
+            changes["normalized_name"] = normalize_name(changes["item_name"])
+
+        changes["updated_at"] = timezone.now()
+        updated = ShoppingItem.objects.filter(pk=self.pk, version=self.version).update(
+            version=models.F("version") + 1, **changes
+        )
+        if not updated:
+            raise VersionConflict(
+                f'Item "{self.item_name}" was changed by someone else.'
+            )
+
+        items = purchased = 0
+        if "is_purchased" in changes:
+            purchased = int(changes["is_purchased"]) - int(self.is_purchased)
+        if changes.get("deleted_at"):
+            items, purchased = -1, -int(self.is_purchased)
+
+        for field, value in changes.items():
+            setattr(self, field, value)
+        self.version += 1
+        self._loaded_is_purchased = self.is_purchased
+
+        ShoppingList.record_item_change(
+            self.shopping_list_id, items=items, purchased=purchased
+        )
 
     def marked_as_purchased(self, user):
-        self.is_purchased = True
+        self.update_if_current(is_purchased=True, purchased_by=user)
+
+    def marked_as_unpurchased(self):
+        self.update_if_current(is_purchased=False, purchased_by=None)
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.item_name)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "normalized_name"}
+
+        if self._state.adding:
+            items, purchased = 1, int(self.is_purchased)
+        else:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+            items = purchased = 0
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None or "is_purchased" in update_fields:
+                purchased = int(self.is_purchased) - int(
+                    getattr(self, "_loaded_is_purchased", self.is_purchased)
+                )
+
+        super().save(*args, **kwargs)
+        self._loaded_is_purchased = self.is_purchased
+        ShoppingList.record_item_change(
+            self.shopping_list_id, items=items, purchased=purchased
+        )
 
-        self.purchased_by = user
-        self.save()
+    def delete(self, *args, **kwargs):
+        """Soft delete - the row stays as a tombstone for offline clients"""
+        self.update_if_current(deleted_at=timezone.now())
+        return 1, {self._meta.label: 1}
 
     def __str__(self):
         return f"{self.item_name} x{self.item_quantity}"
@@ -1,4 +1,9 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from core.exceptions import VersionConflict
+from shopping_list.models import ShoppingItem
+from packing_lists.tests.factories import PackingListFactory, PackingItemFactory
 from .factories import UserFactory, ShoppingListFactory, ShoppingItemFactory
 
 
@@ -12,6 +17,21 @@ class ShoppingListModelTest(TestCase):
             str(self.shopping_list), f" {self.shopping_list.trip.title} Shopping list"
         )
 
+    def test_counters_follow_item_changes(self):
+        user = UserFactory()
+        item = ShoppingItemFactory(shopping_list=self.shopping_list)
+        ShoppingItemFactory(shopping_list=self.shopping_list, item_name="Bread")
+
+        item.marked_as_purchased(user)
+        self.shopping_list.refresh_from_db()
+        self.assertEqual(self.shopping_list.item_count, 2)
+        self.assertEqual(self.shopping_list.purchased_count, 1)
+
+        item.delete()
+        self.shopping_list.refresh_from_db()
+        self.assertEqual(self.shopping_list.item_count, 1)
+        self.assertEqual(self.shopping_list.purchased_count, 0)
+
 
 class ShoppingItemModelTest(TestCase):
 
@@ -39,3 +59,98 @@ class ShoppingItemModelTest(TestCase):
 
         self.assertTrue(self.item.is_purchased)
         self.assertEqual(self.item.purchased_by, self.user)
+
+    def test_item_changes_bump_list_version(self):
+        shopping_list = self.item.shopping_list
+        shopping_list.refresh_from_db()
+        version = shopping_list.version
+
+        self.item.marked_as_purchased(self.user)
+        self.item.delete()
+
+        shopping_list.refresh_from_db()
+        self.assertEqual(shopping_list.version, version + 2)
+
+    def test_marked_as_unpurchased_clears_purchased_by(self):
+        self.item.marked_as_purchased(self.user)
+        self.item.marked_as_unpurchased()
+        self.item.refresh_from_db()
+
+        self.assertFalse(self.item.is_purchased)
+        self.assertIsNone(self.item.purchased_by)
+
+    def test_stale_toggle_raises_version_conflict(self):
+        stale = ShoppingItem.objects.get(pk=self.item.pk)
+        self.item.marked_as_purchased(self.user)
+
+        with self.assertRaises(VersionConflict):
+            stale.marked_as_unpurchased()
+
+        self.item.refresh_from_db()
+        self.assertTrue(self.item.is_purchased)
+
+
+class GenerateShoppingListTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.shopping_list = ShoppingListFactory()
+        self.trip = self.shopping_list.trip
+
+    def add_member_list(self, *items):
+        packing_list = PackingListFactory(trip=self.trip)
+        for name, quantity, is_packed in items:
+            PackingItemFactory(
+                packing_list=packing_list,
+                item_name=name,
+                item_quantity=quantity,
+                is_packed=is_packed,
+            )
+
+    def test_sums_unpacked_items_across_lists(self):
+        self.add_member_list(("Sunscreen", 1, False), ("Towel", 1, True))
+        self.add_member_list((" sunscreen ", 2, False), ("Sun  Hat", 1, False))
+        self.add_member_list(("sun hat", 1, False))
+        PackingItemFactory(item_name="Sunscreen", item_quantity=9)  # other trip
+
+        merged = self.shopping_list.generate_from_packing_lists(self.user)
+
+        self.assertEqual(merged, 2)
+        self.assertEqual(
+            set(
+                self.shopping_list.shopping_items.values_list(
+                    "normalized_name", "item_quantity"
+                )
+            ),
+            {("sunscreen", 3), ("sun hat", 2)},
+        )
+        self.shopping_list.refresh_from_db()
+        self.assertEqual(self.shopping_list.item_count, 2)
+
+    def test_rerun_updates_existing_items_instead_of_adding(self):
+        ShoppingItemFactory(
+            shopping_list=self.shopping_list, item_name="SUNSCREEN", item_quantity=1
+        )
+        self.add_member_list(("Sunscreen", 2, False))
+
+        self.assertEqual(self.shopping_list.generate_from_packing_lists(self.user), 1)
+        self.assertEqual(self.shopping_list.generate_from_packing_lists(self.user), 1)
+
+        item = self.shopping_list.shopping_items.get()
+        self.assertEqual((item.item_name, item.item_quantity), ("SUNSCREEN", 2))
+
+    def test_query_count_does_not_grow_with_members(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.shopping_list.generate_from_packing_lists(self.user)
+            return len(queries)
+
+        self.add_member_list(("Map", 1, False))
+        self.shopping_list.generate_from_packing_lists(self.user)
+        # one item to update and one to insert, like the bigger run below
+        self.add_member_list(("Tent", 1, False))
+        few = count_queries()
+        for i in range(10):
+            self.add_member_list((f"Item {i}", 1, False), ("Map", 1, False))
+
+        self.assertEqual(count_queries(), few)
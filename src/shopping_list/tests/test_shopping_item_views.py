@@ -1,3 +1,5 @@
+import json
+
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.messages import get_messages
@@ -24,6 +26,14 @@ class ShoppingItemCreateViewTest(TestCase):
         self.client.force_login(self.user)
         self.data = {"item_name": "Apples", "item_quantity": 3}
 
+    def test_same_item_in_other_spelling_is_rejected(self):
+        ShoppingItemFactory(shopping_list=self.shopping_list, item_name="apples ")
+
+        response = self.client.post(self.url, self.data)
+
+        self.assertContains(response, "already on the shopping list")
+        self.assertEqual(ShoppingItem.objects.count(), 1)
+
     def test_owner_can_create_item(self):
         self.client.post(self.url, self.data)
 
@@ -121,6 +131,16 @@ class ShoppingItemUpdateViewTest(TestCase):
         self.assertEqual(len(messages), 1)
         self.assertIn("updated", str(messages[0]))
 
+    def test_stale_version_is_rejected(self):
+        self.item.marked_as_purchased(self.user)  # someone else changed the item
+
+        response = self.client.post(self.url, {**self.data, "version": 0})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "changed by someone else")
+        self.item.refresh_from_db()
+        self.assertNotEqual(self.item.item_name, "Updated Item")
+
 
 class ShoppingItemDeleteViewTest(TestCase):
 
@@ -168,3 +188,68 @@ class ShoppingItemDeleteViewTest(TestCase):
 
         self.assertEqual(len(messages), 1)
         self.assertIn("deleted", str(messages[0]))
+
+
+class ToggleShoppingItemViewTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.shopping_list = ShoppingListFactory(trip=self.trip)
+        self.item = ShoppingItemFactory(
+            shopping_list=self.shopping_list, added_by=self.user
+        )
+        self.url = reverse("shopping-item-toggle", kwargs={"item_id": self.item.pk})
+        self.client.force_login(self.user)
+
+    def toggle(self, **data):
+        return self.client.post(
+            self.url, data=json.dumps(data), content_type="application/json"
+        )
+
+    def test_marks_item_purchased(self):
+        response = self.toggle(is_purchased=True, version=0)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["is_purchased"])
+        self.assertEqual(response.json()["version"], 1)
+
+    def test_stale_version_returns_conflict(self):
+        self.toggle(is_purchased=True, version=0)
+        response = self.toggle(is_purchased=False, version=0)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.json()["conflict"])
+        self.assertTrue(response.json()["is_purchased"])
+
+
+class ShoppingItemImportViewTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.shopping_list = ShoppingListFactory(trip=self.trip)
+        self.url = reverse(
+            "shopping-item-import", kwargs={"shopping_list_pk": self.shopping_list.pk}
+        )
+        self.client.force_login(self.user)
+
+    def test_member_can_import_items(self):
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        self.client.force_login(member)
+
+        response = self.client.post(self.url, {"text": "6x eggs\nbread"})
+
+        self.assertRedirects(
+            response,
+            reverse("shopping-list-details", kwargs={"pk": self.shopping_list.pk}),
+        )
+        self.shopping_list.refresh_from_db()
+        self.assertEqual(self.shopping_list.item_count, 2)
+        self.assertEqual(ShoppingItem.objects.get(item_name="eggs").added_by, member)
+
+    def test_empty_form_is_rejected(self):
+        response = self.client.post(self.url, {"text": "  "})
+
+        self.assertContains(response, "Paste some items or choose a file.")
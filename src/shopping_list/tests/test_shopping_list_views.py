@@ -1,9 +1,20 @@
+import asyncio
+import json
+from asgiref.sync import async_to_sync, sync_to_async
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.messages import get_messages
 from trips.models import TripMember
+from core.events import get_broker
 from shopping_list.models import ShoppingList
-from .factories import UserFactory, TripFactory, ShoppingListFactory
+from packing_lists.tests.factories import PackingListFactory, PackingItemFactory
+from shopping_list.events import shopping_list_channel
+from .factories import (
+    UserFactory,
+    TripFactory,
+    ShoppingListFactory,
+    ShoppingItemFactory,
+)
 
 
 class ShoppingListCreateViewTest(TestCase):
@@ -97,6 +108,30 @@ class ShoppingListDetailViewTest(TestCase):
 
         self.assertRedirects(response, reverse("trip-list"))
 
+    def test_unchanged_list_returns_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_item_change_invalidates_etag(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+        ShoppingItemFactory(shopping_list=self.shopping_list, added_by=self.user)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_differs_between_owner_and_member(self):
+        owner_etag = self.client.get(self.url).headers["ETag"]
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        self.client.force_login(member)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=owner_etag)
+        self.assertEqual(response.status_code, 200)
+
 
 class ShoppingListDeleteViewTest(TestCase):
 
@@ -141,3 +176,95 @@ class ShoppingListDeleteViewTest(TestCase):
 
         self.assertEqual(len(messages), 1)
         self.assertIn("deleted", str(messages[0]))
+
+
+class GenerateShoppingListViewTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.shopping_list = ShoppingListFactory(trip=self.trip)
+        packing_list = PackingListFactory(trip=self.trip, user=self.user)
+        PackingItemFactory(packing_list=packing_list, item_name="Sunscreen")
+
+        self.url = reverse(
+            "shopping-list-generate", kwargs={"pk": self.shopping_list.pk}
+        )
+        self.client.force_login(self.user)
+
+    def test_member_can_generate(self):
+        response = self.client.post(self.url)
+
+        self.assertRedirects(
+            response,
+            reverse("shopping-list-details", kwargs={"pk": self.shopping_list.pk}),
+        )
+        self.assertTrue(
+            self.shopping_list.shopping_items.filter(item_name="Sunscreen").exists()
+        )
+
+    def test_non_member_cannot_generate(self):
+        self.client.force_login(UserFactory())
+        response = self.client.post(self.url)
+
+        self.assertRedirects(response, reverse("trip-list"))
+        self.assertFalse(self.shopping_list.shopping_items.exists())
+
+
+class ShoppingListEventsViewTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.shopping_list = ShoppingListFactory(trip=self.trip)
+        self.item = ShoppingItemFactory(
+            shopping_list=self.shopping_list, added_by=self.user
+        )
+        self.url = reverse("shopping-list-events", kwargs={"pk": self.shopping_list.pk})
+        self.client.force_login(self.user)
+
+    def add_item(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse(
+                    "shopping-item-create",
+                    kwargs={"shopping_list_pk": self.shopping_list.pk},
+                ),
+                {"item_name": "Bread", "item_quantity": 2},
+            )
+
+    async def test_member_gets_event_stream(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "text/event-stream")
+
+    def test_wsgi_request_is_not_held_open(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 204)
+
+    def test_non_member_is_denied(self):
+        self.client.force_login(UserFactory())
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_item_create_publishes_item_event(self):
+        channel = shopping_list_channel(self.shopping_list.pk)
+
+        async def listen_while_adding():
+            subscription = get_broker().subscribe(channel)
+            next_message = asyncio.ensure_future(subscription.__anext__())
+            await asyncio.sleep(0)
+            await sync_to_async(self.add_item)()
+            message = await asyncio.wait_for(next_message, timeout=1)
+            await subscription.aclose()
+            return json.loads(message)
+
+        event = async_to_sync(listen_while_adding)()
+
+        self.assertEqual(event["event"], "item_added")
+        self.assertEqual(event["item_name"], "Bread")
+        self.assertEqual(event["item_quantity"], 2)
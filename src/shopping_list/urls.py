@@ -3,12 +3,15 @@ from .views.shopping_list_views import (
     ShoppingListCreateView,
     ShoppingListDetailView,
     ShoppingListDeleteView,
+    GenerateShoppingListView,
     toggle_item_purchased,
+    shopping_list_events,
 )
 from .views.shopping_item_views import (
     ShoppingItemCreateView,
     ShoppingItemUpdateView,
     ShoppingItemDeleteView,
+    ShoppingItemImportView,
 )
 
 urlpatterns = [
@@ -19,6 +22,12 @@ urlpatterns = [
         name="shopping-list-create",
     ),
     path("<int:pk>/", ShoppingListDetailView.as_view(), name="shopping-list-details"),
+    path("<int:pk>/events/", shopping_list_events, name="shopping-list-events"),
+    path(
+        "<int:pk>/generate/",
+        GenerateShoppingListView.as_view(),
+        name="shopping-list-generate",
+    ),
     path(
         "<int:pk>/delete/",
         ShoppingListDeleteView.as_view(),
@@ -30,6 +39,11 @@ urlpatterns = [
         ShoppingItemCreateView.as_view(),
         name="shopping-item-create",
     ),
+    path(
+        "<int:shopping_list_pk>/items/import/",
+        ShoppingItemImportView.as_view(),
+        name="shopping-item-import",
+    ),
     path(
         "items/<int:pk>/update/",
         ShoppingItemUpdateView.as_view(),
@@ -1,12 +1,24 @@
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import redirect, get_object_or_404
+from core.exceptions import VersionConflict
+from core.importers import ItemImportView, normalize_name
 from django.views.generic import CreateView, UpdateView, DeleteView
 from ..models import ShoppingItem, ShoppingList
+from ..events import publish_item_event, publish_list_event
 from .shopping_list_views import user_can_access_trip
 
 
+def item_name_taken(shopping_list, item_name, exclude_pk=None):
+    """Checks if the list already has this item under any spelling"""
+    return (
+        shopping_list.shopping_items.filter(normalized_name=normalize_name(item_name))
+        .exclude(pk=exclude_pk)
+        .exists()
+    )
+
+
 class ShoppingItemManageMixin(UserPassesTestMixin):
     def test_func(self):
         if "shopping_list_pk" in self.kwargs:
@@ -37,11 +49,17 @@ class ShoppingItemCreateView(LoginRequiredMixin, ShoppingItemManageMixin, Create
         form.instance.shopping_list = shopping_list
         form.instance.added_by = self.request.user
 
+        if item_name_taken(shopping_list, form.instance.item_name):
+            form.add_error("item_name", "This item is already on the shopping list.")
+            return self.form_invalid(form)
+
         messages.success(
             self.request,
             f'Item "{form.instance.item_name}" successfully added to the shopping list.',
         )
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        publish_item_event(self.object, "item_added")
+        return response
 
     def get_success_url(self):
         return reverse_lazy(
@@ -63,8 +81,32 @@ class ShoppingItemUpdateView(LoginRequiredMixin, ShoppingItemManageMixin, Update
     fields = ["item_name", "item_quantity"]
 
     def form_valid(self, form):
-        messages.success(self.request, f'Item "{form.instance.item_name}" updated!')
-        return super().form_valid(form)
+        item = form.instance
+        try:
+            # version of the item the user was editing
+            item.version = int(self.request.POST["version"])
+        except (KeyError, ValueError):
+            pass
+
+        if item_name_taken(
+            item.shopping_list, form.cleaned_data["item_name"], exclude_pk=item.pk
+        ):
+            form.add_error("item_name", "This item is already on the shopping list.")
+            return self.form_invalid(form)
+
+        try:
+            item.update_if_current(
+                item_name=form.cleaned_data["item_name"],
+                item_quantity=form.cleaned_data["item_quantity"],
+            )
+        except VersionConflict as e:
+            item.refresh_from_db(fields=["version"])  # resubmitting will overwrite
+            form.add_error(None, f"{e} Review the current values and save again.")
+            return self.form_invalid(form)
+
+        messages.success(self.request, f'Item "{item.item_name}" updated!')
+        publish_item_event(item, "item_updated")
+        return redirect(self.get_success_url())
 
     def get_success_url(self):
         return reverse_lazy(
@@ -78,11 +120,56 @@ class ShoppingItemDeleteView(LoginRequiredMixin, ShoppingItemManageMixin, Delete
 
     def form_valid(self, form):
         self.shopping_list_pk = self.get_object().shopping_list.pk
+        item_id = self.object.pk
 
         messages.success(self.request, f'Item "{self.object.item_name}" deleted!')
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        publish_item_event(self.object, "item_deleted", item_id=item_id)
+        return response
 
     def get_success_url(self):
         return reverse_lazy(
             "shopping-list-details", kwargs={"pk": self.shopping_list_pk}
         )
+
+
+class ShoppingItemImportView(
+    LoginRequiredMixin, ShoppingItemManageMixin, ItemImportView
+):
+    item_model = ShoppingItem
+    template_name = "shopping_list/shopping_item_import.html"
+
+    def get_target(self):
+        if not hasattr(self, "shopping_list"):
+            self.shopping_list = get_object_or_404(
+                ShoppingList.objects.select_related("trip"),
+                pk=self.kwargs["shopping_list_pk"],
+            )
+        return self.shopping_list
+
+    def get_existing_items(self, target):
+        return target.shopping_items.all()
+
+    def build_item(self, target, imported):
+        return ShoppingItem(
+            shopping_list=target,
+            item_name=imported.name,
+            normalized_name=normalize_name(imported.name),
+            item_quantity=imported.quantity,
+            added_by=self.request.user,
+        )
+
+    def after_import(self, target, created):
+        # bulk_create skips save(), so counters are moved in one go
+        ShoppingList.record_item_change(target.pk, items=len(created))
+        publish_list_event(target.pk, "items_imported", count=len(created))
+
+    def get_success_url(self):
+        return reverse(
+            "shopping-list-details", kwargs={"pk": self.kwargs["shopping_list_pk"]}
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["shopping_list"] = self.get_target()
+        return context
@@ -1,11 +1,12 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.http import JsonResponse
 import json
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404, aget_object_or_404
 from django.views.generic import (
     DeleteView,
     DetailView,
@@ -13,6 +14,10 @@ from django.views.generic import (
 )
 from ..models import ShoppingList, ShoppingItem
 from trips.models import Trip
+from core.exceptions import VersionConflict
+from core.mixins import ConditionalGetMixin
+from core.events import sse_response
+from ..events import shopping_list_channel, publish_item_event, publish_list_event
 
 # ListView nie ponieważ jeden Trip => 1 grupowy shopping list , brak private/shared itd => bedzie przycisk See Shopping List itd
 
@@ -48,14 +53,27 @@ class ShoppingListCreateView(LoginRequiredMixin, UserPassesTestMixin, View):
         return redirect("trip-list")
 
 
-class ShoppingListDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class ShoppingListDetailView(
+    LoginRequiredMixin, UserPassesTestMixin, ConditionalGetMixin, DetailView
+):
     model = ShoppingList
     template_name = "shopping_list/shopping_list_details.html"
     context_object_name = "shopping_list"
 
+    def get_queryset(self):
+        return ShoppingList.objects.select_related("trip")
+
     def test_func(self):
-        shopping_list = self.get_object()
-        return user_can_access_trip(self.request.user, shopping_list.trip)
+        self.shopping_list = self.get_object()
+        return user_can_access_trip(self.request.user, self.shopping_list.trip)
+
+    def get_etag_parts(self):
+        trip = self.shopping_list.trip
+        return [
+            self.shopping_list.version,
+            trip.version,
+            trip.is_owner(self.request.user),
+        ]
 
     def handle_no_permission(self):
         if not self.request.user.is_authenticated:
@@ -104,13 +122,29 @@ def toggle_item_purchased(request, item_id):
         data = json.loads(request.body)
         is_purchased = data.get("is_purchased", False)
 
+        if "version" in data:  # version the client has seen
+            item.version = int(data["version"])
+
         # Toggle packed status
-        if is_purchased:
-            item.marked_as_purchased(request.user)
-        else:
-            item.is_purchased = False
-            item.purchased_by = None
-            item.save()
+        try:
+            if is_purchased:
+                item.marked_as_purchased(request.user)
+            else:
+                item.marked_as_unpurchased()
+        except VersionConflict as e:
+            item.refresh_from_db()
+            return JsonResponse(
+                {
+                    "success": False,
+                    "error": str(e),
+                    "conflict": True,
+                    "is_purchased": item.is_purchased,
+                    "version": item.version,
+                },
+                status=409,
+            )
+
+        publish_item_event(item, "item_toggled")
 
         return JsonResponse(
             {
@@ -119,6 +153,7 @@ def toggle_item_purchased(request, item_id):
                 "purchased_by": (
                     item.purchased_by.username if item.purchased_by else None
                 ),
+                "version": item.version,
             }
         )
 
@@ -126,3 +161,49 @@ def toggle_item_purchased(request, item_id):
         return JsonResponse({"success": False, "error": "Item not found"}, status=404)
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+
+@login_required
+@require_GET
+async def shopping_list_events(request, pk):
+    """Live item changes of the list as Server-Sent Events"""
+    shopping_list = await aget_object_or_404(
+        ShoppingList.objects.select_related("trip"), pk=pk
+    )
+    user = await request.auser()
+
+    if not await sync_to_async(user_can_access_trip)(user, shopping_list.trip):
+        return JsonResponse(
+            {"success": False, "error": "Permission denied"}, status=403
+        )
+
+    return sse_response(request, shopping_list_channel(shopping_list.pk))
+
+
+class GenerateShoppingListView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Fills the shopping list from what is still unpacked on the trip"""
+
+    def test_func(self):
+        self.shopping_list = get_object_or_404(
+            ShoppingList.objects.select_related("trip"), pk=self.kwargs["pk"]
+        )
+        return user_can_access_trip(self.request.user, self.shopping_list.trip)
+
+    def post(self, request, *args, **kwargs):
+        merged = self.shopping_list.generate_from_packing_lists(request.user)
+
+        if merged:
+            publish_list_event(self.shopping_list.pk, "list_generated", count=merged)
+            messages.success(
+                request,
+                f"{merged} item{'s' if merged != 1 else ''} merged from packing lists.",
+            )
+        else:
+            messages.info(request, "Nothing left to pack on this trip's packing lists.")
+        return redirect("shopping-list-details", pk=self.shopping_list.pk)
+
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        messages.error(self.request, "You are not a member of this Trip.")
+        return redirect("trip-list")
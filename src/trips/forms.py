@@ -1,6 +1,11 @@
+import re
+
 from django import forms
+from django.core.exceptions import ValidationError
 from .models import Trip
 
+MAX_BATCH_INVITES = 100
+
 
 class TripForm(forms.ModelForm):
     class Meta:
@@ -14,3 +19,27 @@ class TripForm(forms.ModelForm):
                 attrs={"type": "date", "class": "form-control"}
             ),
         }
+
+
+class TripInviteBatchForm(forms.Form):
+    invitees = forms.CharField(
+        label="Invite people",
+        widget=forms.Textarea(
+            attrs={"rows": 8, "placeholder": "anna@example.com\nbob"}
+        ),
+        help_text="Emails or usernames, one per line or separated by commas.",
+    )
+
+    def clean_invitees(self):
+        invitees = [
+            value
+            for value in re.split(r"[,;\s]+", self.cleaned_data["invitees"])
+            if value
+        ]
+        if not invitees:
+            raise ValidationError("Enter at least one email or username.")
+        if len(invitees) > MAX_BATCH_INVITES:
+            raise ValidationError(
+                f"You can invite at most {MAX_BATCH_INVITES} people at once."
+            )
+        return invitees
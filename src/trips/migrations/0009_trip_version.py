@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0008_alter_tripinvite_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
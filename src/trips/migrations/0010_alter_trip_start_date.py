@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0009_trip_version"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="trip",
+            name="start_date",
+            field=models.DateField(db_index=True),
+        ),
+    ]
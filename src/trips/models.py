@@ -1,9 +1,10 @@
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from notifications.models import Notification
-from logs.utils import log_action
+from notifications.services import notify, notify_on_commit
+from logs.utils import log_action, log_actions
 
 User = get_user_model()
 
@@ -11,12 +12,15 @@ User = get_user_model()
 class Trip(models.Model):
     title = models.CharField(max_length=100)
     destination = models.CharField(max_length=100)
-    start_date = models.DateField()
+    # reminders look trips up by start date
+    start_date = models.DateField(db_index=True)
     end_date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     owner = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="owned_trips"
     )
+    # bumped on every change shown on trip cards - part of fragment cache keys
+    version = models.PositiveIntegerField(default=0)
 
     def validate_dates(self):
         if self.start_date and self.end_date:
@@ -26,10 +30,18 @@ class Trip(models.Model):
     def save(self, *args, **kwargs):
         self.validate_dates()
         is_new = self.pk is None
+        if not is_new:
+            self.version = models.F("version") + 1
         super().save(*args, **kwargs)
 
         if is_new:
             TripMember.objects.create(trip=self, user=self.owner, role="owner")
+        else:
+            self.refresh_from_db(fields=["version"])
+
+    def bump_version(self):
+        """Invalidates cached fragments rendered for this trip"""
+        Trip.objects.filter(pk=self.pk).update(version=models.F("version") + 1)
 
     def is_owner(self, user):
         return self.owner == user
@@ -69,6 +81,11 @@ class TripMember(models.Model):
         if self.user == self.trip.owner:
             self.role = "owner"
         super().save(*args, **kwargs)
+        Trip.objects.filter(pk=self.trip_id).update(version=models.F("version") + 1)
+
+    def delete(self, *args, **kwargs):
+        Trip.objects.filter(pk=self.trip_id).update(version=models.F("version") + 1)
+        return super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} - {self.trip.title}"
@@ -77,10 +94,10 @@ class TripMember(models.Model):
         if self.role == "owner":
             raise ValidationError("Owner cannot leave the trip.")
 
-        Notification.objects.create(
-            recipient=self.trip.owner,
+        notify(
+            "member_left",
+            recipients=[self.trip.owner_id],
             sender=self.user,
-            notification_type="member_left",
             trip=self.trip,
             message=f'{self.user.username} left your trip "{self.trip.title}".',
         )
@@ -97,10 +114,10 @@ class TripMember(models.Model):
         if self.role == "owner":
             raise ValidationError("Cannot remove the owner from the trip.")
 
-        Notification.objects.create(
-            recipient=self.user,
+        notify(
+            "member_removed",
+            recipients=[self.user_id],
             sender=performed_by,
-            notification_type="member_removed",
             trip=self.trip,
             message=f'You have been removed from "{self.trip.title}" by {performed_by.username}.',
         )
@@ -141,65 +158,204 @@ class TripInvite(models.Model):
         ordering = ["-created_at"]
         unique_together = [("trip", "user")]
 
+    @staticmethod
+    def _lookup_key(identifier):
+        """("id", pk) for integers, ("name", stripped text) for the rest
+
+        Usernames may be all digits or contain "@", so only real integers
+        (JSON numbers from the API) are taken as primary keys.
+        """
+        if isinstance(identifier, int) and not isinstance(identifier, bool):
+            return "id", identifier
+        return "name", str(identifier).strip()
+
+    @classmethod
+    def invite_many(cls, trip, invited_by, identifiers):
+        """Invites many users at once, by id, email or username
+
+        Users, members and existing invites are read with one query each,
+        invites and audit rows written with one INSERT each. Notifications
+        are written by a Celery worker after the commit.
+        Returns {"identifier", "user_id", "status"} per identifier, status
+        being invited, already_member, already_invited, duplicate or not_found.
+        """
+        keys = [(identifier, cls._lookup_key(identifier)) for identifier in identifiers]
+        ids = {value for _, (kind, value) in keys if kind == "id"}
+        names = {value.lower() for _, (kind, value) in keys if kind == "name"}
+
+        users = (
+            User.objects.annotate(
+                email_key=Lower("email"), username_key=Lower("username")
+            )
+            .filter(
+                models.Q(pk__in=ids)
+                | models.Q(email_key__in=names)
+                | models.Q(username_key__in=names)
+            )
+            .only("id", "username", "email")
+            .order_by("pk")
+        )
+        # an exact username wins, otherwise the oldest account matching
+        # regardless of case, so the pick doesn't depend on row order
+        by_id, by_exact_username, by_email, by_username = {}, {}, {}, {}
+        for user in users:
+            by_id[user.pk] = user
+            by_exact_username[user.username] = user
+            by_email.setdefault(user.email_key, user)
+            by_username.setdefault(user.username_key, user)
+
+        def by_name(value):
+            return by_exact_username.get(value) or by_username.get(value.lower())
+
+        found = {}
+        for _, (kind, value) in keys:
+            if kind == "id":
+                found[kind, value] = by_id.get(value)
+            elif "@" in value:  # an email first, usernames may have "@" too
+                found[kind, value] = by_email.get(value.lower()) or by_name(value)
+            else:
+                found[kind, value] = by_name(value)
+
+        user_ids = {user.pk for user in found.values() if user}
+        members = set(
+            TripMember.objects.filter(trip=trip, user__in=user_ids).values_list(
+                "user_id", flat=True
+            )
+        )
+        members.add(trip.owner_id)
+        invite_status = dict(
+            cls.objects.filter(trip=trip, user__in=user_ids).values_list(
+                "user_id", "status"
+            )
+        )
+
+        outcomes, invitees, seen = [], [], set()
+        for identifier, key in keys:
+            user = found.get(key)
+            if user is None:
+                status = "not_found"
+            elif user.pk in seen:
+                status = "duplicate"
+            elif user.pk in members:
+                status = "already_member"
+            elif invite_status.get(user.pk) == "pending":
+                status = "already_invited"
+            else:
+                status = "invited"
+                invitees.append(user)
+
+            if user is not None:
+                seen.add(user.pk)
+            outcomes.append(
+                {
+                    "identifier": identifier,
+                    "user_id": user.pk if user else None,
+                    "status": status,
+                }
+            )
+
+        if invitees:
+            with transaction.atomic():
+                # answered or expired invites make way for the new ones
+                stale = [user.pk for user in invitees if user.pk in invite_status]
+                if stale:
+                    cls.objects.filter(trip=trip, user__in=stale).delete()
+                cls.objects.bulk_create(
+                    cls(trip=trip, invited_by=invited_by, user=user)
+                    for user in invitees
+                )
+                # a batch may reach a hundred people, keep that off the request
+                notify_on_commit(
+                    "trip_invite",
+                    recipients=[user.pk for user in invitees],
+                    sender=invited_by,
+                    trip=trip,
+                    message=f"{invited_by.username} invited you to join {trip.title}.",
+                )
+                log_actions(
+                    action="invite_sent",
+                    content_object=trip,
+                    performed_by=invited_by,
+                    affected_users=invitees,
+                )
+        return outcomes
+
     def is_expired(self):
         if self.status == "pending" and self.expires_at:
             return timezone.now() > self.expires_at
         return False
 
-    def accept(self):
-        if self.status != "pending":
-            raise ValidationError("Trip must be in pending state to accept.")
-
-        if self.is_expired():
+    def _respond(self, status):
+        """Moves a pending, unexpired invite to `status` in one conditional UPDATE
+
+        The WHERE clause is the state check, so of two concurrent responses
+        only one changes the row. Returns whether this call did.
+        """
+        now = timezone.now()
+        changed = (
+            TripInvite.objects.filter(pk=self.pk, status="pending")
+            .filter(models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=now))
+            .update(status=status, responded_at=now)
+        )
+        if changed:
+            self.status, self.responded_at = status, now
+        return bool(changed)
+
+    def _refuse(self, action):
+        """Raises why a response didn't go through, expiring a stale invite"""
+        expired = TripInvite.objects.filter(
+            pk=self.pk, status="pending", expires_at__lte=timezone.now()
+        ).update(status="expired")
+        if expired:
             self.status = "expired"
-            self.save()
             raise ValidationError("This invitation has expired.")
+        raise ValidationError(f"Trip must be in pending state to {action}.")
 
-        self.status = "accepted"
-        self.responded_at = timezone.now()
-        self.save()
-
-        TripMember.objects.get_or_create(
-            trip=self.trip, user=self.user, defaults={"role": "member"}
-        )
-
-        Notification.objects.create(
-            recipient=self.trip.owner,
-            sender=self.user,
-            notification_type="invite_accepted",
-            trip=self.trip,
-            message=f"{self.user.username} accepted your invitation to {self.trip.title}.",
-        )
-
-        log_action(
-            action="member_added",
-            content_object=self.trip,
-            performed_by=self.user,
-            affected_user=self.user,
-        )
+    def accept(self):
+        with transaction.atomic():
+            accepted = self._respond("accepted")
+            if accepted:
+                # ON CONFLICT DO NOTHING keeps an existing membership as it is
+                TripMember.objects.bulk_create(
+                    [TripMember(trip_id=self.trip_id, user_id=self.user_id)],
+                    ignore_conflicts=True,
+                )
+                self.trip.bump_version()
+                notify(
+                    "invite_accepted",
+                    recipients=[self.trip.owner_id],
+                    sender=self.user_id,
+                    trip=self.trip_id,
+                    message=f"{self.user.username} accepted your invitation to {self.trip.title}.",
+                )
+                log_action(
+                    action="member_added",
+                    content_object=self.trip,
+                    performed_by=self.user,
+                    affected_user=self.user,
+                )
+        if not accepted:
+            self._refuse("accept")
 
     def decline(self):
-        if self.status != "pending":
-            raise ValidationError("Trip must be in pending state to decline.")
-
-        self.status = "declined"
-        self.responded_at = timezone.now()
-        self.save()
-
-        Notification.objects.create(
-            recipient=self.trip.owner,
-            sender=self.user,
-            notification_type="invite_declined",
-            trip=self.trip,
-            message=f"{self.user.username} declined your invitation to {self.trip.title}.",
-        )
-
-        log_action(
-            action="invite_declined",
-            content_object=self.trip,
-            performed_by=self.user,
-            affected_user=self.user,
-        )
+        with transaction.atomic():
+            declined = self._respond("declined")
+            if declined:
+                notify(
+                    "invite_declined",
+                    recipients=[self.trip.owner_id],
+                    sender=self.user_id,
+                    trip=self.trip_id,
+                    message=f"{self.user.username} declined your invitation to {self.trip.title}.",
+                )
+                log_action(
+                    action="invite_declined",
+                    content_object=self.trip,
+                    performed_by=self.user,
+                    affected_user=self.user,
+                )
+        if not declined:
+            self._refuse("decline")
 
     def mark_expired(self) -> bool:
         if self.is_expired():
@@ -69,3 +69,31 @@ class TripMemberModelTest(TestCase):
         TripMemberFactory(trip=self.trip, user=other)
         with self.assertRaises(IntegrityError):
             TripMemberFactory(trip=self.trip, user=other)
+
+
+class TripVersionTest(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.trip = TripFactory(owner=self.user)
+        self.trip.refresh_from_db()
+
+    def test_save_bumps_version(self):
+        version = self.trip.version
+        self.trip.title = "Changed"
+        self.trip.save()
+        self.assertEqual(self.trip.version, version + 1)
+
+    def test_adding_member_bumps_version(self):
+        version = self.trip.version
+        TripMemberFactory(trip=self.trip, user=UserFactory())
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.version, version + 1)
+
+    def test_removing_member_bumps_version(self):
+        member = TripMemberFactory(trip=self.trip, user=UserFactory())
+        self.trip.refresh_from_db()
+        version = self.trip.version
+        member.delete()
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.version, version + 1)
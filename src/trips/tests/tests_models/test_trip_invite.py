@@ -1,6 +1,9 @@
+from unittest import mock
+
 from django.test import TestCase
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from datetime import timedelta
 from ..factories import UserFactory, TripFactory, TripInviteFactory
@@ -160,3 +163,191 @@ class TripInviteModelTest(TestCase):
         )
         invite.cancel()
         self.assertFalse(TripInvite.objects.filter(pk=invite.pk).exists())
+
+    def test_accept_marks_expired_invite_as_expired(self):
+        invite = TripInviteFactory(
+            trip=self.trip,
+            user=self.invited_user,
+            invited_by=self.owner,
+            expires_at=timezone.now() - timedelta(days=1),
+        )
+        with self.assertRaisesMessage(ValidationError, "expired"):
+            invite.accept()
+        invite.refresh_from_db()
+        self.assertEqual(invite.status, "expired")
+        self.assertFalse(
+            TripMember.objects.filter(trip=self.trip, user=self.invited_user).exists()
+        )
+
+    def test_second_response_from_a_stale_copy_is_refused(self):
+        invite = TripInviteFactory(
+            trip=self.trip, user=self.invited_user, invited_by=self.owner
+        )
+        # a double-click: both requests loaded the invite while it was pending
+        stale = TripInvite.objects.get(pk=invite.pk)
+        invite.accept()
+
+        with self.assertRaises(ValidationError):
+            stale.accept()
+        with self.assertRaises(ValidationError):
+            stale.decline()
+        invite.refresh_from_db()
+        self.assertEqual(invite.status, "accepted")
+        self.assertEqual(
+            TripMember.objects.filter(trip=self.trip, user=self.invited_user).count(),
+            1,
+        )
+
+    def test_accept_keeps_an_existing_membership(self):
+        TripMember.objects.create(trip=self.trip, user=self.invited_user, role="admin")
+        invite = TripInviteFactory(
+            trip=self.trip, user=self.invited_user, invited_by=self.owner
+        )
+        invite.accept()
+        self.assertEqual(
+            TripMember.objects.get(trip=self.trip, user=self.invited_user).role,
+            "admin",
+        )
+
+    def test_accept_bumps_trip_version(self):
+        invite = TripInviteFactory(
+            trip=self.trip, user=self.invited_user, invited_by=self.owner
+        )
+        self.trip.refresh_from_db()
+        version = self.trip.version
+        invite.accept()
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.version, version + 1)
+
+    def test_accept_writes_without_reading(self):
+        invite = TripInviteFactory(
+            trip=self.trip, user=self.invited_user, invited_by=self.owner
+        )
+        invite = TripInvite.objects.select_related("trip", "user").get(pk=invite.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            invite.accept()
+
+        statements = [
+            q["sql"].split()[0] for q in queries if not q["sql"].startswith("EXPLAIN")
+        ]
+        # the guarded status change, membership, trip version, notification
+        # and audit row
+        self.assertEqual(
+            statements,
+            ["SAVEPOINT", "UPDATE", "INSERT", "UPDATE", "INSERT", "INSERT", "RELEASE"],
+        )
+
+
+class TripInviteBatchTest(TestCase):
+
+    def setUp(self):
+        self.owner = UserFactory()
+        self.trip = TripFactory(owner=self.owner, title="Alps")
+
+    def test_reports_an_outcome_per_identifier(self):
+        new = UserFactory(email="New@Example.com")
+        by_id = UserFactory()
+        member = UserFactory()
+        TripMember.objects.create(trip=self.trip, user=member)
+        pending = UserFactory()
+        TripInviteFactory(trip=self.trip, user=pending, invited_by=self.owner)
+
+        outcomes = TripInvite.invite_many(
+            self.trip,
+            self.owner,
+            [
+                "new@example.com",
+                by_id.pk,
+                member.username,
+                pending.email,
+                "nobody@example.com",
+                by_id.username.upper(),
+                self.owner.pk,
+            ],
+        )
+
+        self.assertEqual(
+            [outcome["status"] for outcome in outcomes],
+            [
+                "invited",
+                "invited",
+                "already_member",
+                "already_invited",
+                "not_found",
+                "duplicate",
+                "already_member",
+            ],
+        )
+        self.assertEqual(outcomes[0]["user_id"], new.pk)
+        self.assertEqual(
+            set(
+                TripInvite.objects.filter(trip=self.trip, status="pending").values_list(
+                    "user_id", flat=True
+                )
+            ),
+            {new.pk, by_id.pk, pending.pk},
+        )
+
+    def test_digits_and_at_signs_in_text_are_usernames(self):
+        other = UserFactory()
+        digits = UserFactory(username=str(other.pk + 1000))
+        at_sign = UserFactory(username="ann@home")
+
+        outcomes = TripInvite.invite_many(
+            self.trip, self.owner, [str(other.pk + 1000), "ann@home", str(other.pk)]
+        )
+
+        self.assertEqual(
+            [(o["user_id"], o["status"]) for o in outcomes],
+            [(digits.pk, "invited"), (at_sign.pk, "invited"), (None, "not_found")],
+        )
+
+    def test_usernames_differing_in_case_resolve_deterministically(self):
+        older = UserFactory(username="Sam")
+        newer = UserFactory(username="sam")
+
+        outcomes = TripInvite.invite_many(self.trip, self.owner, ["sam", "SAM"])
+
+        self.assertEqual(
+            [(o["user_id"], o["status"]) for o in outcomes],
+            [(newer.pk, "invited"), (older.pk, "invited")],
+        )
+
+    def test_writes_with_a_fixed_number_of_queries(self):
+        from logs.models import AuditLog
+
+        users = [UserFactory() for _ in range(30)]
+        declined = users[0]
+        TripInviteFactory(
+            trip=self.trip, user=declined, invited_by=self.owner, status="declined"
+        )
+
+        with (
+            mock.patch("notifications.tasks.send_notifications.delay") as delay,
+            self.captureOnCommitCallbacks(execute=True),
+            CaptureQueriesContext(connection) as queries,
+        ):
+            outcomes = TripInvite.invite_many(
+                self.trip, self.owner, [user.email for user in users]
+            )
+
+        statements = [
+            q["sql"].split()[0] for q in queries if not q["sql"].startswith("EXPLAIN")
+        ]
+        # users, members, invites, the declined invite making way, then one
+        # insert each for invites and audit rows
+        self.assertEqual(
+            statements,
+            ["SELECT"] * 3 + ["SAVEPOINT", "DELETE", "INSERT", "INSERT", "RELEASE"],
+        )
+
+        self.assertTrue(all(o["status"] == "invited" for o in outcomes))
+        self.assertEqual(
+            TripInvite.objects.filter(trip=self.trip, status="pending").count(), 30
+        )
+        delay.assert_called_once()
+        self.assertEqual(
+            delay.call_args.kwargs["recipient_ids"], [user.pk for user in users]
+        )
+        self.assertEqual(AuditLog.objects.filter(action="invite_sent").count(), 30)
@@ -0,0 +1,49 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.messages import get_messages
+from ...models import TripInvite
+from ..factories import UserFactory, TripFactory
+
+
+class TripInviteBatchViewTest(TestCase):
+
+    def setUp(self):
+        self.owner = UserFactory()
+        self.trip = TripFactory(owner=self.owner, title="My Trip")
+        self.url = reverse("trip-invite-batch", kwargs={"trip_id": self.trip.pk})
+        self.client.force_login(self.owner)
+
+    def test_owner_can_view_page(self):
+        response = self.client.get(self.url)
+
+        self.assertTemplateUsed(response, "trips/trip_invite_batch.html")
+
+    def test_invites_everyone_listed(self):
+        anna, bob = UserFactory(), UserFactory()
+
+        response = self.client.post(
+            self.url, {"invitees": f"{anna.email}\n{bob.username}, ghost@example.com"}
+        )
+
+        self.assertRedirects(
+            response, reverse("trip-detail", kwargs={"pk": self.trip.pk})
+        )
+        self.assertEqual(
+            set(TripInvite.objects.values_list("user_id", flat=True)),
+            {anna.pk, bob.pk},
+        )
+        messages = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn("Invitation sent to 2 people.", messages)
+        self.assertIn("No user found for: ghost@example.com.", messages)
+
+    def test_non_owner_cannot_invite(self):
+        self.client.force_login(UserFactory())
+        response = self.client.post(self.url, {"invitees": "someone"})
+
+        self.assertRedirects(response, reverse("trip-list"))
+        self.assertFalse(TripInvite.objects.exists())
+
+    def test_empty_list_is_rejected(self):
+        response = self.client.post(self.url, {"invitees": " , "})
+
+        self.assertContains(response, "Enter at least one email or username.")
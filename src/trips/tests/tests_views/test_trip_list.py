@@ -38,3 +38,12 @@ class TripListViewTest(TestCase):
         TripFactory(owner=other, title="Other Trip")
         response = self.client.get(self.url)
         self.assertNotContains(response, "Other Trip")
+
+    def test_updated_trip_card_is_rerendered(self):
+        trip = TripFactory(owner=self.user, title="Old Title")
+        self.client.get(self.url)
+        trip.title = "New Title"
+        trip.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, "New Title")
+        self.assertNotContains(response, "Old Title")
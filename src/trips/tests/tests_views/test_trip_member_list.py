@@ -1,6 +1,7 @@
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.messages import get_messages
+from notifications.models import Notification
 from ..factories import UserFactory, TripFactory, TripMemberFactory
 
 
@@ -47,3 +48,28 @@ class TripMemberListViewTest(TestCase):
     def test_trip_in_context(self):
         response = self.client.get(self.url)
         self.assertEqual(response.context["trip"], self.trip)
+
+    def test_unchanged_members_return_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_member_invalidates_etag(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+        TripMemberFactory(trip=self.trip, user=UserFactory())
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_notification_invalidates_etag(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+        Notification.objects.create(
+            recipient=self.owner, notification_type="trip_reminder"
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
@@ -6,6 +6,7 @@ from .views import (
     TripUpdateView,
     TripDeleteView,
     TripInviteCreateView,
+    TripInviteBatchView,
     TripMemberListView,
     TripInviteListView,
     TripInviteCancelView,
@@ -26,6 +27,11 @@ urlpatterns = [
         TripInviteCreateView.as_view(),
         name="trip-invite-create",
     ),
+    path(
+        "<int:trip_id>/invite/batch/",
+        TripInviteBatchView.as_view(),
+        name="trip-invite-batch",
+    ),
     path(
         "<int:trip_id>/members/", TripMemberListView.as_view(), name="trip-member-list"
     ),
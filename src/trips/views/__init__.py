@@ -4,6 +4,7 @@ from .trip_details import TripDetailView
 from .trip_update import TripUpdateView
 from .trip_delete import TripDeleteView
 from .trip_invite_create import TripInviteCreateView
+from .trip_invite_batch import TripInviteBatchView
 from .trip_invite_list import TripInviteListView
 from .trip_invite_respond import TripInviteRespondView
 from .trip_invite_sent_list import TripInviteSentListView
@@ -19,6 +20,7 @@ __all__ = [
     "TripUpdateView",
     "TripDeleteView",
     "TripInviteCreateView",
+    "TripInviteBatchView",
     "TripInviteListView",
     "TripInviteRespondView",
     "TripInviteCancelView",
@@ -0,0 +1,56 @@
+from collections import defaultdict
+
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.shortcuts import get_object_or_404, redirect
+from django.views.generic import FormView
+from ..forms import TripInviteBatchForm
+from ..models import Trip, TripInvite
+
+SKIPPED_MESSAGES = {
+    "not_found": "No user found for",
+    "already_member": "Already members",
+    "already_invited": "Already invited",
+}
+
+
+class TripInviteBatchView(LoginRequiredMixin, UserPassesTestMixin, FormView):
+    form_class = TripInviteBatchForm
+    template_name = "trips/trip_invite_batch.html"
+
+    def test_func(self):
+        self.trip = get_object_or_404(Trip, pk=self.kwargs["trip_id"])
+        return self.trip.owner == self.request.user
+
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        messages.error(self.request, "Only the Trip Owner can invite to a Trip.")
+        return redirect("trip-list")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["trip"] = self.trip
+        return context
+
+    def form_valid(self, form):
+        outcomes = TripInvite.invite_many(
+            self.trip, self.request.user, form.cleaned_data["invitees"]
+        )
+
+        by_status = defaultdict(list)
+        for outcome in outcomes:
+            by_status[outcome["status"]].append(str(outcome["identifier"]))
+
+        invited = len(by_status["invited"])
+        if invited:
+            messages.success(
+                self.request,
+                f"Invitation sent to {invited} {'person' if invited == 1 else 'people'}.",
+            )
+        for status, text in SKIPPED_MESSAGES.items():
+            if by_status[status]:
+                messages.warning(
+                    self.request, f"{text}: {', '.join(by_status[status])}."
+                )
+        return redirect("trip-detail", pk=self.trip.pk)
@@ -4,7 +4,7 @@ from django.urls import reverse_lazy
 from django.views.generic import CreateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from ..models import Trip, TripInvite
-from notifications.models import Notification
+from notifications.services import notify
 from logs.utils import log_action
 
 
@@ -61,10 +61,10 @@ class TripInviteCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
             form
         )  # zapisuje zaproszenie, self.object dostępne
 
-        Notification.objects.create(
-            recipient=self.object.user,
+        notify(
+            "trip_invite",
+            recipients=[self.object.user_id],
             sender=self.request.user,
-            notification_type="trip_invite",
             trip=self.trip,
             message=f"{self.request.user.username} invited you to join {self.trip.title}.",
         )
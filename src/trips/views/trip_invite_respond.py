@@ -12,9 +12,13 @@ class TripInviteRespondView(LoginRequiredMixin, UserPassesTestMixin, UpdateView)
     template_name = "trips/trip_invite_confirm.html"
     fields = []
 
+    def get_queryset(self):
+        # accept/decline read the trip and the user, load them once here
+        return TripInvite.objects.select_related("trip", "user")
+
     def test_func(self):
-        invite = self.get_object()
-        return invite.user == self.request.user
+        self.object = self.get_object()
+        return self.object.user_id == self.request.user.pk
 
     def handle_no_permission(self):
         if not self.request.user.is_authenticated:
@@ -31,7 +35,7 @@ class TripInviteRespondView(LoginRequiredMixin, UserPassesTestMixin, UpdateView)
         return context
 
     def post(self, request, *args, **kwargs):
-        invite = self.get_object()
+        invite = self.object
         response = request.POST.get("response")
 
         try:
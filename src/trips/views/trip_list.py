@@ -13,4 +13,8 @@ class TripListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         """Trips where User is on Owner OR a Participant"""
         user = self.request.user
-        return Trip.objects.filter(Q(owner=user) | Q(members__user=user)).distinct()
+        return (
+            Trip.objects.filter(Q(owner=user) | Q(members__user=user))
+            .select_related("owner")
+            .distinct()
+        )
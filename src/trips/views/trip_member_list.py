@@ -2,10 +2,13 @@ from django.contrib import messages
 from django.shortcuts import redirect
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from core.mixins import ConditionalGetMixin
 from ..models import Trip, TripMember
 
 
-class TripMemberListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class TripMemberListView(
+    LoginRequiredMixin, UserPassesTestMixin, ConditionalGetMixin, ListView
+):
     model = TripMember
     template_name = "trips/trip_member_list.html"
     context_object_name = "members"
@@ -23,9 +26,12 @@ class TripMemberListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         )
         return redirect("trip-list")
 
+    def get_etag_parts(self):
+        # member joins and leaves bump the trip version
+        return [self.trip.version, self.trip.is_owner(self.request.user)]
+
     def get_queryset(self):
-        self.trip = Trip.objects.get(pk=self.kwargs["trip_id"])
-        return self.trip.members.all().order_by("-role", "-joined_at")
+        return self.trip.members.select_related("user").order_by("-role", "-joined_at")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1,7 +1,7 @@
 from django.contrib.auth.admin import UserAdmin
 from django.contrib import admin
 
-from .models import CustomUser
+from .models import CustomUser, OutgoingEmail
 
 
 class CustomUserAdmin(UserAdmin):
@@ -9,3 +9,9 @@ class CustomUserAdmin(UserAdmin):
 
 
 admin.site.register(CustomUser, CustomUserAdmin)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ("id", "to_email", "subject", "status", "attempts", "created_at")
+    list_filter = ("status",)
@@ -0,0 +1,140 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from core import metrics
+
+from .models import OutgoingEmail
+
+OUTBOX_BATCH_SIZE = 100
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 30  # seconds
+BACKOFF_CAP = 60 * 60
+# how long a worker may take to send a claimed batch before others retry it
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def queue_email(to_email, subject, body):
+    """Stores the email and asks a worker to flush the outbox after commit"""
+    from .tasks import flush_email_outbox
+
+    email = OutgoingEmail.objects.create(to_email=to_email, subject=subject, body=body)
+    transaction.on_commit(flush_email_outbox.delay)
+    return email
+
+
+def queue_activation_email(user_email, activation_link):
+    return queue_email(
+        user_email,
+        "Confirm Registration",
+        f"Click the link to activate your account {activation_link}",
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, so failed emails don't retry in lockstep"""
+    ceiling = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempts - 1))
+    # only spreads retries out in time, not used for anything security related
+    jitter = random.uniform(BACKOFF_BASE / 2, ceiling)  # nosec B311
+    return timedelta(seconds=jitter)
+
+
+def rate_limit(domain):
+    """Emails per minute the provider behind this domain accepts from us"""
+    limits = settings.EMAIL_RATE_LIMITS
+    return limits.get(domain, limits["default"])
+
+
+def _take_send_slot(domain, now):
+    minute = now.strftime("%Y%m%d%H%M")
+    return metrics.window_count(f"email.rate.{domain}", minute) <= rate_limit(domain)
+
+
+def _record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = "failed"
+        metrics.incr("email.failed")
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+        metrics.incr("email.retried")
+    email.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def claim_due_emails(batch_size, now):
+    """Leases due emails to this worker in a short transaction
+
+    SKIP LOCKED keeps concurrent workers from claiming the same rows, and
+    moving next_attempt_at CLAIM_TIMEOUT ahead keeps them away once the
+    locks are released. A worker that dies mid-batch leaves its emails
+    due again when the lease runs out.
+    """
+    with transaction.atomic():
+        due = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in due]).update(
+            next_attempt_at=now + CLAIM_TIMEOUT
+        )
+    return due
+
+
+def flush_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    """Sends due emails over one SMTP connection, returns how many went out
+
+    The batch is claimed first and sent with no transaction or row lock
+    held, so a slow SMTP server doesn't keep the outbox locked. Each
+    result is stored as soon as it is known. Domains over their rate
+    limit are pushed to the next minute without using up an attempt.
+    """
+    now = timezone.now()
+    due = claim_due_emails(batch_size, now)
+    if not due:
+        return 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in due:
+            _record_failure(email, error, now)
+        return 0
+
+    sent = deferred = 0
+    next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    try:
+        for email in due:
+            if not _take_send_slot(email.domain, now):
+                OutgoingEmail.objects.filter(pk=email.pk).update(
+                    next_attempt_at=next_minute
+                )
+                deferred += 1
+                continue
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                to=[email.to_email],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                _record_failure(email, error, now)
+            else:
+                OutgoingEmail.objects.filter(pk=email.pk).update(
+                    status="sent", sent_at=timezone.now()
+                )
+                sent += 1
+    finally:
+        connection.close()
+
+    metrics.incr("email.sent", sent)
+    metrics.incr("email.deferred", deferred)
+    return sent
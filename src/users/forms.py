@@ -19,7 +19,14 @@ class UserUpdateForm(forms.ModelForm):
 
     class Meta:
         model = CustomUser
-        fields = ["username", "email", "first_name", "last_name", "avatar"]
+        fields = [
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            "avatar",
+            "email_digest",
+        ]
 
 
 class CustomPasswordResetForm(PasswordResetForm):
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_alter_customuser_avatar"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="email_digest",
+            field=models.CharField(
+                choices=[
+                    ("off", "Never"),
+                    ("immediate", "Immediately"),
+                    ("hourly", "Hourly"),
+                    ("daily", "Daily"),
+                ],
+                default="off",
+                max_length=20,
+                verbose_name="Email notifications",
+            ),
+        ),
+    ]
@@ -1,15 +1,28 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from PIL import Image
 
 
 class CustomUser(AbstractUser):
+    DIGEST_CHOICES = [
+        ("off", "Never"),
+        ("immediate", "Immediately"),
+        ("hourly", "Hourly"),
+        ("daily", "Daily"),
+    ]
+
     avatar = models.ImageField(
         default="profile_pics/default.jpg",
         upload_to="profile_pics",
         blank=True,
         null=True,
     )
+    # how often unread notifications are emailed - opt-in, existing users
+    # would otherwise get their whole unread backlog in the first digest
+    email_digest = models.CharField(
+        "Email notifications", max_length=20, choices=DIGEST_CHOICES, default="off"
+    )
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -24,3 +37,39 @@ class CustomUser(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Queued email, sent in batches by users.tasks.flush_email_outbox"""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status="pending"),
+                name="outgoing_email_due_idx",
+            )
+        ]
+
+    @property
+    def domain(self):
+        return self.to_email.rpartition("@")[2].lower()
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email}"
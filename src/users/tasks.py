@@ -1,19 +1,20 @@
 from celery import shared_task
-from django.core.mail import send_mail
 
+from .emails import OUTBOX_BATCH_SIZE, flush_outbox, queue_activation_email
 
-@shared_task(
-    bind=True,
-)
-def send_invite_email(self, user_email, activation_link):
-    try:
-        email_subject = "Confirm Registration"
 
-        send_mail(
-            email_subject,
-            message=f"Click the link to activate your account {activation_link}",
-            from_email="noreply@tripsync.com",
-            recipient_list=[user_email],
-        )
-    except Exception as e:
-        raise self.retry(exc=e, countdown=5)
+@shared_task
+def send_invite_email(user_email, activation_link):
+    """Queues the activation email - kept for tasks enqueued before the outbox"""
+    queue_activation_email(user_email, activation_link)
+
+
+@shared_task
+def flush_email_outbox():
+    """Drains the outbox, one connection per batch"""
+    total = 0
+    while True:
+        sent = flush_outbox()
+        total += sent
+        if sent < OUTBOX_BATCH_SIZE:
+            return total
@@ -0,0 +1,126 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from core import metrics
+from users.emails import (
+    MAX_ATTEMPTS,
+    claim_due_emails,
+    flush_outbox,
+    queue_email,
+    retry_delay,
+)
+from users.models import OutgoingEmail
+
+
+class FlakyBackend(EmailBackend):
+    """Rejects every message to bounce@ addresses"""
+
+    def send_messages(self, messages):
+        if any(to.startswith("bounce@") for m in messages for to in m.to):
+            raise ConnectionError("mailbox unavailable")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="users.tests.test_emails.FlakyBackend")
+class EmailOutboxTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_queued_emails_go_out_over_one_connection(self):
+        for i in range(3):
+            queue_email(f"user{i}@example.com", "Hi", "Welcome!")
+
+        with mock.patch(
+            "users.emails.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            sent = flush_outbox()
+
+        self.assertEqual(sent, 3)
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutgoingEmail.objects.exclude(status="sent").exists())
+        self.assertEqual(metrics.get("email.sent"), 3)
+
+    def test_failed_email_is_retried_later_with_backoff(self):
+        queue_email("bounce@example.com", "Hi", "Welcome!")
+        queue_email("ok@example.com", "Hi", "Welcome!")
+
+        self.assertEqual(flush_outbox(), 1)
+
+        email = OutgoingEmail.objects.get(to_email="bounce@example.com")
+        self.assertEqual((email.status, email.attempts), ("pending", 1))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn("mailbox unavailable", email.last_error)
+        # not due yet
+        self.assertEqual(flush_outbox(), 0)
+
+    def test_gives_up_after_max_attempts(self):
+        email = queue_email("bounce@example.com", "Hi", "Welcome!")
+        OutgoingEmail.objects.filter(pk=email.pk).update(attempts=MAX_ATTEMPTS - 1)
+
+        flush_outbox()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, "failed")
+        self.assertEqual(metrics.get("email.failed"), 1)
+
+    @override_settings(EMAIL_RATE_LIMITS={"default": 2})
+    def test_domain_over_rate_limit_waits_for_next_minute(self):
+        for i in range(3):
+            queue_email(f"user{i}@example.com", "Hi", "Welcome!")
+
+        self.assertEqual(flush_outbox(), 2)
+
+        deferred = OutgoingEmail.objects.get(status="pending")
+        self.assertEqual(deferred.attempts, 0)
+        self.assertEqual(deferred.next_attempt_at.second, 0)
+        self.assertGreater(deferred.next_attempt_at, timezone.now())
+
+    def test_claimed_emails_are_not_picked_up_again(self):
+        queue_email("user@example.com", "Hi", "Welcome!")
+        claim_due_emails(10, timezone.now())
+
+        self.assertEqual(flush_outbox(), 0)
+
+    def test_retry_delay_grows_and_is_capped(self):
+        self.assertLessEqual(retry_delay(1), timedelta(seconds=30))
+        self.assertLessEqual(retry_delay(20), timedelta(hours=1))
+        self.assertGreaterEqual(retry_delay(20), timedelta(seconds=15))
+
+
+@override_settings(EMAIL_BACKEND="users.tests.test_emails.FlakyBackend")
+class EmailOutboxLockingTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sends_after_the_claim_is_committed(self):
+        # created directly - queue_email() would ask Celery to flush on commit
+        OutgoingEmail.objects.create(
+            to_email="user@example.com", subject="Hi", body="Welcome!"
+        )
+        seen = []
+
+        def send(backend, messages):
+            seen.append(
+                (
+                    connection.in_atomic_block,
+                    OutgoingEmail.objects.get().next_attempt_at,
+                )
+            )
+            return len(messages)
+
+        with mock.patch.object(FlakyBackend, "send_messages", send):
+            flush_outbox()
+
+        in_transaction, lease = seen[0]
+        self.assertFalse(in_transaction)
+        self.assertGreater(lease, timezone.now())
+        self.assertEqual(OutgoingEmail.objects.get().status, "sent")
@@ -47,6 +47,7 @@ class UserUpdateFormTest(TestCase):
                 "email": self.user.email,
                 "first_name": "Jan",
                 "last_name": "Nowak",
+                "email_digest": "daily",
             },
             instance=self.user,
         )
@@ -70,6 +71,7 @@ class UserUpdateFormTest(TestCase):
                 "email": self.user.email,
                 "first_name": "",
                 "last_name": "",
+                "email_digest": "off",
             },
             files={"avatar": avatar},
             instance=self.user,
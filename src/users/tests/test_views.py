@@ -91,6 +91,7 @@ class ProfileEditViewTest(TestCase):
             "email": self.user.email,
             "first_name": "Jan",
             "last_name": "Nowak",
+            "email_digest": "hourly",
         }
 
     def test_page_loads_correctly(self):
@@ -109,6 +110,7 @@ class ProfileEditViewTest(TestCase):
         self.assertRedirects(response, reverse("profile"))
         self.user.refresh_from_db()
         self.assertEqual(self.user.first_name, "Jan")
+        self.assertEqual(self.user.email_digest, "hourly")
 
     def test_update_shows_success_message(self):
         response = self.client.post(self.url, self.update_data)
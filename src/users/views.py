@@ -19,7 +19,7 @@ from django.utils.encoding import (
 )  # force_bytes() zamienia cokolwiek (tu: liczbę) na bytes. 42 → b'42'
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.contrib.sites.shortcuts import get_current_site
-from .tasks import send_invite_email
+from .emails import queue_activation_email
 
 
 class RegistrationView(CreateView):
@@ -43,11 +43,8 @@ class RegistrationView(CreateView):
 
         activation_link = self._create_activation_link(user)
 
-        # import z tasks
-        send_invite_email.delay(
-            user.email,
-            activation_link=activation_link,
-        )
+        # sent by the outbox worker together with other queued emails
+        queue_activation_email(user.email, activation_link)
 
         messages.info(self.request, "Check your email to activate your account.")
 
@@ -139,16 +136,24 @@ class ProfileView(LoginRequiredMixin, ListView):
 
         context["upcoming_trips_with_notes"] = upcoming_trips_with_notes
 
+        # one query - the counters live on the list row
+        private_lists = {}
+        for packing_list in PackingList.objects.filter(
+            trip__in=context["upcoming_trips"], user=user, list_type="private"
+        ).only("trip_id", "item_count", "packed_count"):
+            private_lists.setdefault(packing_list.trip_id, packing_list)
+
         upcoming_trips_with_packing_lists = []
         for trip in context["upcoming_trips"]:
-            packing_list = PackingList.objects.filter(
-                trip=trip, user=user, list_type="private"
-            ).first()
+            packing_list = private_lists.get(trip.pk)
 
             if packing_list:
-                packing_items_count = packing_list.items.count()
                 upcoming_trips_with_packing_lists.append(
-                    {"trip": trip, "packing_items_count": packing_items_count}
+                    {
+                        "trip": trip,
+                        "packing_items_count": packing_list.item_count,
+                        "packed_items_count": packing_list.packed_count,
+                    }
                 )
 
         context["upcoming_trips_with_packing_lists"] = upcoming_trips_with_packing_lists